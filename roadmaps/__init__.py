@@ -1,5 +1,12 @@
-from . import format_data
-from . import functions
-from . import load
-from . import plots_format
-from . import plots
\ No newline at end of file
+import importlib
+
+#Submodules are imported on first access so that importing roadmaps does not load plotting or geospatial libraries
+submodules = ["accumulators", "aggregate", "batch", "boundaries", "cache", "date_index", "format_data", "functions", "kml", "lines", "load", "odometer", "plots_format", "plots", "projection", "raster", "regions", "simplify", "spatial_index", "store", "tiles", "tracks"]
+
+def __getattr__(name):
+    if name in submodules:
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__():
+    return sorted(list(globals().keys()) + submodules)
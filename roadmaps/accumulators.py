@@ -0,0 +1,632 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+class Histogram_Accumulator:
+    def __init__(
+        self,
+        edges,
+        counts = None,
+        underflow = 0,
+        overflow = 0,
+    ):
+        """ 
+        Histogram over fixed bin edges that can be filled in chunks and merged.
+        
+        Parameters
+        ----------
+        edges: np.array
+            increasing bin edges
+        counts: np.array
+            counts per bin, zeros if None
+        underflow: int
+            number of values below the first edge
+        overflow: int
+            number of values at or above the last edge
+
+        """
+        self.edges = np.asarray(edges, dtype=float)
+        self.counts = np.zeros(len(self.edges)-1, dtype=np.int64) if counts is None else np.asarray(counts, dtype=np.int64)
+        self.underflow = int(underflow)
+        self.overflow = int(overflow)
+
+    @classmethod
+    def log_bins(
+        cls,
+        exp_min,
+        exp_max,
+        per_decade = 20,
+    ):
+        """ 
+        Empty histogram with logarithmic bins from 10^exp_min to 10^exp_max.
+        
+        Parameters
+        ----------
+            exp_min: int
+                power of ten of the first edge
+            exp_max: int
+                power of ten of the last edge
+            per_decade: int
+                number of bins per power of ten
+
+        Returns
+        -------
+            histogram: Histogram_Accumulator
+                empty histogram
+
+        """
+        return cls(np.logspace(exp_min, exp_max, (exp_max-exp_min)*per_decade+1))
+
+    @classmethod
+    def linear_bins(
+        cls,
+        start,
+        stop,
+        step,
+    ):
+        """ 
+        Empty histogram with linear bins.
+        
+        Parameters
+        ----------
+            start: float
+                first edge
+            stop: float
+                last edge
+            step: float
+                bin width
+
+        Returns
+        -------
+            histogram: Histogram_Accumulator
+                empty histogram
+
+        """
+        return cls(np.arange(start, stop+step/2, step))
+
+    def add(
+        self,
+        values,
+    ):
+        """ 
+        Add values, NaN values are ignored.
+        
+        Parameters
+        ----------
+            values: np.array
+                values to count
+
+        Returns
+        -------
+
+        """
+        values = np.asarray(values, dtype=float)
+        values = values[np.isfinite(values)]
+        index = np.searchsorted(self.edges, values, side="right") - 1
+        self.underflow += int(np.sum(index < 0))
+        self.overflow += int(np.sum(index >= len(self.counts)))
+        in_range = (index >= 0) & (index < len(self.counts))
+        self.counts += np.bincount(index[in_range], minlength=len(self.counts))
+        return
+
+    def merge(
+        self,
+        other,
+    ):
+        """ 
+        Add the counts of another histogram with the same edges.
+        
+        Parameters
+        ----------
+            other: Histogram_Accumulator
+                histogram to merge in
+
+        Returns
+        -------
+            self: Histogram_Accumulator
+                merged histogram
+
+        """
+        if not np.array_equal(self.edges, other.edges):
+            raise ValueError("Histograms have different bin edges")
+        self.counts += other.counts
+        self.underflow += other.underflow
+        self.overflow += other.overflow
+        return self
+
+    def density(self):
+        """ 
+        Probability density of the binned values.
+        
+        Parameters
+        ----------
+
+        Returns
+        -------
+            density: np.array
+                counts normalised by the total in range and the bin widths
+
+        """
+        total = self.counts.sum()
+        if total == 0:
+            return np.zeros(len(self.counts))
+        return self.counts / (total*np.diff(self.edges))
+
+    def to_dict(self):
+        """ 
+        Serialisable representation.
+        
+        Parameters
+        ----------
+
+        Returns
+        -------
+            data: dict
+                edges, counts, underflow and overflow
+
+        """
+        return {"edges": self.edges.tolist(), "counts": self.counts.tolist(), "underflow": self.underflow, "overflow": self.overflow}
+
+    @classmethod
+    def from_dict(
+        cls,
+        data,
+    ):
+        """ 
+        Rebuild from to_dict.
+        
+        Parameters
+        ----------
+            data: dict
+                output of to_dict
+
+        Returns
+        -------
+            histogram: Histogram_Accumulator
+                histogram
+
+        """
+        return cls(data["edges"], data["counts"], data["underflow"], data["overflow"])
+
+class Quantile_Sketch:
+    def __init__(
+        self,
+        relative_accuracy = 0.01,
+    ):
+        """ 
+        Mergeable approximate quantile sketch with relative accuracy guarantees (logarithmic buckets, as DDSketch).
+        Also keeps the count, sum, sum of squared deviations from the mean, min and max for exact mean and standard deviation.
+        The squared deviations are merged with the parallel update of Chan et al., which stays accurate for large values with a small spread.
+        
+        Parameters
+        ----------
+        relative_accuracy: float
+            relative error of the returned quantiles
+
+        """
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = np.log(self.gamma)
+        self.buckets = {}
+        self.zero_count = 0
+
+        self.n = 0
+        self.total = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def add(
+        self,
+        values,
+    ):
+        """ 
+        Add non-negative values, NaN values are ignored.
+        
+        Parameters
+        ----------
+            values: np.array
+                values to add
+
+        Returns
+        -------
+
+        """
+        values = np.asarray(values, dtype=float)
+        values = values[np.isfinite(values)]
+        if len(values) == 0:
+            return
+        self.combine_moments(len(values), float(values.sum()), float(np.square(values - values.mean()).sum()))
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+
+        positive = values[values > 1e-12]
+        self.zero_count += len(values) - len(positive)
+        keys, counts = np.unique(np.ceil(np.log(positive)/self.log_gamma).astype(np.int64), return_counts=True)
+        for key, count in zip(keys.tolist(), counts.tolist()):
+            self.buckets[key] = self.buckets.get(key, 0) + count
+        return
+
+    def merge(
+        self,
+        other,
+    ):
+        """ 
+        Add another sketch with the same relative accuracy.
+        
+        Parameters
+        ----------
+            other: Quantile_Sketch
+                sketch to merge in
+
+        Returns
+        -------
+            self: Quantile_Sketch
+                merged sketch
+
+        """
+        if self.relative_accuracy != other.relative_accuracy:
+            raise ValueError("Sketches have different relative accuracies")
+        for key, count in other.buckets.items():
+            self.buckets[key] = self.buckets.get(key, 0) + count
+        self.zero_count += other.zero_count
+        self.combine_moments(other.n, other.total, other.m2)
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def combine_moments(
+        self,
+        n,
+        total,
+        m2,
+    ):
+        """ 
+        Add the count, sum and sum of squared deviations from the mean of other values (Chan et al. parallel update).
+        
+        Parameters
+        ----------
+            n: int
+                number of other values
+            total: float
+                sum of other values
+            m2: float
+                sum of squared deviations of other values from their mean
+
+        Returns
+        -------
+
+        """
+        if n == 0:
+            return
+        if self.n > 0:
+            delta = total/n - self.total/self.n
+            m2 += delta**2*self.n*n/(self.n + n)
+        self.n += n
+        self.total += total
+        self.m2 += m2
+        return
+
+    def quantile(
+        self,
+        q,
+    ):
+        """ 
+        Approximate quantile.
+        
+        Parameters
+        ----------
+            q: float
+                quantile in [0, 1]
+
+        Returns
+        -------
+            value: float
+                value at the quantile, NaN if empty
+
+        """
+        if self.n == 0:
+            return np.nan
+        rank = q*(self.n - 1)
+        if rank < self.zero_count:
+            return 0.0
+        keys = np.array(sorted(self.buckets.keys()), dtype=np.int64)
+        counts = np.cumsum([self.buckets[key] for key in keys]) + self.zero_count
+        key = keys[np.searchsorted(counts, rank, side="right")]
+        value = 2*self.gamma**key/(self.gamma + 1)
+        return float(np.clip(value, self.min, self.max))
+
+    def mean(self):
+        """ 
+        Mean of the added values, NaN if empty.
+        """
+        return self.total/self.n if self.n > 0 else np.nan
+
+    def std(self):
+        """ 
+        Sample standard deviation of the added values, NaN if fewer than two.
+        """
+        if self.n < 2:
+            return np.nan
+        return float(np.sqrt(self.m2/(self.n - 1)))
+
+    def to_dict(self):
+        """ 
+        Serialisable representation.
+        
+        Parameters
+        ----------
+
+        Returns
+        -------
+            data: dict
+                buckets and moments
+
+        """
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "keys": list(self.buckets.keys()),
+            "counts": list(self.buckets.values()),
+            "zero_count": self.zero_count,
+            "n": self.n, "total": self.total, "m2": self.m2,
+            "min": self.min if self.n > 0 else None, "max": self.max if self.n > 0 else None,
+        }
+
+    @classmethod
+    def from_dict(
+        cls,
+        data,
+    ):
+        """ 
+        Rebuild from to_dict.
+        
+        Parameters
+        ----------
+            data: dict
+                output of to_dict
+
+        Returns
+        -------
+            sketch: Quantile_Sketch
+                sketch
+
+        """
+        sketch = cls(data["relative_accuracy"])
+        sketch.buckets = dict(zip(data["keys"], data["counts"]))
+        sketch.zero_count = data["zero_count"]
+        sketch.n = data["n"]
+        sketch.total = data["total"]
+        sketch.m2 = data["m2"]
+        if sketch.n > 0:
+            sketch.min = data["min"]
+            sketch.max = data["max"]
+        return sketch
+
+class Journey_Summary:
+    def __init__(self):
+        """ 
+        Mergeable summary of journeys: histograms and quantile sketches of distance, duration and speed,
+        overall and by weekday, without keeping the individual journeys.
+
+        """
+        self.metrics = ["distance", "duration", "speed"]
+        self.histograms = {
+            "distance": Histogram_Accumulator.log_bins(-3, 6),
+            "duration": Histogram_Accumulator.log_bins(-3, 6),
+            "speed": Histogram_Accumulator.linear_bins(0, 500, 2.5),
+        }
+        self.sketches = {metric: Quantile_Sketch() for metric in self.metrics}
+        self.weekday_sketches = {metric: [Quantile_Sketch() for _ in range(7)] for metric in self.metrics}
+        self.date_min = None
+        self.date_max = None
+
+    @classmethod
+    def from_roads(
+        cls,
+        roads,
+    ):
+        """ 
+        Summary of a roads dataframe.
+        
+        Parameters
+        ----------
+            roads: Geopandas dataframe
+                Road journeys
+
+        Returns
+        -------
+            summary: Journey_Summary
+                summary of the journeys
+
+        """
+        summary = cls()
+        summary.add_roads(roads)
+        return summary
+
+    def add_roads(
+        self,
+        roads,
+    ):
+        """ 
+        Add the journeys of a roads dataframe e.g. one day or one file.
+        
+        Parameters
+        ----------
+            roads: Geopandas dataframe
+                Road journeys
+
+        Returns
+        -------
+
+        """
+        if roads.shape[0] == 0:
+            return
+        weekday = pd.DatetimeIndex(roads["date"]).dayofweek.to_numpy()
+        for metric in self.metrics:
+            values = roads[metric].to_numpy(dtype=float)
+            self.histograms[metric].add(values)
+            self.sketches[metric].add(values)
+            for di in range(7):
+                self.weekday_sketches[metric][di].add(values[weekday == di])
+        self.update_dates(pd.Timestamp(roads["date"].min()), pd.Timestamp(roads["date"].max()))
+        return
+
+    def update_dates(
+        self,
+        date_min,
+        date_max,
+    ):
+        """ 
+        Extend the date range covered by the summary.
+        """
+        if date_min is not None:
+            self.date_min = date_min if self.date_min is None else min(self.date_min, date_min)
+        if date_max is not None:
+            self.date_max = date_max if self.date_max is None else max(self.date_max, date_max)
+        return
+
+    def merge(
+        self,
+        other,
+    ):
+        """ 
+        Merge in the summary of other journeys e.g. another worker, day or month.
+        
+        Parameters
+        ----------
+            other: Journey_Summary
+                summary to merge in
+
+        Returns
+        -------
+            self: Journey_Summary
+                merged summary
+
+        """
+        for metric in self.metrics:
+            self.histograms[metric].merge(other.histograms[metric])
+            self.sketches[metric].merge(other.sketches[metric])
+            for di in range(7):
+                self.weekday_sketches[metric][di].merge(other.weekday_sketches[metric][di])
+        self.update_dates(other.date_min, other.date_max)
+        return self
+
+    @property
+    def n_journeys(self):
+        return self.sketches["distance"].n
+
+    def weekday_statistics(self):
+        """ 
+        Statistics by weekday in the layout of aggregate.statistics_cube(roads)["weekday"], medians are approximate.
+        
+        Parameters
+        ----------
+
+        Returns
+        -------
+            statistics: pd.DataFrame
+                (metric, statistic) columns indexed by weekday, Monday = 0
+
+        """
+        columns = {}
+        for metric in self.metrics:
+            sketches = self.weekday_sketches[metric]
+            columns[(metric, "mean")] = [sketch.mean() for sketch in sketches]
+            columns[(metric, "median")] = [sketch.quantile(0.5) for sketch in sketches]
+            columns[(metric, "std")] = [sketch.std() for sketch in sketches]
+            columns[(metric, "min")] = [sketch.min if sketch.n > 0 else np.nan for sketch in sketches]
+            columns[(metric, "max")] = [sketch.max if sketch.n > 0 else np.nan for sketch in sketches]
+            columns[(metric, "count")] = [sketch.n for sketch in sketches]
+        return pd.DataFrame(columns, index=pd.RangeIndex(7, name="weekday"))
+
+    def to_dict(self):
+        """ 
+        Serialisable representation.
+        
+        Parameters
+        ----------
+
+        Returns
+        -------
+            data: dict
+                histograms, sketches and date range
+
+        """
+        return {
+            "histograms": {metric: self.histograms[metric].to_dict() for metric in self.metrics},
+            "sketches": {metric: self.sketches[metric].to_dict() for metric in self.metrics},
+            "weekday_sketches": {metric: [sketch.to_dict() for sketch in self.weekday_sketches[metric]] for metric in self.metrics},
+            "date_min": None if self.date_min is None else self.date_min.isoformat(),
+            "date_max": None if self.date_max is None else self.date_max.isoformat(),
+        }
+
+    @classmethod
+    def from_dict(
+        cls,
+        data,
+    ):
+        """ 
+        Rebuild from to_dict.
+        
+        Parameters
+        ----------
+            data: dict
+                output of to_dict
+
+        Returns
+        -------
+            summary: Journey_Summary
+                summary
+
+        """
+        summary = cls()
+        for metric in summary.metrics:
+            summary.histograms[metric] = Histogram_Accumulator.from_dict(data["histograms"][metric])
+            summary.sketches[metric] = Quantile_Sketch.from_dict(data["sketches"][metric])
+            summary.weekday_sketches[metric] = [Quantile_Sketch.from_dict(sketch) for sketch in data["weekday_sketches"][metric]]
+        summary.date_min = None if data["date_min"] is None else pd.Timestamp(data["date_min"])
+        summary.date_max = None if data["date_max"] is None else pd.Timestamp(data["date_max"])
+        return summary
+
+    def save(
+        self,
+        path,
+    ):
+        """ 
+        Write the summary as json.
+        
+        Parameters
+        ----------
+            path: str
+                path of .json file
+
+        Returns
+        -------
+
+        """
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f)
+        return
+
+    @classmethod
+    def load(
+        cls,
+        path,
+    ):
+        """ 
+        Read a summary written with save.
+        
+        Parameters
+        ----------
+            path: str
+                path of .json file
+
+        Returns
+        -------
+            summary: Journey_Summary
+                summary
+
+        """
+        with open(path, "r") as f:
+            return cls.from_dict(json.load(f))
@@ -0,0 +1,184 @@
+import weakref
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+def daily_series(
+        roads,
+        date_min,
+        date_max,
+    ):
+    """ 
+    Daily and cumulative distance, duration and number of trips over a date range in a single pass.
+    
+    Parameters
+    ----------
+        roads: Geopandas dataframe
+            Road journeys
+        date_min: datetime
+            First day of the series
+        date_max: datetime
+            Last day of the series
+
+    Returns
+    -------
+        daily: pd.DataFrame
+            distance, duration, trips and their cumulative sums cum_distance, cum_duration, cum_trips indexed by day
+
+    """
+    days = pd.date_range(pd.Timestamp(date_min).normalize(), pd.Timestamp(date_max).normalize(), freq="D")
+    day_index = (pd.DatetimeIndex(roads["date"]).normalize() - days[0]).days.to_numpy()
+    in_range = (day_index >= 0) & (day_index < len(days))
+    day_index = day_index[in_range]
+
+    daily = pd.DataFrame(index=days)
+    daily["distance"] = np.bincount(day_index, weights=roads["distance"].to_numpy()[in_range], minlength=len(days))
+    daily["duration"] = np.bincount(day_index, weights=roads["duration"].to_numpy()[in_range], minlength=len(days))
+    daily["trips"] = np.bincount(day_index, minlength=len(days))
+    return add_cumulative(daily)
+
+def add_cumulative(
+        series,
+    ):
+    """ 
+    Add cumulative sums of distance, duration and trips.
+    
+    Parameters
+    ----------
+        series: pd.DataFrame
+            distance, duration and trips per period
+
+    Returns
+    -------
+        series: pd.DataFrame
+            with cum_distance, cum_duration and cum_trips
+
+    """
+    for column in ["distance", "duration", "trips"]:
+        series[f"cum_{column}"] = series[column].cumsum()
+    return series
+
+def resample_series(
+        daily,
+        freq = "W",
+    ):
+    """ 
+    Aggregate a daily series to longer periods.
+    
+    Parameters
+    ----------
+        daily: pd.DataFrame
+            output of daily_series
+        freq: str
+            pandas offset alias e.g. "W", "MS", "YS"
+
+    Returns
+    -------
+        series: pd.DataFrame
+            distance, duration, trips and their cumulative sums per period
+
+    """
+    series = daily[["distance", "duration", "trips"]].resample(freq).sum()
+    return add_cumulative(series)
+
+def fingerprint(
+        roads,
+        columns,
+    ):
+    """ 
+    Fingerprint of numeric columns of a dataframe, changes when any value is modified in place or a column is replaced.
+    Only the column buffers are hashed, there is no per row Python step.
+    
+    Parameters
+    ----------
+        roads: Geopandas dataframe
+            Road journeys
+        columns: list
+            numeric or datetime columns to hash
+
+    Returns
+    -------
+        fingerprint: str
+            sha1 hex digest of the shape and column values
+
+    """
+    sha1 = hashlib.sha1(str(roads.shape).encode())
+    for column in columns:
+        sha1.update(np.ascontiguousarray(roads[column].to_numpy()).tobytes())
+    return sha1.hexdigest()
+
+#Statistics cubes by id of the roads dataframe, dropped when the dataframe is garbage collected
+statistics_cubes = {}
+
+def statistics_cube(
+        roads,
+    ):
+    """ 
+    Mean, median, standard deviation, min, max and count of distance, duration and speed by weekday and hour of day.
+    Cached against the roads dataframe, recomputed if its date, distance, duration or speed values change.
+    Call invalidate_statistics after changing the start times in place.
+    
+    Parameters
+    ----------
+        roads: Geopandas dataframe
+            Road journeys
+
+    Returns
+    -------
+        cube: dict
+            "weekday_hour": statistics indexed by (weekday, hour),
+            "weekday": statistics indexed by weekday, Monday = 0,
+            "hour": statistics indexed by hour of day of the journey start.
+            Columns are (metric, statistic), missing weekdays or hours are NaN with zero count.
+
+    """
+    key = id(roads)
+    current = fingerprint(roads, ["date", "distance", "duration", "speed"])
+    if key in statistics_cubes:
+        frame, cached, cube = statistics_cubes[key]
+        #The weak reference guards against a new dataframe reusing the id of a collected one
+        if frame() is roads and cached == current:
+            return cube
+
+    metrics = ["distance", "duration", "speed"]
+    table = pd.DataFrame({metric: roads[metric].to_numpy(dtype=float) for metric in metrics})
+    table["weekday"] = pd.DatetimeIndex(roads["date"]).dayofweek.to_numpy()
+    table["hour"] = (pd.to_timedelta(roads["time"].astype(str)) // pd.Timedelta(hours=1)).to_numpy(dtype=int)
+
+    statistics = ["mean", "median", "std", "min", "max", "count"]
+    weekday_hour = pd.MultiIndex.from_product([range(7), range(24)], names=["weekday", "hour"])
+    cube = {
+        "weekday_hour": table.groupby(["weekday", "hour"])[metrics].agg(statistics).reindex(weekday_hour),
+        "weekday": table.groupby("weekday")[metrics].agg(statistics).reindex(pd.RangeIndex(7, name="weekday")),
+        "hour": table.groupby("hour")[metrics].agg(statistics).reindex(pd.RangeIndex(24, name="hour")),
+    }
+    for statistics_table in cube.values():
+        for metric in metrics:
+            statistics_table[(metric, "count")] = statistics_table[(metric, "count")].fillna(0).astype(int)
+
+    if key not in statistics_cubes or statistics_cubes[key][0]() is not roads:
+        weakref.finalize(roads, statistics_cubes.pop, key, None)
+    statistics_cubes[key] = (weakref.ref(roads), current, cube)
+    return cube
+
+def invalidate_statistics(
+        roads = None,
+    ):
+    """ 
+    Drop cached statistics cubes, see statistics_cube.
+    
+    Parameters
+    ----------
+        roads: Geopandas dataframe
+            Road journeys whose cube is dropped, all cubes if None
+
+    Returns
+    -------
+
+    """
+    if roads is None:
+        statistics_cubes.clear()
+    else:
+        statistics_cubes.pop(id(roads), None)
+    return
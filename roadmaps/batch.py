@@ -0,0 +1,438 @@
+import os
+import copy
+import json
+import time
+import hashlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+
+import numpy as np
+import pandas as pd
+
+from roadmaps import aggregate, functions, projection, spatial_index
+from roadmaps.load import Generate_Config, load_in_roads, klm_path, normalise_place
+from roadmaps.date_index import klm_index
+
+#Plot type: (Plots method, figure name)
+plot_types = {
+    "road_map": ("plot_road_map", "road_map"),
+    "distance": ("plot_distance", "road_odometer"),
+    "summary": ("plot_summary_histograms", "road_summary_all"),
+    "weekday": ("plot_summary_weekday_histograms", "road_summary_daily"),
+    "hourly": ("plot_summary_hourly_histograms", "road_summary_hourly"),
+}
+
+#Settings files every figure depends on, relative to the working directory
+config_files = [
+    "roadmaps/config.yaml",
+    "roadmaps/bounding_boxes.yaml",
+    "roadmaps/shapefiles.yaml",
+]
+
+#Settings that change how figures are made but not what they show, left out of job_digest
+render_settings_ignored = ["n_workers", "headless", "use_cache", "use_boundary_cache", "use_archive", "cache_dir"]
+
+#Per process state of the render workers, set once by init_worker
+worker_state = {}
+
+def job_matrix(
+        plots = None,
+        places = None,
+        date_windows = None,
+    ):
+    """ 
+    Every combination of plot type, place and date window as a list of render jobs.
+    
+    Parameters
+    ----------
+        plots: list
+            plot types, keys of plot_types. Default all
+        places: list
+            placenames e.g. ["UK", "world"]. Default ["UK"]
+        date_windows: list
+            (date_min, date_max) pairs. Format YYYY-MM-DD, None for the full range. Default [(None, None)]
+
+    Returns
+    -------
+        jobs: list
+            dict of plot, place, date_min and date_max for each job
+
+    """
+    if plots is None:
+        plots = list(plot_types)
+    if places is None:
+        places = ["UK"]
+    if date_windows is None:
+        date_windows = [(None, None)]
+    for plot in plots:
+        if plot not in plot_types:
+            raise ValueError(f"Unknown plot type {plot}, expected one of {list(plot_types)}")
+    return [
+        {"plot": plot, "place": normalise_place(place), "date_min": date_min, "date_max": date_max}
+        for plot, place, (date_min, date_max) in product(plots, places, date_windows)
+    ]
+
+def job_suffix(
+        job,
+    ):
+    """ 
+    File name suffix telling the date windows of jobs apart, empty for the full range.
+    
+    Parameters
+    ----------
+        job: dict
+            render job, see job_matrix
+
+    Returns
+    -------
+        suffix: str
+            e.g. "_2020-01-01_2020-12-31"
+
+    """
+    if job["date_min"] is None and job["date_max"] is None:
+        return ""
+    return f"_{job['date_min'] or 'start'}_{job['date_max'] or 'end'}"
+
+def job_path(
+        job,
+        config,
+        image_ex,
+    ):
+    """ 
+    Output path of a render job.
+    
+    Parameters
+    ----------
+        job: dict
+            render job, see job_matrix
+        config: class
+            class of configuration settings instance
+        image_ex: str
+            image file extension e.g. "pdf"
+
+    Returns
+    -------
+        path: str
+            absolute path of figure file
+
+    """
+    return functions.figure_path(config, plot_types[job["plot"]][1], image_ex, job_suffix(job), job["place"])
+
+def input_times(
+        config,
+    ):
+    """ 
+    Modification times of the inputs of the figures.
+    
+    Parameters
+    ----------
+        config: class
+            class of configuration settings instance
+
+    Returns
+    -------
+        dates: np.array
+            datetime dates of .klm files
+        mtimes: np.array
+            modification time of the .klm file of each date
+        config_mtime: float
+            latest modification time of the settings files and odometer readings
+
+    """
+    dates = klm_index(config).query(config.date_min, config.date_max)
+    mtimes = np.array([os.path.getmtime(klm_path(date, config)) for date in dates], dtype=float)
+    files = [f"{config.working_dir}/{name}" for name in config_files]
+    files.append(f"{config.working_dir}/{config.road_data_dir}/odometer.yaml")
+    config_mtime = max([os.path.getmtime(file) for file in files if os.path.exists(file)], default=0.0)
+    return dates, mtimes, config_mtime
+
+def job_digest(
+        job,
+        config,
+        image_ex,
+    ):
+    """ 
+    Hash of the parameters of a job and the settings its figure is drawn with.
+    
+    Parameters
+    ----------
+        job: dict
+            render job, see job_matrix
+        config: class
+            class of configuration settings instance
+        image_ex: str
+            image file extension e.g. "pdf"
+
+    Returns
+    -------
+        digest: str
+            sha1 hex digest
+
+    """
+    settings = {key: value for key, value in vars(config).items() if key not in render_settings_ignored}
+    settings["place"] = job["place"]
+    params = {"job": job, "image_ex": image_ex, "config": settings}
+    return hashlib.sha1(json.dumps(params, sort_keys=True, default=str).encode()).hexdigest()
+
+def digest_path(
+        path,
+    ):
+    """ 
+    Sidecar file next to an output holding the job_digest it was rendered with.
+    
+    Parameters
+    ----------
+        path: str
+            output path of job
+
+    Returns
+    -------
+        path: str
+            absolute path of .render.json file
+
+    """
+    return f"{path}.render.json"
+
+def up_to_date(
+        job,
+        path,
+        times,
+        digest,
+    ):
+    """ 
+    True if the output of a job is newer than every input in its date window and was rendered with the same parameters and settings.
+    
+    Parameters
+    ----------
+        job: dict
+            render job, see job_matrix
+        path: str
+            output path of job
+        times: tuple
+            dates, mtimes and config_mtime, see input_times
+        digest: str
+            job_digest of job
+
+    Returns
+    -------
+        fresh: bool
+            output exists and needs no render
+
+    """
+    if not os.path.exists(path) or not os.path.exists(digest_path(path)):
+        return False
+    with open(digest_path(path)) as f:
+        if json.load(f).get("digest") != digest:
+            return False
+    dates, mtimes, config_mtime = times
+    mask = np.ones(len(dates), dtype=bool)
+    if job["date_min"] is not None:
+        mask &= dates >= pd.Timestamp(job["date_min"])
+    if job["date_max"] is not None:
+        mask &= dates <= pd.Timestamp(job["date_max"])
+    latest = max(mtimes[mask].max(initial=0.0), config_mtime)
+    return os.path.getmtime(path) >= latest
+
+def warm_caches(
+        jobs,
+        roads,
+        config,
+    ):
+    """ 
+    Build the memoised projections, index and statistics of the journeys once before forking, so render processes inherit them.
+    Road maps of every date window pick their journeys from the shared frame by position, statistics are only shared by jobs over the full date range.
+    
+    Parameters
+    ----------
+        jobs: list
+            render jobs, see job_matrix
+        roads: Geopandas dataframe
+            Road journeys shared by all jobs
+        config: class
+            class of configuration settings instance
+
+    Returns
+    -------
+
+    """
+    plots = {job["plot"] for job in jobs}
+    full_range_plots = {job["plot"] for job in jobs if job["date_min"] is None and job["date_max"] is None}
+    if len(roads) == 0:
+        return
+    if "road_map" in plots:
+        spatial_index.journey_index(roads)
+        if config.road_map_mode in ["lines", "density"]:
+            projection.projected_geometry(roads, config.crs_OUT)
+    if "weekday" in full_range_plots or "hourly" in full_range_plots:
+        aggregate.statistics_cube(roads)
+    return
+
+def init_worker(
+        config,
+        roads,
+        image_ex,
+    ):
+    """ 
+    Set the shared journeys and settings of a render process.
+    
+    Parameters
+    ----------
+        config: class
+            class of configuration settings instance
+        roads: Geopandas dataframe
+            Road journeys shared by all jobs
+        image_ex: str
+            image file extension e.g. "pdf"
+
+    Returns
+    -------
+
+    """
+    worker_state["config"] = config
+    worker_state["roads"] = roads
+    worker_state["image_ex"] = image_ex
+    return
+
+def render_job(
+        job,
+    ):
+    """ 
+    Render one job with the journeys and settings of this process, see init_worker.
+    
+    Parameters
+    ----------
+        job: dict
+            render job, see job_matrix
+
+    Returns
+    -------
+        result: dict
+            job with output path, status ("rendered" or "failed: ...") and seconds taken
+
+    """
+    #Imported here so plotting is only set up once there is a job to render, in the render process or with one worker in this one
+    from roadmaps.plots import Plots
+
+    config = worker_state["config"]
+    config.place = job["place"]
+    image_ex = worker_state["image_ex"]
+    path = job_path(job, config, image_ex)
+    method = plot_types[job["plot"]][0]
+    t0 = time.perf_counter()
+    try:
+        plots_class = Plots(config, image_ex=image_ex, file_suffix=job_suffix(job))
+        getattr(plots_class, method)(worker_state["roads"], job["date_min"], job["date_max"])
+        with open(digest_path(path), "w") as f:
+            json.dump({"digest": job_digest(job, config, image_ex)}, f)
+        status = "rendered"
+    except Exception as error:
+        status = f"failed: {error!r}"
+    seconds = time.perf_counter() - t0
+    return {**job, "path": path, "status": status, "seconds": seconds}
+
+def print_report(
+        results,
+        seconds,
+    ):
+    """ 
+    Print the status and time taken of each job.
+    
+    Parameters
+    ----------
+        results: list
+            results of render
+        seconds: float
+            wall time of whole batch
+
+    Returns
+    -------
+
+    """
+    for result in results:
+        window = f"{result['date_min'] or 'start'} to {result['date_max'] or 'end'}"
+        print(f"{result['plot']:<10} {result['place']:<8} {window:<26} {result['seconds']:7.2f}s  {result['status']}")
+    n_rendered = sum(result["status"] == "rendered" for result in results)
+    n_skipped = sum(result["status"] == "skipped" for result in results)
+    n_failed = len(results) - n_rendered - n_skipped
+    print(f"{n_rendered} rendered, {n_skipped} up to date, {n_failed} failed in {seconds:.2f}s")
+    return
+
+def render(
+        jobs,
+        config = None,
+        roads = None,
+        image_ex = "pdf",
+        n_workers = None,
+        force = False,
+    ):
+    """ 
+    Render a matrix of figures headless, see job_matrix.
+    Journeys are loaded once and shared with the render processes, outputs newer than their inputs and rendered with the same settings are skipped.
+    
+    Parameters
+    ----------
+        jobs: list
+            render jobs, see job_matrix
+        config: class
+            class of configuration settings instance
+        roads: Geopandas dataframe
+            Road journeys, loaded with load_in_roads if None
+        image_ex: str
+            image file extension e.g. "pdf"
+        n_workers: int
+            number of render processes. Default config.n_workers
+        force: bool
+            render jobs even if their outputs are up to date
+
+    Returns
+    -------
+        results: list
+            job with output path, status ("rendered", "skipped" or "failed: ...") and seconds taken for each job
+
+    """
+    if config is None:
+        config = Generate_Config()
+    #Jobs set the place of their own copy of the settings
+    config = copy.copy(config)
+    config.headless = True
+    if n_workers is None:
+        n_workers = config.n_workers
+    t0 = time.perf_counter()
+
+    times = input_times(config)
+    results = [None]*len(jobs)
+    pending = []
+    for i, job in enumerate(jobs):
+        path = job_path(job, config, image_ex)
+        if not force and up_to_date(job, path, times, job_digest(job, config, image_ex)):
+            results[i] = {**job, "path": path, "status": "skipped", "seconds": 0.0}
+        else:
+            pending.append(i)
+
+    if len(pending) > 0:
+        if roads is None:
+            roads = load_in_roads(config)
+        pending_jobs = [jobs[i] for i in pending]
+        warm_caches(pending_jobs, roads, config)
+        if n_workers > 1 and len(pending) > 1:
+            #Forked processes inherit the journeys and caches without copying
+            if "fork" in multiprocessing.get_all_start_methods():
+                context = multiprocessing.get_context("fork")
+            else:
+                context = multiprocessing.get_context()
+            with ProcessPoolExecutor(
+                max_workers=min(n_workers, len(pending)),
+                mp_context=context,
+                initializer=init_worker,
+                initargs=(config, roads, image_ex),
+            ) as executor:
+                rendered = list(executor.map(render_job, pending_jobs))
+        else:
+            init_worker(config, roads, image_ex)
+            rendered = [render_job(job) for job in pending_jobs]
+        for i, result in zip(pending, rendered):
+            results[i] = result
+
+    print_report(results, time.perf_counter() - t0)
+    return results
@@ -0,0 +1,304 @@
+import os
+import json
+
+import numpy as np
+import shapely
+
+from roadmaps.cache import file_signature
+
+#Simplification tolerances of the cached levels in EPSG:3857 metres
+tolerances = [100, 1000, 10000]
+boundaries_version = 2
+
+def boundaries_dir(
+        place,
+        config,
+    ):
+    """ 
+    Directory of the boundary cache of a place.
+    
+    Parameters
+    ----------
+        place: str
+            placename of shapefiles.yaml
+        config: class
+            class of configuration settings instance
+
+    Returns
+    -------
+        path: str
+            absolute path of boundary cache directory
+
+    """
+    return f"{config.working_dir}/{config.cache_dir}/boundaries/{place}"
+
+def shapefile_path(
+        place,
+        config,
+    ):
+    """ 
+    Path of the .shp file of a place.
+    """
+    folder_path = config.shapefiles[place]["folder_path"]
+    shapefile_name = config.shapefiles[place]["shapefile_path"]
+    return f"{config.working_dir}/map_boundaries/{folder_path}/{shapefile_name}.shp"
+
+def source_signature(
+        place,
+        config,
+    ):
+    """ 
+    Size and modification time of the .shp and .dbf files of a place.
+    """
+    path = shapefile_path(place, config)
+    return {ext: file_signature(f"{os.path.splitext(path)[0]}.{ext}") for ext in ["shp", "dbf"]}
+
+def simplify_arcs(
+        geometries,
+        tolerance,
+    ):
+    """ 
+    Simplify a coverage of polygons by the arcs between the points where borders meet, each shared border once.
+    Faces whose interior lies in none of the polygons e.g. holes are dropped, polygons whose faces all collapse are simplified on their own.
+    
+    Parameters
+    ----------
+        geometries: np.array
+            polygons of the coverage
+        tolerance: float
+            simplification tolerance in the units of the geometries
+
+    Returns
+    -------
+        simplified: np.array
+            simplified polygons
+    
+    """
+    arcs = shapely.get_parts(shapely.line_merge(shapely.union_all(shapely.boundary(geometries))))
+    simplified_arcs = shapely.simplify(arcs, tolerance, preserve_topology=True)
+    faces = shapely.get_parts(shapely.polygonize(shapely.get_parts(shapely.union_all(simplified_arcs))))
+
+    face_index, region_index = shapely.STRtree(geometries).query(shapely.point_on_surface(faces), predicate="within")
+    _, first = np.unique(face_index, return_index=True)
+    face_index, region_index = face_index[first], region_index[first]
+
+    simplified = shapely.simplify(geometries, tolerance, preserve_topology=True)
+    for region in np.unique(region_index):
+        simplified[region] = shapely.union_all(faces[face_index[region_index == region]])
+    return simplified
+
+def simplify_coverage(
+        geometries,
+        tolerance,
+    ):
+    """ 
+    Simplify a coverage of polygons so neighbouring polygons still tile, shared borders are simplified once.
+    Uses shapely.coverage_simplify (shapely 2.1, GEOS 3.12) when available, otherwise simplify_arcs.
+    
+    Parameters
+    ----------
+        geometries: np.array
+            polygons of the coverage
+        tolerance: float
+            simplification tolerance in the units of the geometries
+
+    Returns
+    -------
+        simplified: np.array
+            simplified polygons
+    
+    """
+    if hasattr(shapely, "coverage_simplify"):
+        try:
+            return shapely.coverage_simplify(geometries, tolerance)
+        except shapely.errors.UnsupportedGEOSVersionError:
+            pass
+    return simplify_arcs(geometries, tolerance)
+
+def build(
+        place,
+        config,
+    ):
+    """ 
+    Read the shapefile of a place and cache it sorted by region name, with projected simplified levels and a region name index.
+    
+    Parameters
+    ----------
+        place: str
+            placename of shapefiles.yaml
+        config: class
+            class of configuration settings instance
+
+    Returns
+    -------
+        shapefile: Geopandas dataframe
+            Regions shapefiles at full resolution in their own crs
+
+    """
+    import geopandas as gpd
+    from roadmaps.projection import projected_geometry
+
+    col_name = config.shapefiles[place]["col_name"]
+    shapefile = gpd.read_file(shapefile_path(place, config))
+    shapefile = shapefile.sort_values(by=[col_name])
+
+    folder = boundaries_dir(place, config)
+    os.makedirs(folder, exist_ok=True)
+    shapefile.to_parquet(f"{folder}/regions.parquet")
+    projected = projected_geometry(shapefile, config.crs_OUT)
+    for tolerance in tolerances:
+        simplified = simplify_coverage(projected.to_numpy(), tolerance)
+        gpd.GeoDataFrame({col_name: shapefile[col_name].to_numpy()}, geometry=gpd.GeoSeries(simplified, crs=config.crs_OUT)).to_parquet(f"{folder}/simplified_{tolerance}.parquet")
+
+    meta = {
+        "version": boundaries_version,
+        "source": source_signature(place, config),
+        "crs": config.crs_OUT,
+        "tolerances": tolerances,
+        "regions": [str(name) for name in shapefile[col_name]],
+    }
+    with open(f"{folder}/meta.json", "w") as f:
+        json.dump(meta, f)
+    return shapefile
+
+def read_meta(
+        place,
+        config,
+    ):
+    """ 
+    Boundary cache meta data of a place, None if it is missing or out of date.
+    """
+    path = f"{boundaries_dir(place, config)}/meta.json"
+    if not os.path.exists(path):
+        return None
+    with open(path, "r") as f:
+        meta = json.load(f)
+    if meta.get("version") != boundaries_version or meta.get("crs") != config.crs_OUT or meta.get("tolerances") != tolerances:
+        return None
+    if meta["source"] != source_signature(place, config):
+        return None
+    return meta
+
+opened = {}
+
+def read_parquet(
+        path,
+    ):
+    """ 
+    Read a cached GeoParquet file, kept in memory until it changes on disk.
+    """
+    import geopandas as gpd
+
+    key = (path, os.stat(path).st_mtime_ns)
+    if key not in opened:
+        opened[key] = gpd.read_parquet(path)
+    return opened[key]
+
+def load_boundaries(
+        place,
+        config,
+        tolerance = None,
+    ):
+    """ 
+    Region boundaries of a place from the boundary cache, built from the shapefile when it is missing or out of date.
+    
+    Parameters
+    ----------
+        place: str
+            placename of shapefiles.yaml
+        config: class
+            class of configuration settings instance
+        tolerance: float
+            one of tolerances for projected simplified boundaries, full resolution in the shapefile crs if None
+
+    Returns
+    -------
+        shapefile: Geopandas dataframe
+            Regions sorted by region name
+
+    """
+    if read_meta(place, config) is None:
+        build(place, config)
+    name = "regions" if tolerance is None else f"simplified_{tolerance}"
+    return read_parquet(f"{boundaries_dir(place, config)}/{name}.parquet")
+
+def region_index(
+        place,
+        config,
+    ):
+    """ 
+    Row of each region in the cached boundaries of a place.
+    
+    Parameters
+    ----------
+        place: str
+            placename of shapefiles.yaml
+        config: class
+            class of configuration settings instance
+
+    Returns
+    -------
+        index: dict
+            region name: row
+
+    """
+    meta = read_meta(place, config)
+    if meta is None:
+        build(place, config)
+        meta = read_meta(place, config)
+    return {name: i for i, name in enumerate(meta["regions"])}
+
+def display_tolerance(
+        pixel,
+    ):
+    """ 
+    Coarsest cached tolerance within half an output pixel, the finest if none is.
+    
+    Parameters
+    ----------
+        pixel: float
+            output pixel size in EPSG:3857 metres
+
+    Returns
+    -------
+        tolerance: float
+            one of tolerances
+
+    """
+    fine_enough = [tolerance for tolerance in tolerances if tolerance <= pixel/2]
+    return max(fine_enough) if len(fine_enough) > 0 else min(tolerances)
+
+def display_geometry(
+        shapefile,
+        place,
+        pixel,
+        config,
+    ):
+    """ 
+    Projected region boundaries simplified for the output resolution.
+    Uses the boundary cache when the shapefile has the cached regions of the place, otherwise projects the shapefile.
+    
+    Parameters
+    ----------
+        shapefile: Geopandas dataframe
+            Regions shapefiles
+        place: str
+            placename of shapefiles.yaml
+        pixel: float
+            output pixel size in EPSG:3857 metres
+        config: class
+            class of configuration settings instance
+
+    Returns
+    -------
+        geometry: Geopandas series
+            boundaries in config.crs_OUT in the row order of shapefile
+
+    """
+    from roadmaps.projection import projected_geometry
+
+    col_name = config.shapefiles[place]["col_name"]
+    meta = read_meta(place, config)
+    if meta is not None and list(shapefile[col_name].astype(str)) == meta["regions"]:
+        return load_boundaries(place, config, display_tolerance(pixel)).geometry
+    return projected_geometry(shapefile, config.crs_OUT)
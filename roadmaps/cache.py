@@ -0,0 +1,556 @@
+import os
+import json
+import shutil
+import hashlib
+
+import numpy as np
+import pyarrow.parquet as pq
+import shapely
+
+from roadmaps.accumulators import Journey_Summary
+from roadmaps.date_index import folder_index
+
+manifest_version = 5
+
+def road_dir_key(
+        config,
+    ):
+    """ 
+    Name of the cache directories of the road maps directory, its folder name and a hash of its absolute path.
+    Road maps directories with the same folder name e.g. .../personA/Roads and .../personB/Roads are kept apart.
+    
+    Parameters
+    ----------
+        config: class
+            class of configuration settings instance
+
+    Returns
+    -------
+        key: str
+            e.g. Roads_1a2b3c4d5e6f
+
+    """
+    road_dir = os.path.abspath(os.path.join(config.working_dir, config.road_data_dir))
+    return f"{os.path.basename(road_dir)}_{hashlib.sha1(road_dir.encode()).hexdigest()[:12]}"
+
+def cache_dir(
+        config,
+    ):
+    """ 
+    Directory of the parsed journeys cache.
+    
+    Parameters
+    ----------
+        config: class
+            class of configuration settings instance
+
+    Returns
+    -------
+        path: str
+            absolute path of roads cache directory, one per road maps directory
+
+    """
+    return f"{config.working_dir}/{config.cache_dir}/roads/{road_dir_key(config)}"
+
+def partition_path(
+        source,
+        config,
+    ):
+    """ 
+    GeoParquet partition holding the parsed journeys of a .klm file.
+    
+    Parameters
+    ----------
+        source: str
+            path of .klm file
+        config: class
+            class of configuration settings instance
+
+    Returns
+    -------
+        path: str
+            absolute path of .parquet partition
+
+    """
+    name = os.path.splitext(os.path.basename(source))[0]
+    return f"{cache_dir(config)}/{name}.parquet"
+
+def summary_path(
+        source,
+        config,
+    ):
+    """ 
+    Journey summary sidecar of the partition of a .klm file.
+    
+    Parameters
+    ----------
+        source: str
+            path of .klm file
+        config: class
+            class of configuration settings instance
+
+    Returns
+    -------
+        path: str
+            absolute path of .summary.json file
+
+    """
+    name = os.path.splitext(os.path.basename(source))[0]
+    return f"{cache_dir(config)}/{name}.summary.json"
+
+def partition_dates(
+        config,
+        date_min = None,
+        date_max = None,
+    ):
+    """ 
+    Dates of the cached partitions within a date range, from a date index of the cache directory.
+    
+    Parameters
+    ----------
+        config: class
+            class of configuration settings instance
+        date_min: datetime
+            Minimum date, unbounded if None
+        date_max: datetime
+            Maximum date, unbounded if None
+
+    Returns
+    -------
+        dates: np.array
+            sorted datetime dates of cached partitions
+
+    """
+    return folder_index(cache_dir(config), config.sep, "parquet", config.date_format).query(date_min, date_max)
+
+def file_signature(
+        path,
+    ):
+    """ 
+    Cheap signature of a file used to detect changes.
+    
+    Parameters
+    ----------
+        path: str
+            path of file
+
+    Returns
+    -------
+        signature: dict
+            size in bytes and modification time in ns
+
+    """
+    stat = os.stat(path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+def file_hash(
+        path,
+    ):
+    """ 
+    Content hash of a file.
+    
+    Parameters
+    ----------
+        path: str
+            path of file
+
+    Returns
+    -------
+        hash: str
+            sha1 hex digest
+
+    """
+    sha1 = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            sha1.update(block)
+    return sha1.hexdigest()
+
+def new_manifest(
+        config,
+    ):
+    """ 
+    Empty manifest for the settings the cached values depend on.
+    
+    Parameters
+    ----------
+        config: class
+            class of configuration settings instance
+
+    Returns
+    -------
+        manifest: dict
+            manifest without files
+
+    """
+    return {
+        "version": manifest_version,
+        "road_dir": config.road_data_dir,
+        "distance_unit": config.distance_unit,
+        "time_unit": config.time_unit,
+        "klm_parser": config.klm_parser,
+        "files": {},
+    }
+
+def load_manifest(
+        config,
+    ):
+    """ 
+    Load the cache manifest, starting afresh if it is missing or was written with different settings.
+    
+    Parameters
+    ----------
+        config: class
+            class of configuration settings instance
+
+    Returns
+    -------
+        manifest: dict
+            version, units, parser and per file signature, hash and number of journeys
+
+    """
+    path = f"{cache_dir(config)}/manifest.json"
+    manifest = new_manifest(config)
+    if os.path.exists(path):
+        with open(path, "r") as f:
+            manifest_in = json.load(f)
+        if all(manifest_in.get(key) == manifest[key] for key in ["version", "road_dir", "distance_unit", "time_unit", "klm_parser"]):
+            manifest = manifest_in
+    return manifest
+
+def save_manifest(
+        manifest,
+        config,
+    ):
+    """ 
+    Write the cache manifest, replacing the previous one atomically.
+    
+    Parameters
+    ----------
+        manifest: dict
+            cache manifest
+        config: class
+            class of configuration settings instance
+
+    Returns
+    -------
+
+    """
+    os.makedirs(cache_dir(config), exist_ok=True)
+    path = f"{cache_dir(config)}/manifest.json"
+    with open(f"{path}.tmp", "w") as f:
+        json.dump(manifest, f)
+    os.replace(f"{path}.tmp", path)
+    return
+
+def is_stale(
+        source,
+        manifest,
+        config,
+    ):
+    """ 
+    Check whether the cached journeys of a .klm file need to be parsed again.
+    A changed size or modification time with unchanged contents only refreshes the manifest entry.
+    
+    Parameters
+    ----------
+        source: str
+            path of .klm file
+        manifest: dict
+            cache manifest
+        config: class
+            class of configuration settings instance
+
+    Returns
+    -------
+        stale: bool
+            True if the file is not cached or has changed
+
+    """
+    entry = manifest["files"].get(os.path.basename(source))
+    if entry is None:
+        return True
+    if entry["n_journeys"] > 0 and not os.path.exists(partition_path(source, config)):
+        return True
+    signature = file_signature(source)
+    if signature["size"] == entry["size"] and signature["mtime_ns"] == entry["mtime_ns"]:
+        return False
+    if signature["size"] == entry["size"] and file_hash(source) == entry["sha1"]:
+        entry.update(signature)
+        return False
+    return True
+
+def write_day(
+        source,
+        df_day,
+        manifest,
+        config,
+    ):
+    """ 
+    Cache the parsed journeys of a .klm file with their summary and record it in the manifest.
+    
+    Parameters
+    ----------
+        source: str
+            path of .klm file
+        df_day: Geopandas dataframe
+            Road journeys parsed from the file
+        manifest: dict
+            cache manifest, updated in place
+        config: class
+            class of configuration settings instance
+
+    Returns
+    -------
+
+    """
+    os.makedirs(cache_dir(config), exist_ok=True)
+    path = partition_path(source, config)
+    if df_day.shape[0] > 0:
+        df_day.to_parquet(path, index=False)
+        Journey_Summary.from_roads(df_day).save(summary_path(source, config))
+    else:
+        for path in [path, summary_path(source, config)]:
+            if os.path.exists(path):
+                os.remove(path)
+
+    entry = file_signature(source)
+    entry["sha1"] = file_hash(source)
+    entry["n_journeys"] = int(df_day.shape[0])
+    manifest["files"][os.path.basename(source)] = entry
+    return
+
+def read_days(
+        sources,
+        manifest,
+        config,
+    ):
+    """ 
+    Read the cached journeys of .klm files in a single pass.
+    
+    Parameters
+    ----------
+        sources: list
+            paths of .klm files, all up to date in the cache
+        manifest: dict
+            cache manifest
+        config: class
+            class of configuration settings instance
+
+    Returns
+    -------
+        days: list
+            dict of ID, date, time, geometry, distance, duration and vertex_time arrays, empty if there are no journeys
+
+    """
+    paths = [partition_path(source, config) for source in sources if manifest["files"][os.path.basename(source)]["n_journeys"] > 0]
+    if len(paths) == 0:
+        return []
+    df = pq.read_table(paths, columns=["ID", "date", "time", "geometry", "distance", "duration", "vertex_time"]).to_pandas()
+    return [{
+        "ID" : df["ID"].to_numpy(dtype=object),
+        "date" : df["date"].to_numpy(dtype="datetime64[ns]"),
+        "time" : df["time"].to_numpy(dtype=object),
+        "geometry" : shapely.from_wkb(df["geometry"].to_numpy()),
+        "distance" : df["distance"].to_numpy(dtype=float),
+        "duration" : df["duration"].to_numpy(dtype=float),
+        "vertex_time" : df["vertex_time"].to_numpy(dtype=object),
+    }]
+
+def read_summary(
+        sources,
+        manifest,
+        config,
+    ):
+    """ 
+    Merge the cached journey summaries of .klm files without reading their journeys.
+    
+    Parameters
+    ----------
+        sources: list
+            paths of .klm files, all up to date in the cache
+        manifest: dict
+            cache manifest
+        config: class
+            class of configuration settings instance
+
+    Returns
+    -------
+        summary: accumulators.Journey_Summary
+            summary of the journeys, empty if there are no journeys
+
+    """
+    summary = Journey_Summary()
+    for source in sources:
+        if manifest["files"][os.path.basename(source)]["n_journeys"] > 0:
+            summary.merge(Journey_Summary.load(summary_path(source, config)))
+    return summary
+
+def archive_dir(
+        config,
+    ):
+    """ 
+    Directory of the memory mapped journeys archive of the road map directory.
+    
+    Parameters
+    ----------
+        config: class
+            class of configuration settings instance
+
+    Returns
+    -------
+        path: str
+            absolute path of archive directory
+
+    """
+    return f"{config.working_dir}/{config.cache_dir}/archive/{road_dir_key(config)}"
+
+def archive_key(
+        sources,
+        manifest,
+    ):
+    """ 
+    Key of the cached contents of .klm files, changes when any file is added, removed or modified.
+    
+    Parameters
+    ----------
+        sources: list
+            paths of .klm files, all up to date in the cache
+        manifest: dict
+            cache manifest
+
+    Returns
+    -------
+        key: str
+            sha1 of the file names and contents
+
+    """
+    names = [os.path.basename(source) for source in sources]
+    content = "\n".join(f"{name} {manifest['files'][name]['sha1']}" for name in names)
+    return hashlib.sha1(f"{manifest_version} {manifest['distance_unit']} {manifest['time_unit']}\n{content}".encode()).hexdigest()
+
+def read_archive(
+        key,
+        config,
+    ):
+    """ 
+    Open the journeys archive memory mapped if it matches the cached .klm files.
+    
+    Parameters
+    ----------
+        key: str
+            archive_key of the current .klm files
+        config: class
+            class of configuration settings instance
+
+    Returns
+    -------
+        store: store.Journey_Store
+            memory mapped journeys in date order, None if the archive is missing or out of date
+
+    """
+    from roadmaps.store import Journey_Store
+
+    path = archive_dir(config)
+    if not os.path.exists(f"{path}/meta.json"):
+        return None
+    try:
+        store, meta = Journey_Store.open(path)
+    except (OSError, ValueError, KeyError):
+        return None
+    return store if meta.get("key") == key else None
+
+def write_archive(
+        sources,
+        manifest,
+        key,
+        config,
+    ):
+    """ 
+    Write the cached journeys of .klm files into the journeys archive.
+    
+    Parameters
+    ----------
+        sources: list
+            paths of .klm files in date order, all up to date in the cache
+        manifest: dict
+            cache manifest
+        key: str
+            archive_key of the .klm files
+        config: class
+            class of configuration settings instance
+
+    Returns
+    -------
+
+    """
+    from roadmaps.store import Journey_Store
+    from roadmaps.load import empty_columns
+
+    stores = [Journey_Store.from_columns(columns, config.crs_IN) for columns in [empty_columns()] + read_days(sources, manifest, config)]
+    Journey_Store.concatenate(stores).save(archive_dir(config), {"key": key})
+    return
+
+def rebuild(
+        config,
+    ):
+    """ 
+    Delete the cache and journeys archive and parse every .klm file in the configured date range again.
+    
+    Parameters
+    ----------
+        config: class
+            class of configuration settings instance
+
+    Returns
+    -------
+        roads: Geopandas dataframe
+            Road journeys for the configured date range
+
+    """
+    from roadmaps.load import load_in_roads
+
+    for path in [cache_dir(config), archive_dir(config)]:
+        if os.path.exists(path):
+            shutil.rmtree(path)
+    return load_in_roads(config)
+
+def verify(
+        config,
+    ):
+    """ 
+    Check every cached file against its .klm source and cached partition.
+    
+    Parameters
+    ----------
+        config: class
+            class of configuration settings instance
+
+    Returns
+    -------
+        status: dict
+            per .klm file one of "ok", "missing source", "modified", "missing cache" or "corrupt cache"
+
+    """
+    manifest = load_manifest(config)
+    status = {}
+    for name, entry in manifest["files"].items():
+        source = f"{config.working_dir}/{config.road_data_dir}/{name}"
+        path = partition_path(source, config)
+        if not os.path.exists(source):
+            status[name] = "missing source"
+        elif file_hash(source) != entry["sha1"]:
+            status[name] = "modified"
+        elif entry["n_journeys"] > 0 and not (os.path.exists(path) and os.path.exists(summary_path(source, config))):
+            status[name] = "missing cache"
+        elif entry["n_journeys"] > 0:
+            try:
+                n_rows = pq.ParquetFile(path).metadata.num_rows
+            except Exception:
+                n_rows = -1
+            status[name] = "ok" if n_rows == entry["n_journeys"] else "corrupt cache"
+        else:
+            status[name] = "ok"
+    counts = np.unique(list(status.values()), return_counts=True)
+    print(", ".join(f"{count} {state}" for state, count in zip(*counts)) if len(status) > 0 else "Cache is empty")
+    return status
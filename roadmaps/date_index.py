@@ -0,0 +1,220 @@
+import os
+import time
+import hashlib
+from datetime import datetime
+
+import numpy as np
+
+#Index instances by folder, reused across calls in a session
+indexes = {}
+
+class Date_Index:
+    def __init__(
+        self,
+        folder,
+        sep = "history-",
+        ext = "kml",
+        date_format = "%Y-%m-%d",
+        index_path = None,
+    ):
+        """ 
+        Sorted index of the dated files in a folder e.g. history-2020-01-01.kml.
+        The folder is only listed again when its modification time changes, range queries use binary search.
+        
+        Parameters
+        ----------
+        folder: str
+            absolute path of folder
+        sep: str
+            filename prefix before the date
+        ext: str
+            filename extension
+        date_format: str
+            format of the date in filenames
+        index_path: str
+            absolute path of .npz file to persist the index between sessions, not persisted if None
+
+        """
+        self.folder = folder
+        self.sep = sep
+        self.ext = ext
+        self.date_format = date_format
+        self.index_path = index_path
+
+        self.mtime = None
+        self.dates = np.array([], dtype="datetime64[D]")
+        self.names = np.array([], dtype=str)
+        self.refresh()
+
+    def refresh(self):
+        """ 
+        Bring the index up to date with the folder, listing it only if it has changed.
+        
+        Parameters
+        ----------
+
+        Returns
+        -------
+
+        """
+        if not os.path.isdir(self.folder):
+            self.mtime = None
+            self.dates = np.array([], dtype="datetime64[D]")
+            self.names = np.array([], dtype=str)
+            return
+        mtime = os.stat(self.folder).st_mtime_ns
+        if mtime == self.mtime:
+            return
+        if self.mtime is None and self.load(mtime):
+            return
+
+        names = [entry.name for entry in os.scandir(self.folder) if entry.name.startswith(self.sep) and entry.name.endswith(f".{self.ext}")]
+        dates = [name[len(self.sep):-len(self.ext)-1] for name in names]
+        if self.date_format == "%Y-%m-%d":
+            dates = np.array(dates, dtype="datetime64[D]")
+        else:
+            dates = np.array([datetime.strptime(date, self.date_format) for date in dates], dtype="datetime64[D]")
+        order = np.argsort(dates, kind="stable")
+        self.dates = dates[order]
+        self.names = np.array(names, dtype=str)[order]
+
+        #Modification times are coarse, a folder changed moments ago may change again within the same tick
+        if time.time_ns() - mtime > 2e9:
+            self.mtime = mtime
+            self.save()
+        else:
+            self.mtime = None
+        return
+
+    def load(
+        self,
+        mtime,
+    ):
+        """ 
+        Load the persisted index if it matches the folder.
+        
+        Parameters
+        ----------
+            mtime: int
+                current modification time of the folder in ns
+
+        Returns
+        -------
+            loaded: bool
+                True if the persisted index is up to date
+
+        """
+        if self.index_path is None or not os.path.exists(self.index_path):
+            return False
+        try:
+            with np.load(self.index_path) as index:
+                if str(index["folder"]) != self.folder or int(index["mtime"]) != mtime:
+                    return False
+                self.dates = index["dates"]
+                self.names = index["names"]
+        except Exception:
+            return False
+        self.mtime = mtime
+        return True
+
+    def save(self):
+        """ 
+        Persist the index.
+        
+        Parameters
+        ----------
+
+        Returns
+        -------
+
+        """
+        if self.index_path is None:
+            return
+        os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+        with open(f"{self.index_path}.tmp", "wb") as f:
+            np.savez(f, folder=self.folder, mtime=self.mtime, dates=self.dates, names=self.names)
+        os.replace(f"{self.index_path}.tmp", self.index_path)
+        return
+
+    def query(
+        self,
+        date_min = None,
+        date_max = None,
+    ):
+        """ 
+        Dates of files within an inclusive date range.
+        
+        Parameters
+        ----------
+            date_min: datetime
+                Minimum date, unbounded if None
+            date_max: datetime
+                Maximum date, unbounded if None
+
+        Returns
+        -------
+            dates: np.array
+                sorted datetime dates of files in range
+
+        """
+        self.refresh()
+        i_min = 0 if date_min is None else np.searchsorted(self.dates, np.datetime64(date_min), side="left")
+        i_max = len(self.dates) if date_max is None else np.searchsorted(self.dates, np.datetime64(date_max), side="right")
+        return self.dates[i_min:i_max].astype("datetime64[us]").astype(object)
+
+def folder_index(
+        folder,
+        sep,
+        ext,
+        date_format,
+        index_dir = None,
+    ):
+    """ 
+    Session wide date index of a folder, persisted in index_dir.
+    
+    Parameters
+    ----------
+        folder: str
+            absolute path of folder
+        sep: str
+            filename prefix before the date
+        ext: str
+            filename extension
+        date_format: str
+            format of the date in filenames
+        index_dir: str
+            absolute path of directory to persist the index in, not persisted if None
+
+    Returns
+    -------
+        index: Date_Index
+            index of the folder
+
+    """
+    folder = os.path.normpath(folder)
+    key = (folder, sep, ext)
+    if key not in indexes:
+        index_path = None
+        if index_dir is not None:
+            index_path = f"{index_dir}/{hashlib.sha1(str(key).encode()).hexdigest()[:16]}.npz"
+        indexes[key] = Date_Index(folder, sep, ext, date_format, index_path)
+    return indexes[key]
+
+def klm_index(
+        config,
+    ):
+    """ 
+    Date index of the .klm files in the road maps directory, persisted in the cache folder.
+    
+    Parameters
+    ----------
+        config: class
+            class of configuration settings instance
+
+    Returns
+    -------
+        index: Date_Index
+            index of .klm files
+
+    """
+    return folder_index(f"{config.working_dir}/{config.road_data_dir}", config.sep, config.ext, config.date_format, f"{config.working_dir}/{config.cache_dir}/index")
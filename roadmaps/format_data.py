@@ -1,20 +1,12 @@
-import matplotlib.pyplot as plt
-from matplotlib.colors import LogNorm
-from matplotlib.colors import Normalize as Norm
-from matplotlib.colors import LinearSegmentedColormap
-
 import numpy as np
 import pandas as pd
 
-from pyproj import CRS
-import utm
-
 from roadmaps.load import Generate_Config
 from roadmaps import functions
 
 def get_distance(
         df_day, 
-        config = Generate_Config(),
+        config = None,
     ):
     """ 
     Calculate the distance traveled for linestring geometries and append to dataframe. 
@@ -33,6 +25,11 @@ def get_distance(
             Road journeys for given date
 
     """
+    from pyproj import CRS
+    import utm
+
+    if config is None:
+        config = Generate_Config()
     lats = []
     longs = []
     for Linestring in df_day["geometry"].values:
@@ -53,7 +50,7 @@ def get_distance(
 
 def restrict_plot(
         place,
-        config = Generate_Config(),
+        config = None,
     ):
     """ 
     Determine the x-limits, y-limits and resolution of open source maps.
@@ -75,6 +72,8 @@ def restrict_plot(
             map resolution for open source base map download
 
     """
+    if config is None:
+        config = Generate_Config()
     if place in config.plot_bounding_box.keys():
         resolution = config.plot_bounding_box[place]["resolution"] 
 
@@ -22,6 +22,28 @@ def load_yaml(filename):
         except yaml.YAMLError as exc:
             print(exc)
     return
+
+def save_yaml(
+        data,
+        filename,
+    ):
+    """ 
+    Save python dict as yaml
+    
+    Parameters
+    ----------
+        data: dict
+            data to save
+        filename: str
+            absolute path of .yaml file 
+
+    Returns
+    -------
+
+    """
+    with open(filename, "w") as stream:
+        yaml.safe_dump(data, stream, sort_keys=False)
+    return
     
 
 def convert_distance(
@@ -155,4 +177,36 @@ def format_date_string(
     else:
         super_str = "th"
         
-    return f"{day_num}{super_str} {month_str} {year}"
\ No newline at end of file
+    return f"{day_num}{super_str} {month_str} {year}"
+
+def figure_path(
+        config,
+        name,
+        image_ex,
+        file_suffix = "",
+        place = None,
+    ):
+    """ 
+    Output path of a figure, {plot_dir}/{name}_{place}{file_suffix}.{image_ex}
+    
+    Parameters
+    ----------
+        config: class
+            class of configuration settings instance
+        name: str
+            figure name e.g. "road_map"
+        image_ex: str
+            image file extension e.g. "pdf"
+        file_suffix: str
+            appended to the file name e.g. to tell date ranges apart
+        place: str
+            placename, default config.place
+
+    Returns
+    -------
+        path: str
+            absolute path of figure file
+    """
+    if place is None:
+        place = config.place
+    return f"{config.working_dir}/{config.plot_dir}/{name}_{place}{file_suffix}.{image_ex}"
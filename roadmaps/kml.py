@@ -0,0 +1,188 @@
+import xml.etree.ElementTree as ET
+
+import numpy as np
+import pandas as pd
+
+def local_tag(tag):
+    """ 
+    Strip the xml namespace from a tag.
+    
+    Parameters
+    ----------
+        tag: str
+            tag e.g. {http://www.opengis.net/kml/2.2}Placemark
+
+    Returns
+    -------
+        tag: str
+            tag without namespace e.g. Placemark
+
+    """
+    return tag.rsplit("}", 1)[-1]
+
+def parse_coordinates(text):
+    """ 
+    Parse a .klm coordinates string into an array.
+    
+    Parameters
+    ----------
+        text: str
+            whitespace separated tuples of long,lat[,alt]
+
+    Returns
+    -------
+        coords: np.array
+            (n_points, 2 or 3) coordinates
+
+    """
+    tuples = text.split()
+    if len(tuples) == 0:
+        return np.zeros((0, 2))
+    ndim = tuples[0].count(",") + 1
+    return np.array(",".join(tuples).split(","), dtype=float).reshape(-1, ndim)
+
+def parse_track(
+        whens,
+        coords,
+    ):
+    """ 
+    Parse the when and gx:coord elements of a gx:Track into arrays.
+    
+    Parameters
+    ----------
+        whens: list
+            ISO 8601 timestamp of each point e.g. 2020-01-01T08:58:00Z
+        coords: list
+            whitespace separated long lat[ alt] of each point
+
+    Returns
+    -------
+        coords: np.array
+            (n_points, 2 or 3) coordinates
+        times: np.array
+            datetime64[ns] UTC time of each point, empty if the timestamps do not match the points
+
+    """
+    if len(coords) == 0:
+        return np.zeros((0, 2)), np.array([], dtype="datetime64[ns]")
+    ndim = len(coords[0].split())
+    points = np.array(" ".join(coords).split(), dtype=float).reshape(-1, ndim)
+    if len(whens) != len(points):
+        return points, np.array([], dtype="datetime64[ns]")
+    times = pd.to_datetime(pd.Series(whens), utc=True, format="ISO8601").dt.tz_localize(None)
+    return points, times.to_numpy(dtype="datetime64[ns]")
+
+def has_tracks(
+        path,
+        chunk_size = 1 << 20,
+    ):
+    """ 
+    Check whether a .klm file contains gx:Track or gx:MultiTrack elements, without parsing it.
+    The file is scanned in fixed size chunks overlapping by the length of the pattern, so memory use is bounded.
+    
+    Parameters
+    ----------
+        path: str
+            absolute path of .klm file
+        chunk_size: int
+            bytes read at a time
+
+    Returns
+    -------
+        tracks: bool
+            True if the file may hold track placemarks
+
+    """
+    pattern = b"Track>"
+    tail = b""
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if len(chunk) == 0:
+                return False
+            if pattern in tail + chunk:
+                return True
+            tail = chunk[-(len(pattern) - 1):]
+
+def read_driving_linestrings(
+        path,
+        activity = "Driving",
+        geometry_types = ("LineString", "Track", "MultiTrack"),
+    ):
+    """ 
+    Stream a .klm file and collect the LineString and gx:Track placemarks whose description contains the activity.
+    Other placemarks are discarded without parsing their geometry and elements are released as they are read.
+    Tracks keep the timestamp of each point, the points of a gx:MultiTrack are joined in order.
+    LineStrings are returned before Tracks, the order the fiona reader gives them in, see load.read_date_columns.
+    
+    Parameters
+    ----------
+        path: str
+            absolute path of .klm file
+        activity: str
+            activity to keep e.g. Driving
+        geometry_types: tuple
+            placemark geometries to keep, of "LineString", "Track" and "MultiTrack"
+
+    Returns
+    -------
+        descriptions: list
+            description of each kept placemark
+        coords: list
+            (n_points, 2 or 3) np.array of coordinates for each kept placemark
+        times: list
+            datetime64[ns] np.array of the time of each point for each kept placemark, empty for LineStrings
+
+    """
+    #Kept LineStrings and Tracks, as lists of descriptions, coords and times
+    lines = ([], [], [])
+    tracks = ([], [], [])
+
+    depth = 0
+    geometry_depth = None
+    geometry_type = None
+    description = ""
+    coordinates = None
+    whens, track = [], []
+    for event, elem in ET.iterparse(path, events=("start", "end")):
+        tag = local_tag(elem.tag)
+        if event == "start":
+            if tag == "Placemark":
+                depth = 1
+                geometry_depth, geometry_type = None, None
+                description, coordinates = "", None
+                whens, track = [], []
+            elif depth > 0:
+                depth += 1
+                #First geometry element directly below the placemark sets its type
+                if geometry_type is None and tag in ["Point", "LineString", "Polygon", "MultiGeometry", "Track", "MultiTrack"]:
+                    geometry_type, geometry_depth = tag, depth
+            continue
+
+        if depth == 0:
+            continue
+        if tag == "Placemark":
+            if activity in description and geometry_type in geometry_types:
+                if geometry_type == "LineString" and coordinates is not None:
+                    lines[0].append(description)
+                    lines[1].append(parse_coordinates(coordinates))
+                    lines[2].append(np.array([], dtype="datetime64[ns]"))
+                elif geometry_type in ["Track", "MultiTrack"] and len(track) > 1:
+                    points, point_times = parse_track(whens, track)
+                    tracks[0].append(description)
+                    tracks[1].append(points)
+                    tracks[2].append(point_times)
+            depth = 0
+            elem.clear()
+            continue
+        if tag == "description" and depth == 2:
+            description = elem.text or ""
+        elif tag == "coordinates" and geometry_type == "LineString" and depth == geometry_depth + 1:
+            #Keep the raw text, only parsed once the placemark is known to be kept
+            coordinates = elem.text or ""
+        elif tag == "when" and geometry_type in ["Track", "MultiTrack"] and depth > geometry_depth:
+            whens.append(elem.text or "")
+        elif tag == "coord" and geometry_type in ["Track", "MultiTrack"] and depth > geometry_depth:
+            track.append(elem.text or "")
+        depth -= 1
+    return lines[0] + tracks[0], lines[1] + tracks[1], lines[2] + tracks[2]
@@ -0,0 +1,243 @@
+import numpy as np
+import shapely
+import matplotlib as mpl
+from matplotlib.collections import LineCollection
+from matplotlib.colors import Normalize
+
+from roadmaps.store import Journey_Store
+from roadmaps.tracks import segment_index
+
+def journey_lines(
+        x,
+        y,
+        offsets,
+    ):
+    """ 
+    Coordinates of each journey as views of one (n_coordinates, 2) array.
+    
+    Parameters
+    ----------
+        x: np.array
+            x coordinates of all journeys, in order
+        y: np.array
+            y coordinates of all journeys, in order
+        offsets: np.array
+            (n_journeys + 1) start of each journey in the coordinates, see store.Journey_Store
+
+    Returns
+    -------
+        lines: list
+            (n, 2) coordinates of each journey
+
+    """
+    return np.split(np.column_stack([x, y]), offsets[1:-1])
+
+def journey_segments(
+        x,
+        y,
+        offsets,
+    ):
+    """ 
+    Segments between consecutive coordinates of each journey, none between journeys.
+    
+    Parameters
+    ----------
+        x: np.array
+            x coordinates of all journeys, in order
+        y: np.array
+            y coordinates of all journeys, in order
+        offsets: np.array
+            (n_journeys + 1) start of each journey in the coordinates, see store.Journey_Store
+
+    Returns
+    -------
+        segments: np.array
+            (n_segments, 2, 2) start and end coordinates of each segment
+        segment_journey: np.array
+            journey index of each segment
+
+    """
+    start, segment_journey = segment_index(offsets)
+    segments = np.empty((len(start), 2, 2), dtype=np.result_type(x, y))
+    segments[:,0,0] = x[start]
+    segments[:,0,1] = y[start]
+    segments[:,1,0] = x[start+1]
+    segments[:,1,1] = y[start+1]
+    return segments, segment_journey
+
+def segment_runs(
+        x,
+        y,
+        offsets,
+        values,
+        norm,
+        n_levels,
+    ):
+    """ 
+    Join consecutive segments of a journey whose values fall in the same of n_levels colour levels into one line.
+    Fewer, longer lines draw much faster than one line per segment, segments with NaN values are dropped.
+    
+    Parameters
+    ----------
+        x: np.array
+            x coordinates of all journeys, in order
+        y: np.array
+            y coordinates of all journeys, in order
+        offsets: np.array
+            (n_journeys + 1) start of each journey in the coordinates, see store.Journey_Store
+        values: np.array
+            value of each segment, see journey_segments
+        norm: matplotlib norm
+            normalisation of values onto the colour levels
+        n_levels: int
+            number of colour levels
+
+    Returns
+    -------
+        lines: list
+            (n, 2) coordinates of each run
+        run_values: np.array
+            value at the centre of the colour level of each run
+
+    """
+    start, segment_journey = segment_index(offsets)
+    scaled = np.ma.filled(norm(np.asarray(values, dtype=float)), np.nan)
+    level = np.where(np.isnan(scaled), -1, np.floor(np.clip(scaled, 0, 1)*n_levels).clip(0, n_levels - 1)).astype(np.int64)
+    new = np.ones(len(start), dtype=bool)
+    new[1:] = (segment_journey[1:] != segment_journey[:-1]) | (level[1:] != level[:-1])
+    first = np.nonzero(new)[0]
+    last = np.append(first[1:], len(start)) - 1
+    keep = level[first] >= 0
+    first, last = first[keep], last[keep]
+
+    xy = np.column_stack([x, y])
+    lines = [xy[a:b] for a, b in zip(start[first], start[last] + 2)]
+    return lines, norm.inverse((level[first] + 0.5)/n_levels)
+
+def line_collection(
+        x,
+        y,
+        offsets,
+        values = None,
+        colors = None,
+        widths = None,
+        cmap = None,
+        norm = None,
+        n_levels = None,
+        **kwargs,
+    ):
+    """ 
+    Single LineCollection of journeys from contiguous coordinate arrays.
+    values, colors and widths are per journey (length n_journeys) or per segment (length n_segments, see journey_segments).
+    Journeys are drawn as whole lines unless an array is per segment, a length matching both is taken per journey.
+    
+    Parameters
+    ----------
+        x: np.array
+            x coordinates of all journeys, in order
+        y: np.array
+            y coordinates of all journeys, in order
+        offsets: np.array
+            (n_journeys + 1) start of each journey in the coordinates, see store.Journey_Store
+        values: np.array
+            scalars coloured through cmap and norm e.g. speed, date or frequency
+        colors: np.array or str
+            colour of each line e.g. (n, 4) rgba, or a single colour
+        widths: np.array or float
+            line width of each line, or a single width
+        cmap: str or matplotlib colormap
+            colormap of values
+        norm: matplotlib norm
+            normalisation of values, from the range of values if None
+        n_levels: int
+            per segment values only, quantise the colours to n_levels levels and join consecutive segments of equal level, see segment_runs
+        **kwargs:
+            other LineCollection properties e.g. alpha, zorder
+
+    Returns
+    -------
+        collection: matplotlib LineCollection
+            journeys, add with ax.add_collection
+
+    """
+    n_journeys = len(offsets) - 1
+    arrays = [array for array in [values, widths] if array is not None and np.ndim(array) > 0]
+    #A single colour may be an rgb(a) tuple, colour arrays are (n, 3), (n, 4) or n colour names
+    if colors is not None and (np.ndim(colors) == 2 or (np.ndim(colors) == 1 and not np.issubdtype(np.asarray(colors).dtype, np.number) and len(colors) > 1)):
+        arrays.append(colors)
+    per_segment = any(len(array) != n_journeys for array in arrays)
+    if per_segment and n_levels is not None and len(arrays) == 1 and values is not None and len(values) > 0:
+        values = np.asarray(values, dtype=float)
+        if norm is None:
+            norm = Normalize(np.nanmin(values), np.nanmax(values))
+        lines, run_values = segment_runs(x, y, offsets, values, norm, n_levels)
+        cmap = mpl.colormaps.get_cmap(cmap).resampled(n_levels)
+        collection = LineCollection(lines, colors=colors, linewidths=widths, cmap=cmap, norm=norm, **kwargs)
+        collection.set_array(run_values)
+        return collection
+    if per_segment:
+        lines, _ = journey_segments(x, y, offsets)
+        for array in arrays:
+            if len(array) != len(lines):
+                raise ValueError(f"Expected {n_journeys} journey or {len(lines)} segment values, got {len(array)}")
+    else:
+        lines = journey_lines(x, y, offsets)
+
+    collection = LineCollection(lines, colors=colors, linewidths=widths, cmap=cmap, norm=norm, **kwargs)
+    if values is not None:
+        collection.set_array(np.asarray(values))
+    return collection
+
+def store_collection(
+        journeys,
+        crs = None,
+        **kwargs,
+    ):
+    """ 
+    LineCollection of a Journey_Store, see line_collection.
+    
+    Parameters
+    ----------
+        journeys: store.Journey_Store
+            journeys to draw
+        crs: str
+            map crs e.g. "EPSG:3857", the crs of the store if None
+        **kwargs:
+            values, colors, widths and other arguments of line_collection
+
+    Returns
+    -------
+        collection: matplotlib LineCollection
+            journeys, add with ax.add_collection
+
+    """
+    if crs is not None and str(crs) != str(journeys.crs):
+        journeys = journeys.project(crs)
+    return line_collection(journeys.x, journeys.y, journeys.offsets, **kwargs)
+
+def geometry_collection(
+        geometry,
+        **kwargs,
+    ):
+    """ 
+    LineCollection of journey linestrings without converting each geometry, see line_collection.
+    
+    Parameters
+    ----------
+        geometry: Geopandas series or store.Journey_Store
+            journeys to draw, already in the map crs
+        **kwargs:
+            values, colors, widths and other arguments of line_collection
+
+    Returns
+    -------
+        collection: matplotlib LineCollection
+            journeys, add with ax.add_collection
+
+    """
+    if isinstance(geometry, Journey_Store):
+        return store_collection(geometry, **kwargs)
+    geometries = geometry.to_numpy()
+    coords = shapely.get_coordinates(geometries)
+    offsets = np.append(0, np.cumsum(shapely.get_num_coordinates(geometries)))
+    return line_collection(coords[:,0], coords[:,1], offsets, **kwargs)
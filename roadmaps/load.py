@@ -1,19 +1,40 @@
 from pathlib import Path
 import os
-import glob
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 
 import numpy as np
 import pandas as pd
 import geopandas as gpd
+from shapely.geometry import LineString
 
 from datetime import datetime
 
-import fiona
-# enable KML support which is disabled by default
-fiona.drvsupport.supported_drivers['kml'] = 'rw' 
-fiona.drvsupport.supported_drivers['KML'] = 'rw' 
+from roadmaps.functions import convert_distance, convert_time, load_yaml, save_yaml
+from roadmaps import kml, cache
+from roadmaps.date_index import klm_index
 
-from roadmaps.functions import convert_distance, convert_time, load_yaml
+def normalise_place(
+        place,
+    ):
+    """ 
+    Placename as used for bounding boxes, shapefiles and file names.
+    
+    Parameters
+    ----------
+        place: str 
+            placename. ["canada", "uk", "usa", "world"]
+
+    Returns
+    -------
+        place: str
+            lower case placename, "world" is "countries"
+
+    """
+    place = place.lower()
+    if place == "world":
+        place = "countries"
+    return place
 
 class Generate_Config:
     def __init__(
@@ -29,10 +50,7 @@ class Generate_Config:
             placename. ["canada", "uk", "usa", "world"]
 
         """
-        place = place.lower()
-        if place == "world":
-            place = "countries"
-        self.place = place.lower()
+        self.place = normalise_place(place)
         
         self.set_fixed()
         self.load_config()
@@ -78,6 +96,15 @@ class Generate_Config:
         self.places_data_dir = yaml_in["places_folder"]
         self.plot_dir        = yaml_in["plots_folder"]
 
+        self.n_workers = yaml_in["n_workers"]
+        if self.n_workers == -1:
+            self.n_workers = os.cpu_count()
+        self.klm_parser = yaml_in["klm_parser"]
+        self.use_cache = yaml_in["use_cache"]
+        self.use_boundary_cache = yaml_in["use_boundary_cache"]
+        self.cache_dir = yaml_in["cache_folder"]
+        self.use_archive = yaml_in["use_archive"]
+
         self.default_date_min = datetime.fromisoformat(yaml_in["date_min"])
         self.default_date_max = datetime.fromisoformat(yaml_in["date_max"])
         self.date_min         = self.default_date_min
@@ -91,6 +118,15 @@ class Generate_Config:
         self.n_colours        = yaml_in["n_colours"] 
         self.cmap             = yaml_in["cmap"] 
         self.dpi              = yaml_in["dpi"]
+        self.headless         = yaml_in["headless"]
+        self.simplify_roads   = yaml_in["simplify_roads"]
+        self.road_map_mode    = yaml_in["road_map_mode"]
+        self.speed_cmap       = yaml_in["speed_cmap"]
+        self.speed_levels     = yaml_in["speed_levels"]
+        self.tile_source      = yaml_in["tile_source"]
+        self.tile_attribution = yaml_in["tile_attribution"]
+        self.tile_cache_mb    = yaml_in["tile_cache_mb"]
+        self.tiles_offline    = yaml_in["tiles_offline"]
         return
 
     def change_dir(
@@ -160,10 +196,10 @@ class Generate_Config:
         return
     
 def glob_dates(
-        config = Generate_Config(),
+        config = None,
     ):
     """ 
-    Collect dates of .klm files in road maps directory
+    Collect dates of .klm files in road maps directory from the sorted file index
     
     Parameters
     ----------
@@ -176,82 +212,349 @@ def glob_dates(
             datetime dates of existing .klm road map files
 
     """
-    dates = [history.split(config.sep)[-1].split(".")[0] for history in glob.glob(f'{config.working_dir}/{config.road_data_dir}/{config.sep}*.{config.ext}')]
-    dates = [datetime.strptime(date, config.date_format) for date in dates]
-    dates.sort()
-    return np.array(dates)
+    if config is None:
+        config = Generate_Config()
+    return klm_index(config).query()
+
+def klm_path(
+        date,
+        config = None,
+    ):
+    """ 
+    Path of the .klm file for given date.
+    
+    Parameters
+    ----------
+        date: datetime
+            date of .klm file
+        config: class
+            class of configuration settings instance
+
+    Returns
+    -------
+        path: str
+            absolute path of .klm file
+
+    """
+    if config is None:
+        config = Generate_Config()
+    return f'{config.working_dir}/{config.road_data_dir}/{config.sep}{date.strftime(config.date_format)}.{config.ext}'
+
+def read_date_columns(
+        date,
+        config = None,
+    ):
+    """ 
+    Read in .klm from road map directory for given date into per-column arrays.
+    
+    Parameters
+    ----------
+        date: datetime
+            date of .klm file
+        config: class
+            class of configuration settings instance
+
+    Returns
+    -------
+        columns: dict
+            arrays of ID, date, time, geometry, distance, duration and vertex_time for each driving journey
+
+    """
+    if config is None:
+        config = Generate_Config()
+    path = klm_path(date, config)
+    if config.klm_parser == "stream":
+        descriptions, coords, vertex_times = kml.read_driving_linestrings(path)
+        descriptions = pd.Series(descriptions, dtype=object)
+        geometries = np.array([LineString(coord) for coord in coords], dtype=object)
+    else:
+        import fiona
+        # enable KML support which is disabled by default
+        fiona.drvsupport.supported_drivers['kml'] = 'rw' 
+        fiona.drvsupport.supported_drivers['KML'] = 'rw' 
+
+        df_day = gpd.read_file(path, driver='KML')
+        #Only keep 'Driving' data formatted as LineStrings datatype.
+        keep = (df_day.geom_type == "LineString") & df_day["Description"].str.contains("Driving", regex=False).fillna(False).astype(bool)
+        descriptions = df_day.loc[keep, "Description"].astype(object).reset_index(drop=True)
+        geometries = df_day.loc[keep, "geometry"].to_numpy(dtype=object)
+        vertex_times = None
+        #The GDAL KML driver does not read gx:Track placemarks, they are appended after the LineStrings as by the stream parser
+        if kml.has_tracks(path):
+            track_descriptions, track_coords, track_times = kml.read_driving_linestrings(path, geometry_types=("Track", "MultiTrack"))
+            if len(track_descriptions) > 0:
+                vertex_times = [np.array([], dtype="datetime64[ns]")]*len(descriptions) + track_times
+                descriptions = pd.concat([descriptions, pd.Series(track_descriptions, dtype=object)], ignore_index=True)
+                geometries = np.concatenate([geometries, np.array([LineString(coord) for coord in track_coords], dtype=object)])
+    return parse_descriptions(date, descriptions, geometries, config, vertex_times)
+
+def parse_descriptions(
+        date,
+        descriptions,
+        geometries,
+        config = None,
+        vertex_times = None,
+    ):
+    """ 
+    Extract start and end times and distances from the driving descriptions in bulk.
+    Descriptions are formatted as "Driving from <start> to <end>. Distance <distance>m", journeys that do not match are dropped.
+    
+    Parameters
+    ----------
+        date: datetime
+            date of .klm file
+        descriptions: pd.Series
+            description of each driving journey
+        geometries: np.array
+            LineString of each driving journey
+        config: class
+            class of configuration settings instance
+        vertex_times: list
+            datetime64[ns] np.array of the time of each coordinate of each driving journey, empty if unknown. None if all unknown
+
+    Returns
+    -------
+        columns: dict
+            arrays of ID, date, time, geometry, distance, duration and vertex_time for each driving journey
+
+    """
+    if config is None:
+        config = Generate_Config()
+    if len(descriptions) == 0:
+        return empty_columns()
+    parts = descriptions.str.extract(r"from (?P<start>\S+) to (?P<end>\S+)\. Distance (?P<distance>[\d.]+)m")
+    matched = parts.notna().all(axis=1).to_numpy()
+    parts = parts[matched]
+
+    T_start = pd.to_datetime(parts["start"], format=config.klm_date_format)
+    T_end = pd.to_datetime(parts["end"], format=config.klm_date_format)
+
+    count = len(parts)
+    vertex_time = np.empty(len(descriptions), dtype=object)
+    if vertex_times is None:
+        vertex_time.fill(np.array([], dtype="datetime64[ns]"))
+    else:
+        vertex_time[:] = pd.Series(vertex_times, dtype=object).to_numpy()
+    return {
+        "ID" : np.array([f"{date.strftime(config.date_format)}_{i}" for i in range(count)], dtype=object),
+        "date" : np.full(count, np.datetime64(date, "ns")),
+        "time" : T_start.dt.time.to_numpy(dtype=object),
+        "geometry" : geometries[matched],
+        "distance" : parts["distance"].to_numpy(dtype=float)/convert_distance(config.distance_unit),
+        "duration" : (T_end-T_start).dt.total_seconds().to_numpy(dtype=float)/convert_time(config.time_unit),
+        "vertex_time" : vertex_time[matched],
+    }
+
+def empty_columns():
+    """ 
+    Empty per-column arrays of road journeys.
+    
+    Parameters
+    ----------
+
+    Returns
+    -------
+        columns: dict
+            empty typed arrays of ID, date, time, geometry, distance, duration and vertex_time
+
+    """
+    return {
+        "ID" : np.array([], dtype=object),
+        "date" : np.array([], dtype="datetime64[ns]"),
+        "time" : np.array([], dtype=object),
+        "geometry" : np.array([], dtype=object),
+        "distance" : np.array([], dtype=float),
+        "duration" : np.array([], dtype=float),
+        "vertex_time" : np.array([], dtype=object),
+    }
+
+def build_roads(
+        days,
+        config = None,
+    ):
+    """ 
+    Build the road journeys geopandas dataframe from per-day column arrays in a single allocation.
+    
+    Parameters
+    ----------
+        days: list
+            dict of column arrays for each day, see read_date_columns
+        config: class
+            class of configuration settings instance
+
+    Returns
+    -------
+        df: Geopandas dataframe
+            Road journeys, empty but correctly typed if there are no journeys
+
+    """
+    if config is None:
+        config = Generate_Config()
+    days = [empty_columns()] + list(days)
+    columns = {key: np.concatenate([day[key] for day in days]) for key in days[0].keys()}
+    with np.errstate(divide="ignore", invalid="ignore"):
+        speed = columns["distance"] / columns["duration"]
+    df = gpd.GeoDataFrame(data={
+        "ID" : pd.Series(columns["ID"], dtype=str),
+        "date" : columns["date"],
+        "time" : columns["time"],
+        "geometry" : gpd.GeoSeries(columns["geometry"], crs=config.crs_IN),
+        "distance" : columns["distance"],
+        "duration" : columns["duration"],
+        "speed" : speed,
+        "vertex_time" : columns["vertex_time"],
+    }, crs=config.crs_IN)
+    return df
 
 def read_date_KLM(
         date,
-        config = Generate_Config(),
+        config = None,
     ):
     """ 
     Read in .klm from road map directory for given date and format into suitable geopandas dataframe.
     
     Parameters
     ----------
-        date: str
-            Format YYYY-MM-DD e.g. 2020-01-01
+        date: datetime
+            date of .klm file
         config: class
             class of configuration settings instance
 
     Returns
     -------
         df: Geopandas dataframe
-            Road journeys for given date
+            Road journeys for given date, None if there are no driving journeys
 
     """
-    df_day = gpd.read_file(f'{config.working_dir}/{config.road_data_dir}/{config.sep}{date.strftime(config.date_format)}.{config.ext}', driver='KML')
-   
-    ids = []
-    dates = []
-    geopaths = []
-    durations = []
-    time_starts = []
-    g_distances = []
-    
-    count = 0
-    for row in range(df_day.shape[0]):
-        #Only keep 'Driving' data formatted as LineStrings datatype.
-        if df_day.iloc[row,:]["geometry"].__class__.__name__ != "LineString" or "Driving" not in df_day.iloc[row]["Description"]:
-            pass
-        else:
-            description = df_day.iloc[row,:]['Description']
-            description=description.replace("Driving from ", ',').replace(" to ", ',').replace(". Distance ", ',').replace("m", ',')
-            description=description.split(",")
-
-            T_start = datetime.strptime(description[1], config.klm_date_format)
-            T_end = datetime.strptime(description[2], config.klm_date_format)
-            duration = (T_end-T_start).seconds/convert_time(config.time_unit)
-            distance = float(description[3])/convert_distance(config.distance_unit)
-
-            ids.append(f"{date.strftime(config.date_format)}_{count}")
-            dates.append(date)
-            geopaths.append(df_day.iloc[row,:]["geometry"])
-            time_starts.append(T_start.time())
-            durations.append(duration)
-            g_distances.append(distance) 
-            count += 1
-
-    if count == 0:
+    if config is None:
+        config = Generate_Config()
+    columns = read_date_columns(date, config)
+    if len(columns["ID"]) == 0:
         return
-    else:
-        df = gpd.GeoDataFrame(data={
-            "ID" : ids,
-            "date" : dates,
-            "time" : time_starts,
-            'geometry' : geopaths,
-            "distance" : g_distances,
-            "duration" : durations,
-        }, crs=config.crs_IN)
-        df["speed"] = df["distance"] / df["duration"]
-        return df
+    return build_roads([columns], config)
+    
+def read_dates_columns(
+        dates,
+        config = None,
+    ):
+    """ 
+    Read in .klm from road map directory for several dates into per-column arrays.
+    Days are read in parallel when config.n_workers > 1, results are returned in date order.
     
+    Parameters
+    ----------
+        dates: np.array
+            datetime dates of .klm files
+        config: class
+            class of configuration settings instance
+
+    Returns
+    -------
+        days: list
+            dict of column arrays for each date, see read_date_columns
+
+    """
+    if config is None:
+        config = Generate_Config()
+    if config.n_workers > 1 and len(dates) > 1:
+        chunksize = max(1, len(dates) // (4*config.n_workers))
+        with ProcessPoolExecutor(max_workers=config.n_workers) as executor:
+            #map returns in submission order so the merge is deterministic
+            return list(executor.map(read_date_columns, dates, repeat(config), chunksize=chunksize))
+    return [read_date_columns(date, config) for date in dates]
+
+def update_cache(
+        dates,
+        config = None,
+    ):
+    """ 
+    Parse new or changed .klm files for several dates into the parsed journeys cache.
+    
+    Parameters
+    ----------
+        dates: np.array
+            datetime dates of .klm files
+        config: class
+            class of configuration settings instance
+
+    Returns
+    -------
+        sources: list
+            paths of .klm files, all up to date in the cache
+        manifest: dict
+            cache manifest
+
+    """
+    if config is None:
+        config = Generate_Config()
+    manifest = cache.load_manifest(config)
+    sources = [klm_path(date, config) for date in dates]
+    stale = np.array([cache.is_stale(source, manifest, config) for source in sources], dtype=bool)
+
+    stale_dates = dates[stale]
+    for date, columns in zip(stale_dates, read_dates_columns(stale_dates, config)):
+        cache.write_day(klm_path(date, config), build_roads([columns], config), manifest, config)
+    cache.save_manifest(manifest, config)
+    return sources, manifest
+
+def read_cached_dates_columns(
+        dates,
+        config = None,
+    ):
+    """ 
+    Read in journeys for several dates from the parsed journeys cache, parsing only new or changed .klm files.
+    
+    Parameters
+    ----------
+        dates: np.array
+            datetime dates of .klm files
+        config: class
+            class of configuration settings instance
+
+    Returns
+    -------
+        days: list
+            dict of column arrays, see read_date_columns
+
+    """
+    if config is None:
+        config = Generate_Config()
+    sources, manifest = update_cache(dates, config)
+    return cache.read_days(sources, manifest, config)
+
+def load_in_summary(
+        config = None,
+    ):
+    """ 
+    Summarise all .klm from road map directory for given date range from the per day summaries kept in the parsed journeys cache.
+    Individual journeys are never loaded, only new or changed files are parsed.
+    
+    Parameters
+    ----------
+        config: class
+            class of configuration settings instance
+
+    Returns
+    -------
+        summary: accumulators.Journey_Summary
+            Histograms and quantile sketches of the road journeys for given date range
+
+    """
+    if config is None:
+        config = Generate_Config()
+    dates = klm_index(config).query(config.date_min, config.date_max)
+    sources, manifest = update_cache(dates, config)
+    return cache.read_summary(sources, manifest, config)
+
 def load_in_roads(
-        config = Generate_Config(),
+        config = None,
     ):
     """ 
     Read in all .klm from road map directory for given date range and format into suitable geopandas dataframe.
+    Days are read in parallel when config.n_workers > 1, results are merged in date order.
+    Each day is read into column arrays and the dataframe is built once at the end.
+    With config.use_cache parsed days are kept in a GeoParquet cache and only new or changed files are parsed.
+    With config.use_archive journeys are built from the memory mapped journeys archive, see load_in_archive.
     
     Parameters
     ----------
@@ -261,38 +564,186 @@ def load_in_roads(
     Returns
     -------
         roads: Geopandas dataframe
-            Road journeys for given date range
+            Road journeys for given date range, empty if no journeys are found
 
     """
-    #glob all dates
-    dates = glob_dates(config)
+    if config is None:
+        config = Generate_Config()
+    if config.use_archive:
+        return load_in_archive(config).to_roads()
+    #Dates in range from the sorted file index
+    dates = klm_index(config).query(config.date_min, config.date_max)
+
+    if config.use_cache:
+        days = read_cached_dates_columns(dates, config)
+    else:
+        days = read_dates_columns(dates, config)
+
+    #Get directly from the Google KLM instead...
+    #df_day["distance"] = get_distance(df_day, config)
 
-    #Truncate Dates
-    dates = dates[dates >= config.date_min]
-    dates = dates[dates <= config.date_max]
+    return build_roads(days, config)
+
+def load_in_archive(
+        config = None,
+    ):
+    """ 
+    Open the journeys of all .klm in the road map directory from the memory mapped journeys archive and slice the given date range.
+    The archive is rebuilt from the parsed journeys cache when .klm files are added or changed.
+    The date range is a view, columns are read lazily and shared between processes through the page cache.
     
-    count = 0
-    for date in dates:
-        df_day = read_date_KLM(date, config)        
-        if df_day is None:
-            continue
+    Parameters
+    ----------
+        config: class
+            class of configuration settings instance
+
+    Returns
+    -------
+        store: store.Journey_Store
+            read only road journeys for given date range
+
+    """
+    if config is None:
+        config = Generate_Config()
+    sources, manifest = update_cache(klm_index(config).query(), config)
+    key = cache.archive_key(sources, manifest)
+    store = cache.read_archive(key, config)
+    if store is None:
+        cache.write_archive(sources, manifest, key, config)
+        store = cache.read_archive(key, config)
+    return store.date_range(config.date_min, config.date_max)
+
+def load_in_store(
+        config = None,
+        dtype = np.float64,
+    ):
+    """ 
+    Read in all .klm from road map directory for given date range into a columnar journey store, see load_in_roads.
+    With config.use_archive the store is memory mapped from the journeys archive, see load_in_archive.
+    
+    Parameters
+    ----------
+        config: class
+            class of configuration settings instance
+        dtype: np.dtype
+            coordinate precision, float64 or float32. The archive is float64
+
+    Returns
+    -------
+        store: store.Journey_Store
+            Road journeys for given date range
+
+    """
+    from roadmaps.store import Journey_Store
+
+    if config is None:
+        config = Generate_Config()
+    if config.use_archive:
+        return load_in_archive(config)
+    dates = klm_index(config).query(config.date_min, config.date_max)
+
+    if config.use_cache:
+        days = read_cached_dates_columns(dates, config)
+    else:
+        days = read_dates_columns(dates, config)
+    #Days are popped from the end so their columns are released as they are converted
+    days.reverse()
+    stores = [Journey_Store.from_columns(empty_columns(), config.crs_IN, dtype)]
+    while len(days) > 0:
+        stores.append(Journey_Store.from_columns(days.pop(), config.crs_IN, dtype))
+    return Journey_Store.concatenate(stores)
+
+class Roads_Ingestor:
+    def __init__(
+        self,
+        config = None,
+        roads = None,
+    ):
+        """ 
+        Incremental, append-only ingestion of road journeys.
+        Keeps a manifest of the .klm files already ingested so that update only parses new or modified days.
+        
+        Parameters
+        ----------
+        config: class
+            class of configuration settings instance
+        roads: Geopandas dataframe
+            Road journeys already loaded from the current .klm files. Loaded with load_in_roads if None.
+
+        """
+        if config is None:
+            config = Generate_Config()
+        self.config = config
+        if roads is None:
+            signatures = self.scan()
+            self.roads = load_in_roads(config)
+            self.ingested = signatures
         else:
-            count += 1
+            self.roads = roads
+            loaded = set(pd.to_datetime(roads["date"].unique()))
+            self.ingested = {date: signature for date, signature in self.scan().items() if date in loaded}
+
+    def scan(self):
+        """ 
+        Signatures of the .klm files in the configured date range.
         
-        #Get directly from the Google KLM instead...
-        #df_day["distance"] = get_distance(df_day, config)
+        Parameters
+        ----------
+
+        Returns
+        -------
+            signatures: dict
+                date to size and modification time of each .klm file
+
+        """
+        dates = klm_index(self.config).query(self.config.date_min, self.config.date_max)
+        return {date: cache.file_signature(klm_path(date, self.config)) for date in dates}
+
+    def update(self):
+        """ 
+        Append the journeys of new .klm files and replace those of modified files.
+        Rows of other days are kept as they are, deleted files are ignored.
+        
+        Parameters
+        ----------
+
+        Returns
+        -------
+            n_new: int
+                number of journeys read
 
-        if count == 1:
-            roads = df_day
+        """
+        signatures = self.scan()
+        changed = np.array(sorted([date for date, signature in signatures.items() if self.ingested.get(date) != signature]))
+        if len(changed) == 0:
+            return 0
+
+        if self.config.use_cache:
+            days = read_cached_dates_columns(changed, self.config)
         else:
-            roads = pd.concat([roads, df_day], ignore_index = True)
-    return roads
+            days = read_dates_columns(changed, self.config)
+        roads_new = build_roads(days, self.config)
+
+        roads = self.roads
+        modified = [date for date in changed if date in self.ingested]
+        if len(modified) > 0:
+            roads = roads[~roads["date"].isin(modified)]
+        backfill = roads.shape[0] > 0 and roads_new.shape[0] > 0 and roads_new["date"].min() < roads["date"].max()
+        roads = pd.concat([roads, roads_new], ignore_index = True)
+        if backfill:
+            #Keep date order for days older than the latest ingested
+            roads = roads.sort_values("date", kind="stable", ignore_index = True)
+
+        self.roads = roads
+        self.ingested.update({date: signatures[date] for date in changed})
+        return roads_new.shape[0]
 
 def load_in_shapefile(
-        config = Generate_Config(),
+        config = None,
     ):
     """ 
-    Load in shapefiles for the available regions.
+    Load in shapefiles for the available regions, sorted by region name.
+    With config.use_boundary_cache they are read from the boundary cache, see boundaries.load_boundaries.
     
     Parameters
     ----------
@@ -306,6 +757,11 @@ def load_in_shapefile(
 
     
     """
+    if config is None:
+        config = Generate_Config()
+    if config.use_boundary_cache:
+        from roadmaps import boundaries
+        return boundaries.load_boundaries(config.place, config).copy()
     folder_path = config.shapefiles[config.place]["folder_path"]
     shapefile_path = config.shapefiles[config.place]["shapefile_path"]
     col_name = config.shapefiles[config.place]["col_name"]
@@ -317,7 +773,8 @@ def load_in_shapefile(
     return shapefile
 
 def load_in_places(
-        config = Generate_Config(),
+        config = None,
+        driven = False,
     ):
     """ 
     Load in the places been yaml.
@@ -326,6 +783,8 @@ def load_in_places(
     ----------
         config: class
             class of configuration settings instance
+        driven: bool
+            load the places detected from driving data, see detect_places
 
     Returns
     -------
@@ -333,6 +792,52 @@ def load_in_places(
             Places been dictionary of booleans
     
     """
-    places_path = f"{config.working_dir}/{config.places_data_dir}/{config.place}.yaml"
+    if config is None:
+        config = Generate_Config()
+    name = f"{config.place}_driven" if driven else config.place
+    places_path = f"{config.working_dir}/{config.places_data_dir}/{name}.yaml"
     data = load_yaml(places_path)
+    return data
+
+def detect_places(
+        config = None,
+        roads = None,
+        shapefile = None,
+    ):
+    """ 
+    Detect the regions driven through by joining the journeys with the region shapefiles,
+    and save them to the places directory as <place>_driven.yaml with first visit dates and distance per region.
+    Cities and region keys are kept from the hand maintained <place>.yaml if it exists, see regions.config_region_keys.
+    
+    Parameters
+    ----------
+        config: class
+            class of configuration settings instance
+        roads: Geopandas dataframe
+            Road journeys, loaded with load_in_roads if None
+        shapefile: Geopandas dataframe
+            Regions shapefiles, loaded with load_in_shapefile if None
+
+    Returns
+    -------
+        data: dict
+            Places been dictionary of booleans, see load_in_places
+    
+    """
+    from roadmaps import regions
+
+    if config is None:
+        config = Generate_Config()
+    if roads is None:
+        roads = load_in_roads(config)
+    if shapefile is None:
+        shapefile = load_in_shapefile(config)
+
+    visits = regions.visited_regions(roads, shapefile, config.shapefiles[config.place]["col_name"])
+    places_path = f"{config.working_dir}/{config.places_data_dir}/{config.place}.yaml"
+    places = (load_yaml(places_path) if os.path.exists(places_path) else None) or {}
+    region_keys = list(places["region"]) if places.get("region") is not None else None
+    data = regions.places_from_visits(visits, places.get("cities"), region_keys)
+
+    save_yaml(data, f"{config.working_dir}/{config.places_data_dir}/{config.place}_driven.yaml")
     return data
\ No newline at end of file
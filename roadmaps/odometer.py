@@ -0,0 +1,94 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from roadmaps import functions
+
+def load_odometer(
+        config,
+    ):
+    """ 
+    Load odometer readings from odometer.yaml in the road maps directory.
+    Either a single vehicle, {distance_unit: , odometer: {date: reading}},
+    or several, {vehicles: {name: {distance_unit: , odometer: {date: reading}}}}.
+    
+    Parameters
+    ----------
+        config: class
+            class of configuration settings instance
+
+    Returns
+    -------
+        readings: pd.DataFrame
+            vehicle, date and reading in config.distance_unit sorted by vehicle and date, empty if there are none
+
+    """
+    readings = pd.DataFrame({
+        "vehicle" : pd.Series([], dtype=object),
+        "date" : pd.Series([], dtype="datetime64[ns]"),
+        "reading" : pd.Series([], dtype=float),
+    })
+    odometer_file = f'{config.working_dir}/{config.road_data_dir}/odometer.yaml'
+    if not os.path.exists(odometer_file):
+        return readings
+    odometer = functions.load_yaml(odometer_file)
+    if odometer is None:
+        return readings
+
+    if odometer.get("vehicles") is not None:
+        vehicles = odometer["vehicles"]
+    else:
+        vehicles = {"default": odometer}
+
+    frames = [readings]
+    for vehicle, vehicle_odometer in vehicles.items():
+        #Check odometer not empty
+        if vehicle_odometer is None or vehicle_odometer.get("odometer") is None:
+            continue
+        unit_factor = functions.convert_distance(vehicle_odometer["distance_unit"])/functions.convert_distance(config.distance_unit)
+        frames.append(pd.DataFrame({
+            "vehicle" : vehicle,
+            "date" : pd.to_datetime([str(date) for date in vehicle_odometer["odometer"].keys()]).as_unit("ns"),
+            "reading" : np.array(list(vehicle_odometer["odometer"].values()), dtype=float)*unit_factor,
+        }))
+    readings = pd.concat(frames, ignore_index=True)
+    return readings.sort_values(["vehicle", "date"], kind="stable", ignore_index=True)
+
+def align_odometer(
+        readings,
+        daily,
+    ):
+    """ 
+    Align odometer readings to the cumulative distance series.
+    Readings are matched to days by binary search, readings outside the series are dropped.
+    
+    Parameters
+    ----------
+        readings: pd.DataFrame
+            output of load_odometer
+        daily: pd.DataFrame
+            output of aggregate.daily_series
+
+    Returns
+    -------
+        aligned: pd.DataFrame
+            vehicle, date, reading and
+            cum_distance: cumulative distance at the end of the day of the reading
+            offset: per vehicle mean of reading - cum_distance, odometer reading before the series
+            drift: difference of the odometer and recorded distances since the previous reading of the vehicle
+
+    """
+    days = daily.index.to_numpy(dtype="datetime64[ns]")
+    reading_days = readings["date"].dt.normalize().to_numpy(dtype="datetime64[ns]")
+    day_index = np.searchsorted(days, reading_days)
+    matched = day_index < len(days)
+    matched[matched] = days[day_index[matched]] == reading_days[matched]
+
+    aligned = readings[matched].reset_index(drop=True)
+    aligned["cum_distance"] = daily["cum_distance"].to_numpy()[day_index[matched]]
+
+    difference = aligned["reading"] - aligned["cum_distance"]
+    aligned["offset"] = difference.groupby(aligned["vehicle"]).transform("mean")
+    aligned["drift"] = difference.groupby(aligned["vehicle"]).diff().fillna(0.0)
+    return aligned
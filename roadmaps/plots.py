@@ -1,35 +1,33 @@
 from roadmaps.plots_format import fig_initialize, set_size
-fig_initialize()
 
 import os
 
 from roadmaps.load import Generate_Config
-from roadmaps import format_data, functions
+from roadmaps import accumulators, aggregate, boundaries, format_data, functions, lines, odometer, projection, raster, simplify, spatial_index, tiles, tracks
+from roadmaps.store import Journey_Store
 
+import matplotlib as mpl
 import matplotlib.pyplot as plt
 from matplotlib.colors import LogNorm
 from matplotlib.colors import Normalize as Norm
 from matplotlib.colors import LinearSegmentedColormap
+from matplotlib import animation
 import matplotlib.dates as mdates
 tick_days = mdates.DayLocator() # every Day
 tick_weeks = mdates.WeekdayLocator(byweekday=mdates.MO, interval=1)  # every Monday
 tick_months = mdates.MonthLocator() # every month
 tick_years = mdates.YearLocator() # every year
 
-import geoplot.crs as gcrs
-
 from datetime import datetime, timedelta
 
 import numpy as np
 import pandas as pd
 import math
-import contextily as ctx
-from pyproj import Proj
 
 class Plots:
     def __init__(
         self, 
-        config = Generate_Config(),
+        config = None,
 
         road_line_color = None,
         n_colours = None,
@@ -38,11 +36,16 @@ class Plots:
         
         dpi = None,
         image_ex = "pdf",
+        file_suffix = "",
         
     ):
+        if config is None:
+            config = Generate_Config()
         self.config = config
         self.image_ex = image_ex
+        self.file_suffix = file_suffix
         self.show_title = show_title
+        self.headless = fig_initialize(self.config.headless)
         
         #Make plot directory
         plot_dir = f"{self.config.working_dir}/{self.config.plot_dir}"
@@ -61,6 +64,45 @@ class Plots:
             
         self.initalise_alpha_colourmap()
 
+    def show_figure(
+            self,
+            f,
+    ):
+        """ 
+        Show the figure, or close it when rendering headless.
+        
+        Parameters
+        ----------
+            f: matplotlib figure
+                saved figure
+        Returns
+        -------
+        """
+        if self.headless:
+            plt.close(f)
+        else:
+            plt.show()
+        return
+
+    def figure_path(
+            self,
+            name,
+    ):
+        """ 
+        Output path of a figure, {plot_dir}/{name}_{place}{file_suffix}.{image_ex}
+        
+        Parameters
+        ----------
+            name: str
+                figure name e.g. "road_map"
+
+        Returns
+        -------
+            path: str
+                absolute path of figure file
+        """
+        return functions.figure_path(self.config, name, self.image_ex, self.file_suffix)
+
     def initalise_alpha_colourmap(self):
         """ 
         Initalise custom faded colourmap.
@@ -74,7 +116,7 @@ class Plots:
             color_array = plt.get_cmap(self.config.cmap)(range(self.config.n_colours))
             color_array[:,-1] = np.logspace(0,-0.3,self.config.n_colours)[::-1]
             map_object = LinearSegmentedColormap.from_list(name='custom_alphamap',colors=color_array)
-            plt.register_cmap(cmap=map_object)
+            mpl.colormaps.register(cmap=map_object)
         return
     
     def check_date_minmax(
@@ -119,6 +161,39 @@ class Plots:
             date_max = min(self.config.date_max, roads["date"].max())
         return roads, date_min, date_max
 
+    def check_summary(
+            self,
+            roads,
+            date_min,
+            date_max,
+    ):
+        """ 
+        Summarise roadmaps data over given data range for plotting
+        
+        Parameters
+        ----------
+            roads: Geopandas dataframe or accumulators.Journey_Summary
+                Road journeys for given date range, or their summary which is used as is
+            date_min: str
+                Minimum date of road maps. Format YYYY-MM-DD e.g. 2020-01-01
+            date_max: str
+                Maximum date of road maps. Format YYYY-MM-DD e.g. 2020-01-01
+
+        Returns
+        -------
+            summary: accumulators.Journey_Summary
+                Summary of road journeys for given new date range
+            date_min: datetime
+                Minimum date of road maps. 
+            date_max: datetime
+                Maximum date of road maps.
+
+        """
+        if isinstance(roads, accumulators.Journey_Summary):
+            return roads, roads.date_min, roads.date_max
+        roads, date_min, date_max = self.check_date_minmax(roads, date_min, date_max)
+        return accumulators.Journey_Summary.from_roads(roads), date_min, date_max
+
     def plot_road_map(
             self, 
             roads,
@@ -127,6 +202,8 @@ class Plots:
         ):
         """ 
         Plot the roadmaps over given data range.
+        With config.road_map_mode "density" journeys are drawn as a raster of how often each pixel was driven.
+        With config.road_map_mode "speed" each segment is coloured by its speed, from the point timestamps of gx:Track journeys or else the journey average.
         
         Parameters
         ----------
@@ -140,6 +217,8 @@ class Plots:
         Returns
         -------
         """
+        #Journeys are picked from the loaded roads by position, so the index and geometries cached on them are reused across maps
+        loaded, query = roads, [None if date is None else datetime.fromisoformat(date) for date in (date_min, date_max)]
         roads, date_min, date_max = self.check_date_minmax(roads, date_min, date_max)
         NDrives = roads.shape[0]
     
@@ -147,29 +226,143 @@ class Plots:
         f.set_size_inches(11.69, 8.27)
         
         ax.axis('off')
-        xlim, ylim, resolution = format_data.restrict_plot(self.config.place)
+        xlim, ylim, resolution = format_data.restrict_plot(self.config.place, self.config)
 
         #Convert Lat long to x,y
-        x1,y1 =Proj(self.config.crs_OUT)(xlim[0],ylim[0])
-        x2,y2 =Proj(self.config.crs_OUT)(xlim[1],ylim[1])
+        x1,y1 =projection.transform_point(xlim[0],ylim[0], self.config.crs_OUT)
+        x2,y2 =projection.transform_point(xlim[1],ylim[1], self.config.crs_OUT)
         ax.set_ylim([y1,y2])
         ax.set_xlim([x1,x2])
         
         #Plot
         print(f"Number of drives: {NDrives} between {functions.format_date_string(date_min)} - {functions.format_date_string(date_max)}")
 
-        roads["geometry"] = roads["geometry"].to_crs(self.config.crs_OUT)
-        roads["geometry"].plot(ax=ax, color=self.config.road_line_colour, linewidth =.3, alpha=0.6)
-        map_source = ctx.providers.OpenStreetMap.Mapnik
-        ctx.add_basemap(ax=ax, crs=self.config.crs_OUT, zoom=resolution,source=map_source)
+        #Only journeys passing through the map are projected and drawn
+        positions = spatial_index.journey_positions(loaded, xlim, ylim, *query)
+        roads = loaded.iloc[positions]
+
+        if self.config.road_map_mode == "density":
+            #Journeys per pixel at the output resolution, square pixels
+            width = int(np.ceil(ax.get_window_extent().width / f.dpi * self.config.dpi))
+            height = int(np.ceil(width * (y2 - y1) / (x2 - x1)))
+            geometry = projection.projected_geometry(loaded, self.config.crs_OUT).iloc[positions]
+            density = raster.traversal_density(geometry, [x1,x2], [y1,y2], (height, width), self.config.crs_OUT)
+            if density.max() > 0:
+                ax.imshow(np.ma.masked_equal(density, 0), extent=(x1,x2,y1,y2), origin="lower", cmap="custom_alphamap", norm=LogNorm(vmin=1, vmax=density.max()), interpolation="nearest", zorder=2)
+        elif self.config.road_map_mode == "speed":
+            #Segments are coloured on their own so journeys are not simplified
+            journeys = Journey_Store.from_roads(roads)
+            _, _, speed = tracks.journey_segment_speeds(journeys, self.config)
+            if np.any(np.isfinite(speed)):
+                d_unit, t_unit, s_unit = functions.get_units(self.config.distance_unit, self.config.time_unit)
+                norm = Norm(vmin=0, vmax=np.nanpercentile(speed, 99))
+                collection = lines.store_collection(journeys, self.config.crs_OUT, values=speed, cmap=self.config.speed_cmap, norm=norm, n_levels=self.config.speed_levels, widths=.5, zorder=2)
+                ax.add_collection(collection, autolim=False)
+                ax.set_aspect("equal")
+                f.colorbar(collection, ax=ax, shrink=0.6, label=f"speed ({s_unit})")
+        else:
+            if self.config.simplify_roads and roads.shape[0] > 0:
+                zoom = simplify.lod_zoom([x1,x2], [y1,y2], resolution, self.config.dpi, f.get_size_inches())
+                geometry = simplify.lod_geometry(loaded, self.config.crs_OUT, zoom, positions)
+            else:
+                geometry = projection.projected_geometry(loaded, self.config.crs_OUT).iloc[positions]
+            if len(geometry) > 0:
+                ax.add_collection(lines.geometry_collection(geometry, colors=self.config.road_line_colour, widths=.3, alpha=0.6), autolim=False)
+                ax.set_aspect("equal")
+        tiles.add_basemap(ax, resolution, self.config)
         
         if self.show_title:
             plt.title(f"{functions.format_date_string(date_min)} - {functions.format_date_string(date_max)}")
-        plt.savefig(f"{self.config.working_dir}/{self.config.plot_dir}/road_map_{self.config.place}.{self.image_ex}", dpi=self.config.dpi, format=self.image_ex)
-        plt.show()
+        plt.savefig(self.figure_path("road_map"), dpi=self.config.dpi, format=self.image_ex)
+        self.show_figure(f)
         return 
 
     
+    def animate_road_map(
+            self, 
+            roads,
+            date_min=None,
+            date_max=None,
+            frame_freq="D",
+            fps=10,
+            dpi=100,
+            image_ex="gif",
+        ):
+        """ 
+        Animate the road map growing over given data range, one frame per frame_freq period.
+        Journeys are accumulated into a persistent traversal raster, each frame only adds the journeys of its period.
+        The basemap is drawn once and frames are streamed to the writer, so the cost of a frame does not grow with the history.
+        
+        Parameters
+        ----------
+            roads: Geopandas dataframe
+                Road journeys for given date range
+            date_min: str
+                Minimum date of road maps. Format YYYY-MM-DD e.g. 2020-01-01
+            date_max: str
+                Maximum date of road maps. Format YYYY-MM-DD e.g. 2020-01-01
+            frame_freq: str
+                pandas frequency of frames e.g. "D" daily, "W" weekly
+            fps: int
+                frames per second
+            dpi: int
+                resolution of frames
+            image_ex: str
+                "gif" (pillow writer) or a video extension e.g. "mp4" (ffmpeg writer)
+
+        Returns
+        -------
+        """
+        loaded, query = roads, [None if date is None else datetime.fromisoformat(date) for date in (date_min, date_max)]
+        roads, date_min, date_max = self.check_date_minmax(roads, date_min, date_max)
+        print(f"Number of drives: {roads.shape[0]} between {functions.format_date_string(date_min)} - {functions.format_date_string(date_max)}")
+
+        f, ax = plt.subplots(1,1)
+        f.set_size_inches(11.69, 8.27)
+        f.set_dpi(dpi)
+        
+        ax.axis('off')
+        xlim, ylim, resolution = format_data.restrict_plot(self.config.place, self.config)
+        x1,y1 =projection.transform_point(xlim[0],ylim[0], self.config.crs_OUT)
+        x2,y2 =projection.transform_point(xlim[1],ylim[1], self.config.crs_OUT)
+        ax.set_ylim([y1,y2])
+        ax.set_xlim([x1,x2])
+        tiles.add_basemap(ax, resolution, self.config)
+
+        #Journeys passing through the map in date order, frame i adds journeys up to frame_end[i]
+        roads = loaded.iloc[spatial_index.journey_positions(loaded, xlim, ylim, *query)]
+        order = np.argsort(roads["date"].to_numpy(), kind="stable")
+        dates = roads["date"].to_numpy()[order]
+        geometries = roads["geometry"].to_numpy()[order]
+        frame_start = pd.date_range(date_min, date_max, freq=frame_freq, normalize=True)
+        frame_end = np.append(frame_start[1:].to_numpy(), np.datetime64(pd.Timestamp(date_max) + timedelta(days=1)))
+        journey_end = np.searchsorted(dates, frame_end, side="left")
+
+        #Persistent journeys per pixel at the frame resolution, square pixels
+        width = int(np.ceil(ax.get_window_extent().width))
+        height = int(np.ceil(width * (y2 - y1) / (x2 - x1)))
+        density = np.zeros((height, width), dtype=np.int64)
+        transformer = projection.transformer(roads.crs, self.config.crs_OUT)
+        image = ax.imshow(np.ma.masked_equal(density, 0), extent=(x1,x2,y1,y2), origin="lower", cmap="custom_alphamap", norm=LogNorm(vmin=1, vmax=2), interpolation="nearest", zorder=2)
+        title = ax.set_title("")
+
+        path = functions.figure_path(self.config, "road_map_animation", image_ex, self.file_suffix)
+        writer = animation.writers["pillow" if image_ex == "gif" else "ffmpeg"](fps=fps)
+        with writer.saving(f, path, dpi):
+            a = 0
+            for start, b in zip(frame_start, journey_end):
+                if b > a:
+                    raster.add_journeys(geometries[a:b], transformer, [x1,x2], [y1,y2], density)
+                    image.set_data(np.ma.masked_equal(density, 0))
+                    image.norm.vmax = max(2, density.max())
+                    a = b
+                if self.show_title:
+                    title.set_text(f"{functions.format_date_string(date_min)} - {functions.format_date_string(start)}")
+                writer.grab_frame()
+        print(f"Saved {len(frame_start)} frames to {path}")
+        self.show_figure(f)
+        return 
+
     def plot_distance(
             self, 
             roads,
@@ -197,51 +390,19 @@ class Plots:
         NDrives = roads.shape[0]
         UniqueDates = pd.date_range(date_min-timedelta(days=1),date_max,freq='d')
 
-        odometer_file = f'{self.config.working_dir}/{self.config.road_data_dir}/odometer.yaml'
-        odometer_bool = False
-        if os.path.exists(odometer_file):
-            odometer = functions.load_yaml(odometer_file)
-            if odometer["odometer"] is not None: #Check odometer file not empty
-                odometer_bool = True  
-                odometer_distance_unit = odometer["distance_unit"]
-                odometer_distances = np.array(list(odometer["odometer"].values()), dtype=float)
-                odometer_distances *= functions.convert_distance(odometer_distance_unit)/functions.convert_distance(self.config.distance_unit)
-                odometer_dates = np.array([ datetime.fromisoformat(date) for date in odometer["odometer"].keys()])
-
-                if np.sum((odometer_dates>date_min) * (odometer_dates<date_max)) == 0:
-                    odometer_bool = False
-        
-                indexes = []
-                for di in range(len(odometer_distances)):
-                    if odometer_dates[di] >= date_min and odometer_dates[di] <= date_max:
-                        indexes.append(di)
-                
-                cum_dist_baseline = odometer_distances[indexes[0]]
-                odometer_distances=odometer_distances[indexes]
-                odometer_dates=odometer_dates[indexes]
-                if len(indexes) == 0:
-                    odometer_bool = False
-                    
-                    
         print(f"Number of drives: {NDrives} between {functions.format_date_string(date_min)} - {functions.format_date_string(date_max)}")
         N_days = (date_max-date_min).days
         
-        dT = np.zeros(len(UniqueDates))
-        date_i = 1
-        odo_dates=[] 
-        for date in UniqueDates[1:]:
-            dT[date_i] += roads[roads["date"] == date]["distance"].sum()
-            date_i += 1
-            if odometer_bool:
-                for od_date in odometer_dates:
-                    if (od_date-date).days == 0:
-                        odo_dates.append(date_i) 
-        
-        if len(odo_dates) == 0:
-            odometer_bool = False  
-                    
-        CumDist = np.cumsum(dT)
-        
+        daily = aggregate.daily_series(roads, UniqueDates[0], UniqueDates[-1])
+        dT = daily["distance"].to_numpy()
+        CumDist = daily["cum_distance"].to_numpy()
+
+        #Odometer readings within the date range aligned to the cumulative distance
+        odometer_readings = odometer.load_odometer(self.config)
+        odometer_readings = odometer_readings[(odometer_readings["date"] >= date_min) & (odometer_readings["date"] <= date_max)]
+        aligned = odometer.align_odometer(odometer_readings, daily)
+        odometer_bool = aligned.shape[0] > 0
+
         f, (ax1,ax2) = plt.subplots(2,1, sharex=True, gridspec_kw={'height_ratios': [3, 1]}) 
         plt.subplots_adjust(hspace=0.05)
         f.set_size_inches(set_size(subplots=(1, 1), fraction=1))
@@ -250,15 +411,14 @@ class Plots:
         ax2.plot(UniqueDates, dT, color=self.config.road_line_colour)
 
         if odometer_bool:
-            diffs = []
-            for di in range(len(odo_dates)):
-                diffs.append(CumDist[odo_dates[di]]-odometer_distances[di])
-            cum_dist_baseline=-np.nanmean(np.array(diffs))
-        
-            ax1.scatter(odometer_dates,odometer_distances-cum_dist_baseline, marker="x", color="r")
-            ax1.scatter([],[], marker="x", color="r",label="MOT Record")
-            
-            
+            vehicles = aligned["vehicle"].unique()
+            for vi, vehicle in enumerate(vehicles):
+                aligned_vehicle = aligned[aligned["vehicle"] == vehicle]
+                colour = "r" if len(vehicles) == 1 else f"C{vi}"
+                ax1.scatter(aligned_vehicle["date"], aligned_vehicle["reading"]-aligned_vehicle["offset"], marker="x", color=colour)
+                ax1.scatter([],[], marker="x", color=colour, label="MOT Record" if len(vehicles) == 1 else f"MOT Record {vehicle}")
+            #Odometer axis of the first vehicle
+            cum_dist_baseline = aligned["offset"].iloc[0]
 
             #Set up twin axis for odometer
             ax1_s = ax1.twinx()
@@ -285,8 +445,8 @@ class Plots:
             ax2.xaxis.set_major_locator(tick_years)
             ax2.xaxis.set_minor_locator(tick_months)
         
-        plt.savefig(f"{self.config.working_dir}/{self.config.plot_dir}/road_odometer_{self.config.place}.{self.image_ex}", dpi=self.config.dpi, format=self.image_ex)
-        plt.show()
+        plt.savefig(self.figure_path("road_odometer"), dpi=self.config.dpi, format=self.image_ex)
+        self.show_figure(f)
         return
 
     def plot_summary_histograms(
@@ -300,8 +460,8 @@ class Plots:
         
         Parameters
         ----------
-            roads: Geopandas dataframe
-                Road journeys for given date range
+            roads: Geopandas dataframe or accumulators.Journey_Summary
+                Road journeys for given date range, or their summary e.g. from load_in_summary
             date_min: str
                 Minimum date of road maps. Format YYYY-MM-DD e.g. 2020-01-01
             date_max: str
@@ -310,44 +470,39 @@ class Plots:
         Returns
         -------
         """
-        roads, date_min, date_max = self.check_date_minmax(roads, date_min, date_max)
-        NDrives = roads.shape[0]
+        summary, date_min, date_max = self.check_summary(roads, date_min, date_max)
+        NDrives = summary.n_journeys
 
         d_unit, t_unit, s_unit = functions.get_units(self.config.distance_unit, self.config.time_unit)
         
         print(f"Number of drives: {NDrives} between {functions.format_date_string(date_min)} - {functions.format_date_string(date_max)}")
-        print(f"Maximum distance: {roads['distance'].max():.2f}{d_unit}")
-        print(f"Maximum duration: {roads['duration'].max():.2f}{t_unit}")
-        print(f"Maximum average speed: {roads['speed'].max():.2f}{s_unit}")
+        print(f"Maximum distance: {summary.sketches['distance'].max:.2f}{d_unit}")
+        print(f"Maximum duration: {summary.sketches['duration'].max:.2f}{t_unit}")
+        print(f"Maximum average speed: {summary.sketches['speed'].max:.2f}{s_unit}")
 
         alpha = 0.6
 
+        #Fixed bin histograms accumulated per day, axes trimmed to the data
         ax1_min = -1
-        ax1_max = math.ceil(np.log10(roads["distance"].max()))
-
-        ax1_nbins = 50
-        ax1_bins = np.logspace(ax1_min, ax1_max, ax1_nbins)
-        ax1_widths = ax1_bins[:-1]-ax1_bins[1:]
+        ax1_max = math.ceil(np.log10(summary.sketches["distance"].max))
+        ax1_bins = summary.histograms["distance"].edges
+        ax1_widths = ax1_bins[1:]-ax1_bins[:-1]
         ax1_bin_centers = (ax1_bins[1:] + ax1_bins[:-1])*0.5
-        ax1_hist, _ = np.histogram(roads["distance"], bins=ax1_bins, density=True)
+        ax1_hist = summary.histograms["distance"].density()
 
         ax2_min = -1
-        ax2_max = math.ceil(np.log10(roads["duration"].max()))
-
-        ax2_nbins = 50
-        ax2_bins = np.logspace(ax2_min, ax2_max, ax2_nbins)
-        ax2_widths = ax2_bins[:-1]-ax2_bins[1:]
+        ax2_max = math.ceil(np.log10(summary.sketches["duration"].max))
+        ax2_bins = summary.histograms["duration"].edges
+        ax2_widths = ax2_bins[1:]-ax2_bins[:-1]
         ax2_bin_centers = (ax2_bins[1:] + ax2_bins[:-1])*0.5
-        ax2_hist, _ = np.histogram(roads["duration"], bins=ax2_bins, density=True)
+        ax2_hist = summary.histograms["duration"].density()
 
         ax3_min = 0
-        ax3_max = np.round(roads["speed"].max(),-1)
-        
-        ax3_step = 2.5
-        ax3_bins = np.arange(ax3_min, ax3_max, ax3_step)
+        ax3_max = np.round(summary.sketches["speed"].max,-1)
+        ax3_bins = summary.histograms["speed"].edges
         ax3_widths = ax3_bins[1] - ax3_bins[0]
         ax3_bin_centers = (ax3_bins[1:] + ax3_bins[:-1])*0.5
-        ax3_hist, _ = np.histogram(roads["speed"], bins=ax3_bins, density=True)
+        ax3_hist = summary.histograms["speed"].density()
 
         f, (ax1, ax2, ax3) = plt.subplots(1,3) 
         f.set_size_inches(set_size(subplots=(1,3), fraction=1))
@@ -375,8 +530,59 @@ class Plots:
         if self.show_title:
             plt.suptitle(f"{functions.format_date_string(date_min)} - {functions.format_date_string(date_max)}", y=1.05)
         f.set_size_inches(set_size(subplots=(1,3), fraction=1))
-        plt.savefig(f"{self.config.working_dir}/{self.config.plot_dir}/road_summary_all_{self.config.place}.{self.image_ex}", dpi=self.config.dpi, format=self.image_ex)
-        plt.show()
+        plt.savefig(self.figure_path("road_summary_all"), dpi=self.config.dpi, format=self.image_ex)
+        self.show_figure(f)
+        return
+
+    def plot_statistics_bands(
+            self,
+            axes,
+            statistics,
+            alpha = 0.4,
+            width = 0.8,
+    ):
+        """ 
+        Draw mean, median, min-max and 1 and 2 sigma bands of distance, duration and speed for each group.
+        
+        Parameters
+        ----------
+            axes: list
+                three matplotlib axes for distance, duration and speed
+            statistics: pd.DataFrame
+                statistics table of aggregate.statistics_cube, one row per group
+            alpha: float
+                transparency of the sigma bands
+            width: float
+                width of each group
+        Returns
+        -------
+        """
+        which = ["distance", "duration", "speed"]
+
+        axes[0].fill_between([0,0], y1=0, y2=0, color="green", alpha=alpha,label=r"$1\sigma$")
+        axes[0].fill_between([0,0], y1=0, y2=0, color="yellow", alpha=alpha,label=r"$2\sigma$")
+        axes[0].plot([0,0], [0,0], color="black", ls="-", label="mean")
+        axes[0].plot([0,0], [0,0], color="red", ls="-", label="median")
+
+        for ai in range(3):
+            for di in range(statistics.shape[0]):
+                di_mean = statistics[(which[ai], "mean")].iloc[di]
+                di_median = statistics[(which[ai], "median")].iloc[di]
+                di_std = statistics[(which[ai], "std")].iloc[di]
+                di_min = statistics[(which[ai], "min")].iloc[di]
+                di_max = statistics[(which[ai], "max")].iloc[di]
+                if statistics[(which[ai], "count")].iloc[di] == 0:
+                    continue
+
+                axes[ai].plot([di-width/2, di+width/2], [di_mean,di_mean], color="black", ls="-")
+                axes[ai].plot([di-width/2, di+width/2], [di_median,di_median], color="red", ls="-")
+                axes[ai].errorbar([di],[di_mean],np.array([di_mean-di_min,di_max-di_mean]).reshape(2,1), color="black")
+
+                # 1 sigma
+                axes[ai].fill_between([di-width/2, di+width/2], y1=max(0,di_mean-di_std), y2=max(0,di_mean+di_std), color="green", alpha=alpha)
+                #
+                axes[ai].fill_between([di-width/2, di+width/2], y1=max(0,di_mean-2*di_std), y2=max(0,di_mean-1*di_std), color="yellow", alpha=alpha)
+                axes[ai].fill_between([di-width/2, di+width/2], y1=max(0,di_mean+1*di_std), y2=max(0,di_mean+2*di_std), color="yellow", alpha=alpha)
         return
 
     def plot_summary_weekday_histograms(
@@ -390,8 +596,8 @@ class Plots:
         
         Parameters
         ----------
-            roads: Geopandas dataframe
-                Road journeys for given date range
+            roads: Geopandas dataframe or accumulators.Journey_Summary
+                Road journeys for given date range, or their summary e.g. from load_in_summary
             date_min: str
                 Minimum date of road maps. Format YYYY-MM-DD e.g. 2020-01-01
             date_max: str
@@ -400,49 +606,82 @@ class Plots:
         Returns
         -------
         """
-        roads, date_min, date_max = self.check_date_minmax(roads, date_min, date_max)
+        if isinstance(roads, accumulators.Journey_Summary):
+            summary, date_min, date_max = self.check_summary(roads, date_min, date_max)
+            statistics = summary.weekday_statistics()
+        else:
+            roads, date_min, date_max = self.check_date_minmax(roads, date_min, date_max)
+            statistics = aggregate.statistics_cube(roads)["weekday"]
 
         d_unit, t_unit, s_unit = functions.get_units(self.config.distance_unit, self.config.time_unit)
         
         days_list = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
-        which = ["distance", "duration", "speed"]
-        alpha = 0.4
-        width = 0.8
 
         f, axes = plt.subplots(3,1, sharex=True) 
         f.set_size_inches(set_size(subplots=(1,.75), fraction=1))
         plt.subplots_adjust(hspace=0.05)
 
-        axes[0].fill_between([0,0], y1=0, y2=0, color="green", alpha=alpha,label=r"$1\sigma$")
-        axes[0].fill_between([0,0], y1=0, y2=0, color="yellow", alpha=alpha,label=r"$2\sigma$")
-        axes[0].plot([0,0], [0,0], color="black", ls="-", label="mean")
-        axes[0].plot([0,0], [0,0], color="red", ls="-", label="median")
+        self.plot_statistics_bands(axes, statistics)
 
-        for ai in range(3):
-            for di in range(7):
-                roads_day = roads[roads["date"].dt.day_name()==days_list[di]]
-                di_mean = np.nanmean(roads_day[which[ai]].values)
-                di_median = np.nanmedian(roads_day[which[ai]].values)
-                di_std = np.nanstd(roads_day[which[ai]].values, ddof=1)
-                di_min = np.nanmin(roads_day[which[ai]].values)
-                di_max = np.nanmax(roads_day[which[ai]].values)
+        axes[0].set_ylabel(f"distance ({d_unit})")
+        axes[1].set_ylabel(f"duration ({t_unit})")
+        axes[2].set_ylabel(f"speed ({s_unit})")
+        axes[2].set_xticks(range(7))
+        axes[2].set_xticklabels(days_list, rotation = 90)
 
-                axes[ai].plot([di-width/2, di+width/2], [di_mean,di_mean], color="black", ls="-")
-                axes[ai].plot([di-width/2, di+width/2], [di_median,di_median], color="red", ls="-")
-                axes[ai].errorbar([di],[di_mean],np.array([di_mean-di_min,di_max-di_mean]).reshape(2,1), color="black")
+        axes[0].set_xlim([-0.5, 6+0.5])
+        axes[0].set_ylim([0, None])
+        axes[1].set_ylim([0, None])
+        axes[2].set_ylim([0, None])
 
-                # 1 sigma
-                axes[ai].fill_between([di-width/2, di+width/2], y1=max(0,di_mean-di_std), y2=max(0,di_mean+di_std), color="green", alpha=alpha)
-                #
-                axes[ai].fill_between([di-width/2, di+width/2], y1=max(0,di_mean-2*di_std), y2=max(0,di_mean-1*di_std), color="yellow", alpha=alpha)
-                axes[ai].fill_between([di-width/2, di+width/2], y1=max(0,di_mean+1*di_std), y2=max(0,di_mean+2*di_std), color="yellow", alpha=alpha)
+        axes[0].legend(loc="upper left")
+
+        if self.show_title:
+            axes[0].set_title(f"{functions.format_date_string(date_min)} - {functions.format_date_string(date_max)}")
+        f.set_size_inches(set_size(subplots=(1,.75), fraction=1))
+        plt.savefig(self.figure_path("road_summary_daily"), dpi=self.config.dpi, format=self.image_ex)
+        self.show_figure(f)
+        return 
+
+    def plot_summary_hourly_histograms(
+            self, 
+            roads,
+            date_min=None,
+            date_max=None,
+        ):
+        """ 
+        Plot summary by hour of day of the journey start over date range across all individual journeys.
+        
+        Parameters
+        ----------
+            roads: Geopandas dataframe
+                Road journeys for given date range
+            date_min: str
+                Minimum date of road maps. Format YYYY-MM-DD e.g. 2020-01-01
+            date_max: str
+                Maximum date of road maps. Format YYYY-MM-DD e.g. 2020-01-01
+
+        Returns
+        -------
+        """
+        roads, date_min, date_max = self.check_date_minmax(roads, date_min, date_max)
+
+        d_unit, t_unit, s_unit = functions.get_units(self.config.distance_unit, self.config.time_unit)
+
+        f, axes = plt.subplots(3,1, sharex=True) 
+        f.set_size_inches(set_size(subplots=(1,.75), fraction=1))
+        plt.subplots_adjust(hspace=0.05)
+
+        self.plot_statistics_bands(axes, aggregate.statistics_cube(roads)["hour"])
 
         axes[0].set_ylabel(f"distance ({d_unit})")
         axes[1].set_ylabel(f"duration ({t_unit})")
         axes[2].set_ylabel(f"speed ({s_unit})")
-        axes[2].set_xticklabels([""]+days_list, rotation = 90)
+        axes[2].set_xticks(range(0, 24, 3))
+        axes[2].set_xticklabels([f"{hour:02d}:00" for hour in range(0, 24, 3)], rotation = 90)
+        axes[2].set_xlabel("start time (UTC)")
 
-        axes[0].set_xlim([-0.5, 6+0.5])
+        axes[0].set_xlim([-0.5, 23+0.5])
         axes[0].set_ylim([0, None])
         axes[1].set_ylim([0, None])
         axes[2].set_ylim([0, None])
@@ -452,8 +691,8 @@ class Plots:
         if self.show_title:
             axes[0].set_title(f"{functions.format_date_string(date_min)} - {functions.format_date_string(date_max)}")
         f.set_size_inches(set_size(subplots=(1,.75), fraction=1))
-        plt.savefig(f"{self.config.working_dir}/{self.config.plot_dir}/road_summary_daily_{self.config.place}.{self.image_ex}", dpi=self.config.dpi, format=self.image_ex)
-        plt.show()
+        plt.savefig(self.figure_path("road_summary_hourly"), dpi=self.config.dpi, format=self.image_ex)
+        self.show_figure(f)
         return 
         
     def plot_regions_basemap(
@@ -490,7 +729,7 @@ class Plots:
             for city in been["cities"]:
                 lat = been["cities"][city][0]
                 long = been["cities"][city][1]
-                long,lat =Proj(self.config.crs_OUT)(long, lat)
+                long,lat =projection.transform_point(long, lat, self.config.crs_OUT)
                 cities_lat.append(lat)
                 cities_long.append(long)
         
@@ -498,16 +737,19 @@ class Plots:
         f.set_size_inches(set_size(subplots=(1,1), fraction=1))
         #f.set_size_inches(11.69, 8.27)
         
-        shapefile=shapefile.to_crs(self.config.crs_OUT)
-        shapefile.plot(ax=ax, edgecolor='darkgrey', facecolor=colors, linewidth=.3)
+        xlim, ylim, _ = format_data.restrict_plot(self.config.place, self.config)
+        x1,y1 =projection.transform_point(xlim[0],ylim[0], self.config.crs_OUT)
+        x2,y2 =projection.transform_point(xlim[1],ylim[1], self.config.crs_OUT)
+
+        #Boundaries simplified to the output resolution
+        pixel = (x2 - x1) / (f.get_size_inches()[0] * self.config.dpi)
+        geometry = boundaries.display_geometry(shapefile, self.config.place, pixel, self.config)
+        geometry.plot(ax=ax, edgecolor='darkgrey', facecolor=colors, linewidth=.3)
         ax.scatter(cities_long,cities_lat, color="r", marker="x")
         
         ax.axis('off')
-        xlim, ylim, _ = format_data.restrict_plot(self.config.place)
-        x1,y1 =Proj(self.config.crs_OUT)(xlim[0],ylim[0])
-        x2,y2 =Proj(self.config.crs_OUT)(xlim[1],ylim[1])
         ax.set_ylim([y1,y2])
         ax.set_xlim([x1,x2])
-        plt.savefig(f"{self.config.working_dir}/{self.config.plot_dir}/places_map_{self.config.place}.{self.image_ex}", dpi=self.config.dpi, format=self.image_ex)
-        plt.show()
+        plt.savefig(self.figure_path("places_map"), dpi=self.config.dpi, format=self.image_ex)
+        self.show_figure(f)
         return
\ No newline at end of file
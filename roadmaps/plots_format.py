@@ -1,29 +1,108 @@
 #!/usr/bin/env python
+import os
+import sys
+import shutil
+
 from cycler import cycler
 import matplotlib as mpl
-import matplotlib.font_manager
-mpl.use('Tkagg')
-import matplotlib.pyplot as plt
-
-try:
-    plt.style.use(["science", "no-latex", "bright"])
-except Exception:
-    plt.style.use("default")
-    print("Using default matplotlib style")
+
+#Backends that only render to files
+file_backends = ["agg", "cairo", "pdf", "pgf", "ps", "svg", "template"]
+
+#Set once per process by fig_initialize, pyplot imported before this module means the caller has set up matplotlib
+fig_state = {}
+caller_pyplot = "matplotlib.pyplot" in sys.modules
+
+def is_headless():
+    """ 
+    Check whether there is no display to open interactive windows on.
     
-def fig_initialize():
+    Parameters
+    ----------
+
+    Returns
+    -------
+        headless: bool
+            True if there is no display
+
+    """
+    if sys.platform.startswith("linux"):
+        return os.environ.get("DISPLAY") is None and os.environ.get("WAYLAND_DISPLAY") is None
+    return False
+
+def set_backend(
+        headless = False,
+    ):
     """ 
-    Initialize matplotlib figures with custom set up.
+    Select the matplotlib backend. Agg when headless or without a display, otherwise TkAgg if available.
+    If the caller imported pyplot before roadmaps their backend is kept.
     
     Parameters
     ----------
+        headless: bool
+            render to files only with the Agg backend
 
     Returns
     -------
+        headless: bool
+            True if the backend only renders to files
 
     """
-    #Set up tex rendering
-    plt.rc('text', usetex=True)
+    if caller_pyplot:
+        return mpl.get_backend().lower() in file_backends
+    if headless or is_headless():
+        mpl.use("Agg")
+        return True
+    try:
+        mpl.use("TkAgg")
+    except ImportError:
+        mpl.use("Agg")
+        return True
+    return False
+
+def fig_initialize(
+        headless = False,
+    ):
+    """ 
+    Initialize matplotlib figures with custom set up, once per process. Later calls keep the backend and style.
+    
+    Parameters
+    ----------
+        headless: bool
+            render to files only with the Agg backend
+
+    Returns
+    -------
+        headless: bool
+            True if figures are only rendered to files
+
+    """
+    if "headless" not in fig_state:
+        fig_state["headless"] = set_backend(headless)
+        set_style()
+    return headless or fig_state["headless"]
+
+def set_style():
+    """ 
+    Set the custom style and rcParams of matplotlib figures.
+    
+    Parameters
+    ----------
+
+    Returns
+    -------
+
+    """
+    import matplotlib.pyplot as plt
+
+    try:
+        plt.style.use(["science", "no-latex", "bright"])
+    except Exception:
+        plt.style.use("default")
+        print("Using default matplotlib style")
+
+    #Set up tex rendering if latex is installed
+    plt.rc('text', usetex=shutil.which("latex") is not None)
     # plt.rc('text.latex',preamble=[
     # 	r'\usepackage{amsmath}',
     # 	r'\usepackage{amsthm}',
@@ -0,0 +1,122 @@
+import weakref
+import hashlib
+import functools
+
+import numpy as np
+import shapely
+
+@functools.lru_cache(maxsize=None)
+def cached_transformer(
+        crs_from,
+        crs_to,
+    ):
+    from pyproj import Transformer
+
+    return Transformer.from_crs(crs_from, crs_to, always_xy=True)
+
+def transformer(
+        crs_from,
+        crs_to,
+    ):
+    """ 
+    Transformer between two crs, built once per crs pair. Coordinates are (x, y) i.e. (long, lat) order.
+    
+    Parameters
+    ----------
+        crs_from: str or pyproj.CRS
+            crs of input coordinates e.g. "EPSG:4326"
+        crs_to: str or pyproj.CRS
+            crs of output coordinates e.g. "EPSG:3857"
+
+    Returns
+    -------
+        transformer: pyproj.Transformer
+            shared transformer
+
+    """
+    return cached_transformer(str(crs_from), str(crs_to))
+
+def transform_point(
+        x,
+        y,
+        crs_to,
+        crs_from = "EPSG:4326",
+    ):
+    """ 
+    Transform coordinates, by default from long, lat.
+    
+    Parameters
+    ----------
+        x: float or np.array
+            x coordinates e.g. longitude
+        y: float or np.array
+            y coordinates e.g. latitude
+        crs_to: str
+            crs of output coordinates
+        crs_from: str
+            crs of input coordinates
+
+    Returns
+    -------
+        x: float or np.array
+            transformed x coordinates
+        y: float or np.array
+            transformed y coordinates
+
+    """
+    return transformer(crs_from, crs_to).transform(x, y)
+
+def fingerprint(
+        geometry,
+    ):
+    """ 
+    Cheap fingerprint of a geometry column, changes when the column, its crs or any of its geometries is replaced.
+    """
+    geometries = geometry.to_numpy()
+    ids = np.fromiter(map(id, geometries), dtype=np.int64, count=len(geometries))
+    return (str(geometry.crs), len(geometries), hashlib.sha1(ids.tobytes()).hexdigest())
+
+projected = {}
+
+def projected_geometry(
+        frame,
+        crs,
+    ):
+    """ 
+    Geometry column of a dataframe projected to a crs, memoised against the dataframe and recomputed if its geometries change.
+    The dataframe is not modified. Memoise the loaded dataframe and take subsets of the result by position,
+    a filtered copy is a new dataframe and would be projected again.
+    
+    Parameters
+    ----------
+        frame: Geopandas dataframe
+            e.g. road journeys or a regions shapefile
+        crs: str
+            output crs e.g. "EPSG:3857"
+
+    Returns
+    -------
+        geometry: Geopandas series
+            projected geometries with the index of the dataframe
+
+    """
+    geometry = frame.geometry
+    key = id(frame)
+    current = fingerprint(geometry)
+    if key not in projected or projected[key][0] != current:
+        if key not in projected:
+            weakref.finalize(frame, projected.pop, key, None)
+        projected[key] = (current, {})
+    levels = projected[key][1]
+
+    if str(crs) not in levels:
+        if geometry.crs == crs:
+            levels[str(crs)] = geometry.copy()
+        else:
+            #get_coordinates and set_coordinates rather than shapely.transform(interleaved=False), which needs shapely 2.1
+            geometries = np.array(geometry.to_numpy(), copy=True)
+            coords = shapely.get_coordinates(geometries)
+            x, y = transformer(geometry.crs, crs).transform(coords[:,0], coords[:,1])
+            shapely.set_coordinates(geometries, np.column_stack([x, y]))
+            levels[str(crs)] = geometry.__class__(geometries, index=geometry.index, crs=crs)
+    return levels[str(crs)]
@@ -0,0 +1,189 @@
+import numpy as np
+import shapely
+
+from roadmaps import projection
+from roadmaps.store import Journey_Store
+
+def rasterize_lines(
+        x,
+        y,
+        line,
+        xlim,
+        ylim,
+        raster,
+        max_samples = 2**22,
+    ):
+    """ 
+    Add journeys to a traversal count raster.
+    Each vertex is a sample, segments jumping over pixels get interior samples once per pixel step.
+    A journey counts once in each pixel it enters, consecutive samples of a journey in the same pixel are not counted again.
+    Samples are generated in chunks of about max_samples to bound memory.
+    
+    Parameters
+    ----------
+        x: np.array
+            x coordinates of all journeys, in order
+        y: np.array
+            y coordinates of all journeys, in order
+        line: np.array
+            journey index of each coordinate, sorted
+        xlim: np.array
+            x extent of the raster
+        ylim: np.array
+            y extent of the raster
+        raster: np.array
+            (height, width) counts, updated in place. Row 0 is at ylim[0]
+        max_samples: int
+            approximate maximum number of samples per chunk
+
+    Returns
+    -------
+        raster: np.array
+            updated counts
+
+    """
+    height, width = raster.shape
+    if len(x) == 0:
+        return raster
+    px = (x - xlim[0]) * (width/(xlim[1] - xlim[0]))
+    py = (y - ylim[0]) * (height/(ylim[1] - ylim[0]))
+    cx = np.floor(px).astype(np.int64)
+    cy = np.floor(py).astype(np.int64)
+    vertex_flat = np.where((cx >= 0) & (cx < width) & (cy >= 0) & (cy < height), cy*width + cx, -1)
+    journey_start = np.append(True, line[1:] != line[:-1])
+
+    #Interior samples of segments jumping over pixels, none between journeys or for segments entirely on one side of the raster
+    n_steps = np.maximum(np.abs(np.diff(cx)), np.abs(np.diff(cy)))
+    n_steps[journey_start[1:]] = 0
+    long = np.nonzero(n_steps > 1)[0]
+    outside = (
+        ((cx[long] < 0) & (cx[long+1] < 0)) | ((cx[long] >= width) & (cx[long+1] >= width)) |
+        ((cy[long] < 0) & (cy[long+1] < 0)) | ((cy[long] >= height) & (cy[long+1] >= height))
+    )
+    n_steps[long[outside]] = 0
+    n_steps = np.minimum(n_steps, 2*(width + height))
+    interior = np.append(np.maximum(n_steps - 1, 0), 0)
+    counts = interior + 1
+    sample_end = np.cumsum(counts)
+
+    flat_raster = raster.reshape(-1)
+    previous = -1
+    a = 0
+    while a < len(counts):
+        sample_start = sample_end[a-1] if a > 0 else 0
+        b = max(a + 1, np.searchsorted(sample_end, sample_start + max_samples, side="right"))
+        flat = np.repeat(vertex_flat[a:b], counts[a:b])
+
+        long = np.nonzero(interior[a:b])[0] + a
+        if len(long) > 0:
+            k_counts = interior[long]
+            segment = np.repeat(long, k_counts)
+            k = np.arange(k_counts.sum()) - np.repeat(np.cumsum(k_counts) - k_counts, k_counts) + 1
+            position = np.repeat(sample_end[long] - counts[long] - sample_start + 1, k_counts) + k - 1
+            t = k / n_steps[segment]
+            sx = np.floor(px[segment] + t*(px[segment+1] - px[segment])).astype(np.int64)
+            sy = np.floor(py[segment] + t*(py[segment+1] - py[segment])).astype(np.int64)
+            flat[position] = np.where((sx >= 0) & (sx < width) & (sy >= 0) & (sy < height), sy*width + sx, -1)
+
+        new = np.empty(len(flat), dtype=bool)
+        new[0] = flat[0] != previous
+        new[1:] = flat[1:] != flat[:-1]
+        starts = np.nonzero(journey_start[a:b])[0] + a
+        new[sample_end[starts] - counts[starts] - sample_start] = True
+        previous = flat[-1]
+
+        flat_raster += np.bincount(flat[new & (flat >= 0)], minlength=flat_raster.size).astype(raster.dtype)
+        a = b
+    return raster
+
+def add_journeys(
+        geometries,
+        transformer,
+        xlim,
+        ylim,
+        raster,
+    ):
+    """ 
+    Project journey linestrings and add them to a traversal count raster, see rasterize_lines.
+    
+    Parameters
+    ----------
+        geometries: np.array
+            journey linestrings
+        transformer: pyproj.Transformer
+            transformer from the journey crs to the raster crs, see projection.transformer. None if already in the raster crs
+        xlim: np.array
+            x extent of the raster
+        ylim: np.array
+            y extent of the raster
+        raster: np.array
+            (height, width) counts, updated in place. Row 0 is at ylim[0]
+
+    Returns
+    -------
+        raster: np.array
+            updated counts
+
+    """
+    coords, line = shapely.get_coordinates(geometries, return_index=True)
+    if transformer is None:
+        x, y = coords[:,0], coords[:,1]
+    else:
+        x, y = transformer.transform(coords[:,0], coords[:,1])
+    return rasterize_lines(x, y, line, xlim, ylim, raster)
+
+def traversal_density(
+        geometry,
+        xlim,
+        ylim,
+        shape,
+        crs_out,
+        max_coordinates = 2**22,
+    ):
+    """ 
+    Count how often journeys pass through each pixel of a map.
+    Journeys are projected and rasterised in batches of at most max_coordinates coordinates to bound memory.
+    Journeys already in crs_out e.g. from projection.projected_geometry are not transformed again.
+    
+    Parameters
+    ----------
+        geometry: Geopandas series or store.Journey_Store
+            journey linestrings in any crs
+        xlim: np.array
+            x extent of the raster in crs_out
+        ylim: np.array
+            y extent of the raster in crs_out
+        shape: tuple
+            (height, width) of the raster in pixels
+        crs_out: str
+            projected map crs e.g. "EPSG:3857"
+        max_coordinates: int
+            maximum number of coordinates per batch
+
+    Returns
+    -------
+        raster: np.array
+            (height, width) traversal counts, row 0 is at ylim[0]
+
+    """
+    transformer = None if geometry.crs == crs_out else projection.transformer(geometry.crs, crs_out)
+    if isinstance(geometry, Journey_Store):
+        coordinate_end = geometry.offsets[1:]
+    else:
+        geometries = geometry.to_numpy()
+        coordinate_end = np.cumsum(shapely.get_num_coordinates(geometries))
+
+    raster = np.zeros(shape, dtype=np.int64)
+    a = 0
+    while a < len(coordinate_end):
+        coordinate_start = coordinate_end[a-1] if a > 0 else 0
+        b = max(a + 1, np.searchsorted(coordinate_end, coordinate_start + max_coordinates, side="right"))
+        if isinstance(geometry, Journey_Store):
+            journeys = geometry.slice(a, b)
+            x, y = (journeys.x, journeys.y) if transformer is None else transformer.transform(journeys.x, journeys.y)
+            line = journeys.line_index()
+            rasterize_lines(x, y, line, xlim, ylim, raster)
+        else:
+            add_journeys(geometries[a:b], transformer, xlim, ylim, raster)
+        a = b
+    return raster
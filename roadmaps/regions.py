@@ -0,0 +1,203 @@
+import re
+
+import numpy as np
+import pandas as pd
+import shapely
+
+def region_key(
+        name,
+    ):
+    """ 
+    Key of a region in the places yaml, the region name without spaces or apostrophes e.g. "Argyll and Bute" -> "ArgyllandBute".
+    """
+    return re.sub(r"[\s']", "", str(name))
+
+def config_region_keys(
+        names,
+        config_keys = None,
+    ):
+    """ 
+    Keys of regions in the hand maintained places yaml, which can differ from the shapefile names e.g. "Yukon Territory" -> "Yukon".
+    The places yaml lists one key per region in shapefile order, see Plots.plot_regions_basemap, so keys are matched by position
+    when the counts agree. Otherwise a name is matched to the config key equal to, or else uniquely a prefix of, its region_key.
+    
+    Parameters
+    ----------
+        names: list
+            region names of the shapefile, in shapefile order
+        config_keys: list
+            region keys of the places yaml, region_key of the names if None
+
+    Returns
+    -------
+        keys: list
+            places yaml key of each region
+
+    """
+    keys = [region_key(name) for name in names]
+    if config_keys is None:
+        return keys
+    config_keys = list(config_keys)
+    if len(config_keys) == len(keys):
+        return config_keys
+    matched = []
+    for key in keys:
+        prefixes = [config_key for config_key in config_keys if key.startswith(config_key)]
+        if key in config_keys:
+            matched.append(key)
+        elif len(prefixes) == 1:
+            matched.append(prefixes[0])
+        else:
+            matched.append(key)
+    return matched
+
+def journey_region_pairs(
+        journeys,
+        regions,
+    ):
+    """ 
+    Spatial join of journeys and regions, with an STRtree over the journeys queried by the prepared region polygons.
+    
+    Parameters
+    ----------
+        journeys: np.array
+            journey linestrings
+        regions: np.array
+            region polygons in the crs of the journeys
+
+    Returns
+    -------
+        region_index: np.array
+            region of each intersecting (region, journey) pair
+        journey_index: np.array
+            journey of each intersecting (region, journey) pair
+
+    """
+    shapely.prepare(regions)
+    tree = shapely.STRtree(journeys)
+    region_index, journey_index = tree.query(regions, predicate="intersects")
+    return region_index, journey_index
+
+def inside_fraction(
+        journeys,
+        regions,
+        region_index,
+        journey_index,
+    ):
+    """ 
+    Fraction of the length of each journey inside a region.
+    Journeys entirely inside the prepared region count fully, for journeys crossing its boundary
+    each segment counts if its midpoint is inside, which avoids an overlay with the region polygon.
+    
+    Parameters
+    ----------
+        journeys: np.array
+            journey linestrings
+        regions: np.array
+            prepared region polygons in the crs of the journeys
+        region_index: np.array
+            region of each (region, journey) pair
+        journey_index: np.array
+            journey of each (region, journey) pair
+
+    Returns
+    -------
+        fraction: np.array
+            length fraction of each pair
+
+    """
+    fraction = np.ones(len(region_index))
+    inside = shapely.contains_properly(regions[region_index], journeys[journey_index])
+    crossing = np.nonzero(~inside)[0]
+    if len(crossing) > 0:
+        coords, pair = shapely.get_coordinates(journeys[journey_index[crossing]], return_index=True)
+        same = pair[1:] == pair[:-1]
+        start, end, pair = coords[:-1][same], coords[1:][same], pair[:-1][same]
+        length = np.hypot(*(end - start).T)
+        middle = (start + end) / 2
+        segment_inside = shapely.contains_xy(regions[region_index[crossing]][pair], middle[:,0], middle[:,1])
+        total = np.bincount(pair, weights=length, minlength=len(crossing))
+        inside_total = np.bincount(pair, weights=length*segment_inside, minlength=len(crossing))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            fraction[crossing] = np.where(total > 0, inside_total / total, 1.0)
+    return fraction
+
+def visited_regions(
+        roads,
+        shapefile,
+        col_name,
+    ):
+    """ 
+    Regions driven through, with the first visit and distance driven in each region.
+    The distance of a journey is apportioned to regions by the fraction of its length inside each region.
+    
+    Parameters
+    ----------
+        roads: Geopandas dataframe
+            Road journeys
+        shapefile: Geopandas dataframe
+            Regions shapefiles
+        col_name: str
+            column of region names
+
+    Returns
+    -------
+        visits: pd.DataFrame
+            visited, first_visit, last_visit, n_journeys and distance indexed by region name, in shapefile order
+
+    """
+    journeys = roads["geometry"].to_numpy()
+    regions = shapefile.geometry.to_crs(roads.crs).to_numpy() if shapefile.crs != roads.crs else shapefile.geometry.to_numpy().copy()
+    region_index, journey_index = journey_region_pairs(journeys, regions)
+    fraction = inside_fraction(journeys, regions, region_index, journey_index)
+
+    pairs = pd.DataFrame({
+        "region": region_index,
+        "date": roads["date"].to_numpy()[journey_index],
+        "distance": roads["distance"].to_numpy(dtype=float)[journey_index] * fraction,
+    })
+    per_region = pairs.groupby("region").agg(
+        first_visit=("date", "min"), last_visit=("date", "max"), n_journeys=("date", "size"), distance=("distance", "sum"),
+    ).reindex(pd.RangeIndex(len(regions)))
+
+    visits = pd.DataFrame({
+        "visited": per_region["n_journeys"].notna().to_numpy(),
+        "first_visit": per_region["first_visit"].to_numpy(),
+        "last_visit": per_region["last_visit"].to_numpy(),
+        "n_journeys": per_region["n_journeys"].fillna(0).astype(int).to_numpy(),
+        "distance": per_region["distance"].fillna(0.0).to_numpy(),
+    }, index=pd.Index(shapefile[col_name].to_numpy(), name=col_name))
+    return visits
+
+def places_from_visits(
+        visits,
+        cities = None,
+        config_keys = None,
+    ):
+    """ 
+    Places been dictionary in the layout of the places yaml, see load.load_in_places.
+    
+    Parameters
+    ----------
+        visits: pd.DataFrame
+            output of visited_regions
+        cities: dict
+            cities to keep, name: [lat, long]
+        config_keys: list
+            region keys of the hand maintained places yaml, see config_region_keys
+
+    Returns
+    -------
+        data: dict
+            "region": visited boolean per region key, "cities", and per visited region key
+            "first_visit" date as YYYY-MM-DD and "distance" driven
+
+    """
+    keys = config_region_keys(visits.index, config_keys)
+    visited = visits["visited"].to_numpy()
+    return {
+        "region": {key: bool(been) for key, been in zip(keys, visited)},
+        "cities": cities,
+        "first_visit": {key: pd.Timestamp(date).strftime("%Y-%m-%d") for key, date, been in zip(keys, visits["first_visit"], visited) if been},
+        "distance": {key: round(float(distance), 3) for key, distance, been in zip(keys, visits["distance"], visited) if been},
+    }
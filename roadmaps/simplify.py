@@ -0,0 +1,136 @@
+import weakref
+
+import numpy as np
+import shapely
+
+from roadmaps import projection
+
+#Web mercator tiles
+earth_circumference = 40075016.686
+tile_size = 256
+
+def pixel_size(
+        zoom,
+    ):
+    """ 
+    Size of a basemap pixel at a zoom level.
+    
+    Parameters
+    ----------
+        zoom: int
+            web map zoom level
+
+    Returns
+    -------
+        size: float
+            pixel size in EPSG:3857 metres
+
+    """
+    return earth_circumference / (tile_size * 2**zoom)
+
+def lod_zoom(
+        xlim,
+        ylim,
+        resolution,
+        dpi,
+        size_inches,
+    ):
+    """ 
+    Level of detail for a map, the zoom level whose pixels are no larger than the output and basemap pixels.
+    
+    Parameters
+    ----------
+        xlim: np.array
+            x-axis plot limits in EPSG:3857 metres
+        ylim: np.array
+            y-axis plot limits in EPSG:3857 metres
+        resolution: int
+            basemap zoom level
+        dpi: int
+            output dots per inch
+        size_inches: tuple
+            figure width and height in inches
+
+    Returns
+    -------
+        zoom: int
+            level of detail zoom
+
+    """
+    output_pixel = max(xlim[1] - xlim[0], ylim[1] - ylim[0]) / (max(size_inches) * dpi)
+    pixel = min(output_pixel, pixel_size(resolution))
+    return int(np.ceil(np.log2(earth_circumference / (tile_size * pixel))))
+
+def simplify_geometry(
+        geometry,
+        zoom,
+    ):
+    """ 
+    Simplify projected journeys to half a pixel at a zoom level, vertices closer than that are not visible.
+    
+    Parameters
+    ----------
+        geometry: Geopandas series
+            journey linestrings in EPSG:3857
+        zoom: int
+            level of detail zoom, see lod_zoom
+
+    Returns
+    -------
+        geometry: Geopandas series
+            simplified journey linestrings
+
+    """
+    simplified = shapely.simplify(geometry.to_numpy(), pixel_size(zoom) / 2, preserve_topology=False)
+    return geometry.__class__(simplified, index=geometry.index, crs=geometry.crs)
+
+lod_levels = {}
+
+def lod_geometry(
+        roads,
+        crs,
+        zoom,
+        indices = None,
+    ):
+    """ 
+    Journeys projected and simplified for a zoom level, levels are cached against the roads dataframe and recomputed if its geometries change.
+    Journeys are only simplified the first time they are asked for, so pass the loaded roads and the positions of the journeys on the map.
+    The roads dataframe is not modified.
+    
+    Parameters
+    ----------
+        roads: Geopandas dataframe
+            Road journeys
+        crs: str
+            projected map crs e.g. "EPSG:3857"
+        zoom: int
+            level of detail zoom, see lod_zoom
+        indices: np.array
+            positions of the journeys in roads, all journeys if None
+
+    Returns
+    -------
+        geometry: Geopandas series
+            simplified journey linestrings in crs
+
+    """
+    key = id(roads)
+    current = projection.fingerprint(roads["geometry"])
+    if key not in lod_levels or lod_levels[key][0] != current:
+        if key not in lod_levels:
+            weakref.finalize(roads, lod_levels.pop, key, None)
+        lod_levels[key] = (current, {})
+    levels = lod_levels[key][1]
+
+    projected = projection.projected_geometry(roads, crs)
+    if indices is None:
+        indices = np.arange(len(projected))
+    if (crs, zoom) not in levels:
+        levels[(crs, zoom)] = (np.empty(len(projected), dtype=object), np.zeros(len(projected), dtype=bool))
+    simplified, done = levels[(crs, zoom)]
+
+    missing = indices[~done[indices]]
+    if len(missing) > 0:
+        simplified[missing] = simplify_geometry(projected.iloc[missing], zoom).to_numpy()
+        done[missing] = True
+    return projected.__class__(simplified[indices], index=projected.index[indices], crs=crs)
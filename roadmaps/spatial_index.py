@@ -0,0 +1,258 @@
+import weakref
+
+import numpy as np
+import shapely
+
+from roadmaps import projection
+from roadmaps.store import Journey_Store
+
+class Journey_Index:
+    def __init__(
+        self,
+        bounds,
+        dates = None,
+    ):
+        """ 
+        STRtree over journey bounding boxes for bounding box, region and date queries.
+        
+        Parameters
+        ----------
+        bounds: np.array
+            (n_journeys, 4) xmin, ymin, xmax, ymax of each journey
+        dates: np.array
+            datetime64 date of each journey, date queries are unavailable if None
+
+        """
+        self.bounds = np.asarray(bounds, dtype=float)
+        self.dates = None if dates is None else np.asarray(dates, dtype="datetime64[ns]")
+        self.tree = shapely.STRtree(shapely.box(*self.bounds.T))
+
+    @classmethod
+    def from_roads(
+        cls,
+        roads,
+    ):
+        """ 
+        Index of a roads dataframe.
+        
+        Parameters
+        ----------
+            roads: Geopandas dataframe
+                Road journeys
+
+        Returns
+        -------
+            index: Journey_Index
+                index in the crs of the journeys
+
+        """
+        return cls(shapely.bounds(roads["geometry"].to_numpy()), roads["date"].to_numpy())
+
+    @classmethod
+    def from_store(
+        cls,
+        store,
+    ):
+        """ 
+        Index of a journey store, from its stored journey bounds.
+        
+        Parameters
+        ----------
+            store: store.Journey_Store
+                Road journeys
+
+        Returns
+        -------
+            index: Journey_Index
+                index in the crs of the journeys
+
+        """
+        return cls(store.bounds, store.date)
+
+    def filter_dates(
+        self,
+        indices,
+        date_min = None,
+        date_max = None,
+    ):
+        """ 
+        Keep journeys between two dates, inclusive.
+        """
+        if date_min is not None:
+            indices = indices[self.dates[indices] >= np.datetime64(date_min, "ns")]
+        if date_max is not None:
+            indices = indices[self.dates[indices] <= np.datetime64(date_max, "ns")]
+        return indices
+
+    def query(
+        self,
+        xlim = None,
+        ylim = None,
+        date_min = None,
+        date_max = None,
+    ):
+        """ 
+        Journeys whose bounding boxes intersect a bounding box, within a date range.
+        
+        Parameters
+        ----------
+            xlim: np.array
+                x extent, unbounded if None
+            ylim: np.array
+                y extent, unbounded if None
+            date_min: datetime
+                Minimum date, unbounded if None
+            date_max: datetime
+                Maximum date, unbounded if None
+
+        Returns
+        -------
+            indices: np.array
+                sorted journey indices
+
+        """
+        if xlim is None or xlim[0] is None:
+            indices = np.arange(len(self.bounds))
+        else:
+            indices = np.sort(self.tree.query(shapely.box(xlim[0], ylim[0], xlim[1], ylim[1])))
+        return self.filter_dates(indices, date_min, date_max)
+
+    def query_region(
+        self,
+        region,
+        geometries = None,
+        date_min = None,
+        date_max = None,
+    ):
+        """ 
+        Journeys intersecting a region e.g. a shapefile polygon, within a date range.
+        
+        Parameters
+        ----------
+            region: shapely geometry
+                region in the crs of the journeys
+            geometries: np.array
+                journey geometries, only bounding boxes are tested against the region if None
+            date_min: datetime
+                Minimum date, unbounded if None
+            date_max: datetime
+                Maximum date, unbounded if None
+
+        Returns
+        -------
+            indices: np.array
+                sorted journey indices
+
+        """
+        indices = np.sort(self.tree.query(region, predicate="intersects"))
+        indices = self.filter_dates(indices, date_min, date_max)
+        if geometries is not None:
+            indices = indices[shapely.intersects(geometries[indices], region)]
+        return indices
+
+journey_indexes = {}
+
+def journey_index(
+        roads,
+    ):
+    """ 
+    Spatial index of a roads dataframe or journey store, cached against it and rebuilt if its geometries change.
+    
+    Parameters
+    ----------
+        roads: Geopandas dataframe or store.Journey_Store
+            Road journeys
+
+    Returns
+    -------
+        index: Journey_Index
+            index in the crs of the journeys
+
+    """
+    if isinstance(roads, Journey_Store):
+        current = (len(roads), id(roads.coords))
+    else:
+        current = projection.fingerprint(roads["geometry"])
+    key = id(roads)
+    if key not in journey_indexes or journey_indexes[key][0] != current:
+        if key not in journey_indexes:
+            weakref.finalize(roads, journey_indexes.pop, key, None)
+        index = Journey_Index.from_store(roads) if isinstance(roads, Journey_Store) else Journey_Index.from_roads(roads)
+        journey_indexes[key] = (current, index)
+    return journey_indexes[key][1]
+
+def journey_positions(
+        roads,
+        xlim,
+        ylim,
+        date_min = None,
+        date_max = None,
+    ):
+    """ 
+    Positions of the journeys of a roads dataframe passing through a bounding box, within a date range.
+    Pass the loaded roads rather than a date filtered copy, the index is then built once and reused across queries.
+    
+    Parameters
+    ----------
+        roads: Geopandas dataframe
+            Road journeys
+        xlim: np.array
+            x extent in the crs of the journeys e.g. longitude, unbounded if None
+        ylim: np.array
+            y extent in the crs of the journeys e.g. latitude, unbounded if None
+        date_min: datetime or str
+            Minimum date, unbounded if None
+        date_max: datetime or str
+            Maximum date, unbounded if None
+
+    Returns
+    -------
+        indices: np.array
+            sorted journey positions, for roads.iloc
+
+    """
+    indices = journey_index(roads).query(xlim, ylim, date_min, date_max)
+    if xlim is not None and xlim[0] is not None:
+        geometries = roads["geometry"].to_numpy()
+        indices = indices[shapely.intersects(geometries[indices], shapely.box(xlim[0], ylim[0], xlim[1], ylim[1]))]
+    return indices
+
+def roads_in_bbox(
+        roads,
+        xlim,
+        ylim,
+        date_min = None,
+        date_max = None,
+        clip = False,
+    ):
+    """ 
+    Journeys of a roads dataframe passing through a bounding box, within a date range.
+    
+    Parameters
+    ----------
+        roads: Geopandas dataframe
+            Road journeys
+        xlim: np.array
+            x extent in the crs of the journeys e.g. longitude
+        ylim: np.array
+            y extent in the crs of the journeys e.g. latitude
+        date_min: datetime or str
+            Minimum date, unbounded if None
+        date_max: datetime or str
+            Maximum date, unbounded if None
+        clip: bool
+            clip the journey geometries to the bounding box
+
+    Returns
+    -------
+        roads: Geopandas dataframe
+            intersecting journeys, the input dataframe itself if every journey is selected and not clipped
+
+    """
+    indices = journey_positions(roads, xlim, ylim, date_min, date_max)
+    if len(indices) == roads.shape[0] and not clip:
+        return roads
+    roads = roads.iloc[indices].copy()
+    if clip:
+        roads["geometry"] = roads["geometry"].clip_by_rect(xlim[0], ylim[0], xlim[1], ylim[1])
+    return roads
@@ -0,0 +1,479 @@
+import os
+import json
+import shutil
+import datetime
+
+import numpy as np
+import pandas as pd
+import shapely
+
+class Journey_Store:
+    def __init__(
+        self,
+        coords,
+        offsets,
+        ids,
+        date,
+        time_of_day,
+        distance,
+        duration,
+        crs = "EPSG:4326",
+        bounds = None,
+        vertex_time = None,
+    ):
+        """ 
+        Columnar store of road journeys: one contiguous coordinate buffer with offsets per journey and numeric columns.
+        
+        Parameters
+        ----------
+        coords: np.array
+            (n_coordinates, 2) x, y coordinates of all journeys in order, float64 or float32
+        offsets: np.array
+            (n_journeys + 1) start of each journey in coords, the last entry is n_coordinates
+        ids: np.array
+            journey IDs
+        date: np.array
+            datetime64[ns] date of each journey
+        time_of_day: np.array
+            int64 nanoseconds from midnight of the journey start
+        distance: np.array
+            journey distances
+        duration: np.array
+            journey durations
+        crs: str
+            crs of the coordinates
+        bounds: np.array
+            (n_journeys, 4) xmin, ymin, xmax, ymax of each journey, computed when first needed if None
+        vertex_time: np.array
+            (n_coordinates) datetime64[ns] time of each coordinate, NaT where unknown. None if no times are known
+
+        """
+        self.coords = coords
+        self.offsets = offsets
+        self.ids = ids
+        self.date = date
+        self.time_of_day = time_of_day
+        self.distance = distance
+        self.duration = duration
+        self.crs = crs
+        self.bounds_array = bounds
+        self.vertex_time = vertex_time
+
+    @classmethod
+    def from_columns(
+        cls,
+        columns,
+        crs = "EPSG:4326",
+        dtype = np.float64,
+    ):
+        """ 
+        Build from column arrays, see load.read_date_columns.
+        
+        Parameters
+        ----------
+            columns: dict
+                arrays of ID, date, time, geometry, distance and duration, optionally vertex_time
+            crs: str
+                crs of the geometries
+            dtype: np.dtype
+                coordinate precision, float32 halves the coordinate buffer (about 1m at the equator)
+
+        Returns
+        -------
+            store: Journey_Store
+                journeys
+
+        """
+        geometries = np.asarray(columns["geometry"])
+        counts = shapely.get_num_coordinates(geometries)
+        time_of_day = np.fromiter(
+            ((t.hour*3600 + t.minute*60 + t.second)*10**9 + t.microsecond*1000 for t in columns["time"]),
+            dtype=np.int64, count=len(geometries),
+        )
+        vertex_time = None
+        if "vertex_time" in columns:
+            lengths = np.fromiter((len(times) for times in columns["vertex_time"]), dtype=np.int64, count=len(geometries))
+            known = (lengths == counts) & (counts > 0)
+            if np.any(known):
+                vertex_time = np.full(counts.sum(), np.datetime64("NaT", "ns"))
+                vertex_time[np.repeat(known, counts)] = np.concatenate(np.asarray(columns["vertex_time"], dtype=object)[known]).astype("datetime64[ns]")
+        return cls(
+            coords = shapely.get_coordinates(geometries).astype(dtype, copy=False),
+            offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64),
+            ids = np.asarray(columns["ID"], dtype=str),
+            date = np.asarray(columns["date"], dtype="datetime64[ns]"),
+            time_of_day = time_of_day,
+            distance = np.asarray(columns["distance"], dtype=float),
+            duration = np.asarray(columns["duration"], dtype=float),
+            crs = str(crs),
+            vertex_time = vertex_time,
+        )
+
+    @classmethod
+    def from_roads(
+        cls,
+        roads,
+        dtype = np.float64,
+    ):
+        """ 
+        Build from a roads dataframe.
+        
+        Parameters
+        ----------
+            roads: Geopandas dataframe
+                Road journeys
+            dtype: np.dtype
+                coordinate precision
+
+        Returns
+        -------
+            store: Journey_Store
+                journeys
+
+        """
+        columns = {key: roads[key].to_numpy() for key in ["ID", "date", "time", "geometry", "distance", "duration", "vertex_time"] if key in roads.columns}
+        return cls.from_columns(columns, roads.crs, dtype)
+
+    @classmethod
+    def concatenate(
+        cls,
+        stores,
+    ):
+        """ 
+        Join stores with the same crs in order.
+        
+        Parameters
+        ----------
+            stores: list
+                Journey_Store instances
+
+        Returns
+        -------
+            store: Journey_Store
+                all journeys
+
+        """
+        starts = np.cumsum([0] + [len(store.coords) for store in stores[:-1]])
+        vertex_time = None
+        if any(store.vertex_time is not None for store in stores):
+            vertex_time = np.concatenate([
+                store.vertex_time if store.vertex_time is not None else np.full(len(store.coords), np.datetime64("NaT", "ns"))
+                for store in stores
+            ])
+        return cls(
+            coords = np.concatenate([store.coords for store in stores]),
+            offsets = np.concatenate([[0]] + [store.offsets[1:] + start for store, start in zip(stores, starts)]).astype(np.int64),
+            ids = np.concatenate([store.ids for store in stores]),
+            date = np.concatenate([store.date for store in stores]),
+            time_of_day = np.concatenate([store.time_of_day for store in stores]),
+            distance = np.concatenate([store.distance for store in stores]),
+            duration = np.concatenate([store.duration for store in stores]),
+            crs = stores[0].crs,
+            vertex_time = vertex_time,
+        )
+
+    def to_roads(self):
+        """ 
+        Convert to a roads dataframe with the columns of load.load_in_roads.
+        
+        Parameters
+        ----------
+
+        Returns
+        -------
+            roads: Geopandas dataframe
+                Road journeys
+
+        """
+        import geopandas as gpd
+
+        if len(self) > 0:
+            geometries = shapely.linestrings(self.coords.astype(np.float64, copy=False), indices=self.line_index())
+        else:
+            geometries = np.array([], dtype=object)
+        midnight = datetime.datetime.min
+        time = np.array([(midnight + datetime.timedelta(microseconds=int(t)//1000)).time() for t in self.time_of_day], dtype=object)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            speed = self.distance / self.duration
+        #Journeys without any known point time get an empty array
+        vertex_time = np.empty(len(self), dtype=object)
+        vertex_time.fill(np.array([], dtype="datetime64[ns]"))
+        if self.vertex_time is not None and len(self) > 0:
+            known = np.bincount(self.line_index()[~np.isnat(self.vertex_time)], minlength=len(self)) > 0
+            journey_times = pd.Series(np.split(self.vertex_time, self.offsets[1:-1]), dtype=object).to_numpy()
+            vertex_time[known] = journey_times[known]
+        return gpd.GeoDataFrame(data={
+            "ID" : pd.Series(self.ids, dtype=str),
+            "date" : self.date,
+            "time" : time,
+            "geometry" : gpd.GeoSeries(geometries, crs=self.crs),
+            "distance" : self.distance,
+            "duration" : self.duration,
+            "speed" : speed,
+            "vertex_time" : vertex_time,
+        }, crs=self.crs)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    @property
+    def x(self):
+        """ 
+        View of the x coordinates of all journeys.
+        """
+        return self.coords[:,0]
+
+    @property
+    def y(self):
+        """ 
+        View of the y coordinates of all journeys.
+        """
+        return self.coords[:,1]
+
+    @property
+    def start(self):
+        """ 
+        datetime64[ns] start of each journey.
+        """
+        return self.date + self.time_of_day.astype("timedelta64[ns]")
+
+    @property
+    def speed(self):
+        """ 
+        Average speed of each journey.
+        """
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return self.distance / self.duration
+
+    @property
+    def bounds(self):
+        """ 
+        (n_journeys, 4) xmin, ymin, xmax, ymax of each journey, NaN for journeys without coordinates.
+        """
+        if self.bounds_array is None:
+            bounds = np.full((len(self), 4), np.nan)
+            has_coords = self.counts() > 0
+            if np.any(has_coords):
+                starts = self.offsets[:-1][has_coords]
+                for i, (reduce, axis) in enumerate([(np.minimum, 0), (np.minimum, 1), (np.maximum, 0), (np.maximum, 1)]):
+                    bounds[has_coords, i] = reduce.reduceat(self.coords[:,axis], starts)
+            self.bounds_array = bounds
+        return self.bounds_array
+
+    def counts(self):
+        """ 
+        Number of coordinates of each journey.
+        """
+        return np.diff(self.offsets)
+
+    def line_index(self):
+        """ 
+        Journey index of each coordinate.
+        """
+        return np.repeat(np.arange(len(self)), self.counts())
+
+    def journey(
+        self,
+        i,
+    ):
+        """ 
+        View of the coordinates of a journey.
+        
+        Parameters
+        ----------
+            i: int
+                journey index
+
+        Returns
+        -------
+            coords: np.array
+                (n, 2) coordinates, a view into the coordinate buffer
+
+        """
+        return self.coords[self.offsets[i]:self.offsets[i+1]]
+
+    def slice(
+        self,
+        a,
+        b,
+    ):
+        """ 
+        Journeys a to b sharing the buffers of this store.
+        
+        Parameters
+        ----------
+            a: int
+                first journey
+            b: int
+                end journey, exclusive
+
+        Returns
+        -------
+            store: Journey_Store
+                view of journeys a to b
+
+        """
+        return Journey_Store(
+            self.coords[self.offsets[a]:self.offsets[b]], self.offsets[a:b+1] - self.offsets[a],
+            self.ids[a:b], self.date[a:b], self.time_of_day[a:b], self.distance[a:b], self.duration[a:b], self.crs,
+            None if self.bounds_array is None else self.bounds_array[a:b],
+            None if self.vertex_time is None else self.vertex_time[self.offsets[a]:self.offsets[b]],
+        )
+
+    def select(
+        self,
+        mask,
+    ):
+        """ 
+        Copy of the journeys selected by a boolean mask.
+        
+        Parameters
+        ----------
+            mask: np.array
+                boolean per journey
+
+        Returns
+        -------
+            store: Journey_Store
+                selected journeys
+
+        """
+        counts = self.counts()
+        keep = np.repeat(mask, counts)
+        return Journey_Store(
+            self.coords[keep], np.concatenate([[0], np.cumsum(counts[mask])]).astype(np.int64),
+            self.ids[mask], self.date[mask], self.time_of_day[mask], self.distance[mask], self.duration[mask], self.crs,
+            vertex_time = None if self.vertex_time is None else self.vertex_time[keep],
+        )
+
+    def date_range(
+        self,
+        date_min = None,
+        date_max = None,
+    ):
+        """ 
+        Journeys between two dates, inclusive. Views if the journeys are in date order.
+        
+        Parameters
+        ----------
+            date_min: datetime
+                Minimum date, unbounded if None
+            date_max: datetime
+                Maximum date, unbounded if None
+
+        Returns
+        -------
+            store: Journey_Store
+                journeys in the date range
+
+        """
+        date_min = np.datetime64(date_min if date_min is not None else "NaT", "ns")
+        date_max = np.datetime64(date_max if date_max is not None else "NaT", "ns")
+        if np.all(self.date[1:] >= self.date[:-1]):
+            a = 0 if np.isnat(date_min) else np.searchsorted(self.date, date_min, side="left")
+            b = len(self) if np.isnat(date_max) else np.searchsorted(self.date, date_max, side="right")
+            return self.slice(a, b)
+        mask = np.ones(len(self), dtype=bool)
+        if not np.isnat(date_min):
+            mask &= self.date >= date_min
+        if not np.isnat(date_max):
+            mask &= self.date <= date_max
+        return self.select(mask)
+
+    def project(
+        self,
+        crs,
+    ):
+        """ 
+        Journeys with coordinates transformed to another crs, sharing all other columns.
+        
+        Parameters
+        ----------
+            crs: str
+                output crs e.g. "EPSG:3857"
+
+        Returns
+        -------
+            store: Journey_Store
+                projected journeys
+
+        """
+        from roadmaps.projection import transformer
+
+        x, y = transformer(self.crs, crs).transform(self.x, self.y)
+        coords = np.column_stack([x, y]).astype(self.coords.dtype, copy=False)
+        return Journey_Store(coords, self.offsets, self.ids, self.date, self.time_of_day, self.distance, self.duration, crs, vertex_time=self.vertex_time)
+
+    columns = ["coords", "offsets", "ids", "date", "time_of_day", "distance", "duration"]
+
+    def save(
+        self,
+        folder,
+        meta = None,
+    ):
+        """ 
+        Write the store as one .npy file per column, the journey bounds and any coordinate times, replacing the folder atomically.
+        
+        Parameters
+        ----------
+            folder: str
+                archive directory
+            meta: dict
+                extra json serialisable information kept in meta.json
+
+        Returns
+        -------
+
+        """
+        tmp = f"{folder}.tmp"
+        if os.path.exists(tmp):
+            shutil.rmtree(tmp)
+        os.makedirs(tmp)
+        for column in self.columns + ["bounds"]:
+            np.save(f"{tmp}/{column}.npy", np.ascontiguousarray(getattr(self, column)))
+        if self.vertex_time is not None:
+            np.save(f"{tmp}/vertex_time.npy", np.ascontiguousarray(self.vertex_time))
+        with open(f"{tmp}/meta.json", "w") as f:
+            json.dump({"crs": self.crs, "n_journeys": len(self), **(meta or {})}, f)
+        if os.path.exists(folder):
+            shutil.rmtree(folder)
+        os.replace(tmp, folder)
+        return
+
+    @classmethod
+    def open(
+        cls,
+        folder,
+        mmap = True,
+    ):
+        """ 
+        Open a store written with save. Memory mapped columns are read lazily from the page cache and shared between processes.
+        
+        Parameters
+        ----------
+            folder: str
+                archive directory
+            mmap: bool
+                memory map the columns read only, otherwise read them into memory
+
+        Returns
+        -------
+            store: Journey_Store
+                journeys
+            meta: dict
+                contents of meta.json
+
+        """
+        with open(f"{folder}/meta.json", "r") as f:
+            meta = json.load(f)
+        columns = {column: np.load(f"{folder}/{column}.npy", mmap_mode="r" if mmap else None) for column in cls.columns + ["bounds"]}
+        if os.path.exists(f"{folder}/vertex_time.npy"):
+            columns["vertex_time"] = np.load(f"{folder}/vertex_time.npy", mmap_mode="r" if mmap else None)
+        return cls(**columns, crs=meta["crs"]), meta
+
+    @property
+    def nbytes(self):
+        """ 
+        Memory held by the store buffers in bytes.
+        """
+        return sum(array.nbytes for array in [self.coords, self.offsets, self.ids, self.date, self.time_of_day, self.distance, self.duration, self.vertex_time] if array is not None)
@@ -0,0 +1,344 @@
+import os
+import io
+import hashlib
+import urllib.parse
+import urllib.request
+
+import numpy as np
+
+from roadmaps import projection
+from roadmaps.simplify import earth_circumference
+
+def tile_range(
+        xlim,
+        ylim,
+        zoom,
+    ):
+    """ 
+    Tiles covering a web mercator extent.
+    
+    Parameters
+    ----------
+        xlim: np.array
+            x extent in EPSG:3857 metres
+        ylim: np.array
+            y extent in EPSG:3857 metres
+        zoom: int
+            web map zoom level
+
+    Returns
+    -------
+        x_tiles: range
+            tile columns, west to east
+        y_tiles: range
+            tile rows, north to south
+
+    """
+    n = 2**zoom
+    size = earth_circumference / n
+    x_min, x_max = np.floor((np.array(sorted(xlim)) + earth_circumference/2) / size).astype(int)
+    y_min, y_max = np.floor((earth_circumference/2 - np.array(sorted(ylim)[::-1])) / size).astype(int)
+    return range(max(x_min, 0), min(x_max, n - 1) + 1), range(max(y_min, 0), min(y_max, n - 1) + 1)
+
+class Tile_Cache:
+    def __init__(
+        self,
+        folder,
+        source,
+        max_mb = 1000,
+        offline = False,
+    ):
+        """ 
+        Local XYZ directory cache of basemap tiles with least recently used eviction.
+        
+        Parameters
+        ----------
+        folder: str
+            tile cache directory, tiles are kept in a subfolder per source
+        source: str
+            tile url template with {z}, {x} and {y} e.g. "https://tile.openstreetmap.org/{z}/{x}/{y}.png" or "file:///tiles/{z}/{x}/{y}.png"
+        max_mb: float
+            maximum size of the cached tiles in MB
+        offline: bool
+            only use cached tiles, missing tiles raise FileNotFoundError
+
+        """
+        self.source = source
+        #Tiles are cached with the extension of the source e.g. .png or .jpg
+        self.ext = os.path.splitext(urllib.parse.urlsplit(source).path)[1] or ".png"
+        self.folder = f"{folder}/{hashlib.sha1(source.encode()).hexdigest()[:12]}"
+        self.max_bytes = max_mb * 1024**2
+        self.offline = offline
+        self.n_bytes = None
+
+    def tile_path(
+        self,
+        zoom,
+        x,
+        y,
+    ):
+        """ 
+        Path of a cached tile.
+        """
+        return f"{self.folder}/{zoom}/{x}/{y}{self.ext}"
+
+    def cached_files(self):
+        """ 
+        Cached tiles with their sizes and last access times.
+        
+        Parameters
+        ----------
+
+        Returns
+        -------
+            files: list
+                (access time, size, path) of every cached tile
+
+        """
+        files = []
+        for root, _, names in os.walk(self.folder):
+            for name in names:
+                path = os.path.join(root, name)
+                stat = os.stat(path)
+                files.append((stat.st_mtime_ns, stat.st_size, path))
+        return files
+
+    def evict(self):
+        """ 
+        Remove least recently used tiles until the cache is within its size bound.
+        
+        Parameters
+        ----------
+
+        Returns
+        -------
+            n_removed: int
+                number of tiles removed
+
+        """
+        files = sorted(self.cached_files())
+        self.n_bytes = sum(size for _, size, _ in files)
+        n_removed = 0
+        for _, size, path in files:
+            if self.n_bytes <= self.max_bytes:
+                break
+            os.remove(path)
+            self.n_bytes -= size
+            n_removed += 1
+        return n_removed
+
+    def fetch(
+        self,
+        zoom,
+        x,
+        y,
+    ):
+        """ 
+        Path of a tile, downloaded from the source if it is not cached.
+        Cached tiles are marked as used so that eviction removes the least recently used first.
+        
+        Parameters
+        ----------
+            zoom: int
+                web map zoom level
+            x: int
+                tile column
+            y: int
+                tile row
+
+        Returns
+        -------
+            path: str
+                path of cached tile
+
+        """
+        path = self.tile_path(zoom, x, y)
+        if os.path.exists(path):
+            os.utime(path)
+            return path
+        if self.offline:
+            raise FileNotFoundError(f"Tile {zoom}/{x}/{y} is not cached and tiles are offline, prefetch it with scripts/prefetch_tiles.py")
+
+        request = urllib.request.Request(self.source.format(z=zoom, x=x, y=y), headers={"User-Agent": "roadmaps"})
+        with urllib.request.urlopen(request, timeout=30) as response:
+            data = response.read()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(f"{path}.tmp", "wb") as f:
+            f.write(data)
+        os.replace(f"{path}.tmp", path)
+
+        if self.n_bytes is None:
+            self.n_bytes = sum(size for _, size, _ in self.cached_files())
+        else:
+            self.n_bytes += len(data)
+        if self.n_bytes > self.max_bytes:
+            self.evict()
+        return path
+
+    def prefetch(
+        self,
+        xlim,
+        ylim,
+        zoom,
+    ):
+        """ 
+        Download every tile of an extent at a zoom level that is not cached yet.
+        
+        Parameters
+        ----------
+            xlim: np.array
+                x extent in EPSG:3857 metres
+            ylim: np.array
+                y extent in EPSG:3857 metres
+            zoom: int
+                web map zoom level
+
+        Returns
+        -------
+            n_tiles: int
+                number of tiles covering the extent
+
+        """
+        x_tiles, y_tiles = tile_range(xlim, ylim, zoom)
+        for x in x_tiles:
+            for y in y_tiles:
+                self.fetch(zoom, x, y)
+        return len(x_tiles)*len(y_tiles)
+
+    def mosaic(
+        self,
+        xlim,
+        ylim,
+        zoom,
+    ):
+        """ 
+        Stitch the tiles of an extent into one image, at the pixel size of the first tile e.g. 256 or 512 for @2x sources.
+        Tiles are decoded by their content so png and jpeg sources both work, tiles of another size are resampled to fit.
+        
+        Parameters
+        ----------
+            xlim: np.array
+                x extent in EPSG:3857 metres
+            ylim: np.array
+                y extent in EPSG:3857 metres
+            zoom: int
+                web map zoom level
+
+        Returns
+        -------
+            image: np.array
+                (height, width, 4) RGBA image, north up
+            extent: tuple
+                (left, right, bottom, top) of the image in EPSG:3857 metres
+
+        """
+        from PIL import Image
+
+        x_tiles, y_tiles = tile_range(xlim, ylim, zoom)
+        image = None
+        for i, y in enumerate(y_tiles):
+            for j, x in enumerate(x_tiles):
+                with open(self.fetch(zoom, x, y), "rb") as f:
+                    tile = Image.open(io.BytesIO(f.read())).convert("RGBA")
+                if image is None:
+                    cell = tile.width
+                    image = np.ones((len(y_tiles)*cell, len(x_tiles)*cell, 4))
+                if tile.size != (cell, cell):
+                    tile = tile.resize((cell, cell), Image.BILINEAR)
+                image[i*cell:(i+1)*cell, j*cell:(j+1)*cell] = np.asarray(tile) / 255
+        if image is None:
+            image = np.ones((0, 0, 4))
+
+        size = earth_circumference / 2**zoom
+        left = -earth_circumference/2 + x_tiles.start*size
+        top = earth_circumference/2 - y_tiles.start*size
+        return image, (left, left + len(x_tiles)*size, top - len(y_tiles)*size, top)
+
+def tile_cache(
+        config,
+    ):
+    """ 
+    Tile cache of the configured tile source.
+    
+    Parameters
+    ----------
+        config: class
+            class of configuration settings instance
+
+    Returns
+    -------
+        tiles: Tile_Cache
+            tile cache in {cache_folder}/tiles
+
+    """
+    return Tile_Cache(f"{config.working_dir}/{config.cache_dir}/tiles", config.tile_source, config.tile_cache_mb, config.tiles_offline)
+
+def add_basemap(
+        ax,
+        zoom,
+        config,
+    ):
+    """ 
+    Draw the basemap under the current limits of a web mercator axis from the tile cache.
+    
+    Parameters
+    ----------
+        ax: matplotlib axis
+            axis in EPSG:3857 metres
+        zoom: int
+            web map zoom level
+        config: class
+            class of configuration settings instance
+
+    Returns
+    -------
+
+    """
+    xlim, ylim = ax.get_xlim(), ax.get_ylim()
+    image, extent = tile_cache(config).mosaic(xlim, ylim, zoom)
+    ax.imshow(image, extent=extent, interpolation="bilinear", zorder=0)
+    ax.set_xlim(xlim)
+    ax.set_ylim(ylim)
+    if config.tile_attribution:
+        ax.text(0.995, 0.005, config.tile_attribution, transform=ax.transAxes, ha="right", va="bottom", fontsize=6, color="dimgrey")
+    return
+
+def prefetch_regions(
+        config,
+        places = None,
+        zooms = None,
+    ):
+    """ 
+    Download the basemap tiles of bounding_boxes.yaml regions for offline rendering.
+    
+    Parameters
+    ----------
+        config: class
+            class of configuration settings instance
+        places: list
+            placenames, all regions with a bounding box if None
+        zooms: list
+            zoom levels, the region resolution if None
+
+    Returns
+    -------
+        n_tiles: dict
+            number of tiles per (place, zoom)
+
+    """
+    from roadmaps.format_data import restrict_plot
+
+    tiles = tile_cache(config)
+    if places is None:
+        places = [place for place, box in config.plot_bounding_box.items() if isinstance(box, dict)]
+    n_tiles = {}
+    for place in places:
+        xlim, ylim, resolution = restrict_plot(place, config)
+        if xlim[0] is None:
+            continue
+        #Same transform as the axis limits of plot_road_map
+        x, y = projection.transformer("EPSG:4326", config.crs_OUT).transform(np.array(xlim, dtype=float), np.array(ylim, dtype=float))
+        for zoom in ([resolution] if zooms is None else zooms):
+            n_tiles[(place, zoom)] = tiles.prefetch(x, y, zoom)
+            print(f"{place} zoom {zoom}: {n_tiles[(place, zoom)]} tiles")
+    return n_tiles
@@ -0,0 +1,151 @@
+import numpy as np
+
+from roadmaps.functions import convert_distance, convert_time
+from roadmaps.store import Journey_Store
+
+#Mean earth radius in meters
+earth_radius = 6371008.8
+
+def haversine(
+        lon1,
+        lat1,
+        lon2,
+        lat2,
+    ):
+    """ 
+    Great circle distance between pairs of points.
+    
+    Parameters
+    ----------
+        lon1: np.array
+            longitude of first points in degrees
+        lat1: np.array
+            latitude of first points in degrees
+        lon2: np.array
+            longitude of second points in degrees
+        lat2: np.array
+            latitude of second points in degrees
+
+    Returns
+    -------
+        distance: np.array
+            distance in meters
+
+    """
+    lon1, lat1, lon2, lat2 = (np.radians(np.asarray(a, dtype=np.float64)) for a in (lon1, lat1, lon2, lat2))
+    a = np.sin((lat2 - lat1)/2)**2 + np.cos(lat1)*np.cos(lat2)*np.sin((lon2 - lon1)/2)**2
+    return 2*earth_radius*np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+def segment_index(
+        offsets,
+    ):
+    """ 
+    Segments between consecutive coordinates of each journey, none between journeys.
+    
+    Parameters
+    ----------
+        offsets: np.array
+            (n_journeys + 1) start of each journey in the coordinates, see store.Journey_Store
+
+    Returns
+    -------
+        start: np.array
+            coordinate index of the start of each segment, the segment ends at start + 1
+        journey: np.array
+            journey index of each segment
+
+    """
+    counts = np.diff(offsets)
+    #The last coordinate of each journey starts no segment
+    starts = np.ones(offsets[-1], dtype=bool)
+    starts[offsets[1:][counts > 0] - 1] = False
+    return np.nonzero(starts)[0], np.repeat(np.arange(len(counts)), np.maximum(counts - 1, 0))
+
+def segment_speeds(
+        lon,
+        lat,
+        vertex_time,
+        offsets,
+        journey_speed = None,
+        distance_unit = "km",
+        time_unit = "hours",
+    ):
+    """ 
+    Distance, duration and speed of every segment of all journeys at once.
+    Segments without timestamps at both ends take the average speed of their journey if given, otherwise NaN.
+    
+    Parameters
+    ----------
+        lon: np.array
+            longitude of all journeys, in order
+        lat: np.array
+            latitude of all journeys, in order
+        vertex_time: np.array
+            datetime64[ns] time of each coordinate, NaT where unknown. None if no times are known
+        offsets: np.array
+            (n_journeys + 1) start of each journey in the coordinates, see store.Journey_Store
+        journey_speed: np.array
+            average speed of each journey in distance_unit per time_unit
+        distance_unit: str
+            unit of distances e.g. "miles"
+        time_unit: str
+            unit of durations e.g. "hours"
+
+    Returns
+    -------
+        distance: np.array
+            distance of each segment
+        duration: np.array
+            duration of each segment, NaN where unknown
+        speed: np.array
+            speed of each segment, NaN where unknown
+
+    """
+    start, journey = segment_index(offsets)
+    end = start + 1
+    distance = haversine(lon[start], lat[start], lon[end], lat[end]) / convert_distance(distance_unit)
+    if vertex_time is not None:
+        vertex_time = np.asarray(vertex_time, dtype="datetime64[ns]")
+        duration = (vertex_time[end] - vertex_time[start]) / np.timedelta64(1, "s") / convert_time(time_unit)
+    else:
+        duration = np.full(len(start), np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        speed = np.where(duration > 0, distance / duration, np.nan)
+    if journey_speed is not None:
+        unknown = np.isnan(speed)
+        speed[unknown] = np.asarray(journey_speed, dtype=float)[journey[unknown]]
+    return distance, duration, speed
+
+def journey_segment_speeds(
+        journeys,
+        config,
+    ):
+    """ 
+    Distance, duration and speed of every segment of a roads dataframe or Journey_Store, see segment_speeds.
+    Journeys without per coordinate timestamps use their average speed.
+    
+    Parameters
+    ----------
+        journeys: Geopandas dataframe or store.Journey_Store
+            Road journeys
+        config: class
+            class of configuration settings instance
+
+    Returns
+    -------
+        distance: np.array
+            distance of each segment in config.distance_unit
+        duration: np.array
+            duration of each segment in config.time_unit, NaN where unknown
+        speed: np.array
+            speed of each segment, in the order of lines.journey_segments
+
+    """
+    if not isinstance(journeys, Journey_Store):
+        journeys = Journey_Store.from_roads(journeys)
+    if str(journeys.crs) != str(config.crs_IN):
+        journeys = journeys.project(config.crs_IN)
+    return segment_speeds(
+        journeys.x, journeys.y, journeys.vertex_time, journeys.offsets, journeys.speed,
+        config.distance_unit, config.time_unit,
+    )
@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+"""
+Compare the resident memory of synthetic journeys held as a roads dataframe and as a Journey_Store.
+Each representation is measured in a fresh process, linux only.
+
+Run from the repository root, python scripts/benchmark_journey_store.py [number of days]
+"""
+import os
+import sys
+import gc
+import ctypes
+import subprocess
+from pathlib import Path
+
+#Generate_Config expects to be run from a folder inside the repository
+os.chdir(Path(__file__).resolve().parent)
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import numpy as np
+
+def rss_mb():
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+
+def measure(mode, n_days):
+    from roadmaps.store import Journey_Store
+    from synthetic import synthetic_roads
+    import geopandas
+
+    #Warm up imports so that only the journeys are measured
+    synthetic_roads(1, n_points=2)
+    baseline = rss_mb()
+    roads = synthetic_roads(n_days, trips_per_day=4, n_points=300)
+    if mode != "roads":
+        dtype = np.float32 if mode == "store32" else np.float64
+        journeys = Journey_Store.from_roads(roads, dtype=dtype)
+        del roads
+        gc.collect()
+        #Return memory freed by the dataframe to the system
+        ctypes.CDLL("libc.so.6").malloc_trim(0)
+        print(f"{mode}: {rss_mb() - baseline:.0f}MB resident, {journeys.nbytes/1024**2:.0f}MB of buffers")
+    else:
+        print(f"{mode}: {rss_mb() - baseline:.0f}MB resident")
+    return
+
+def main():
+    if len(sys.argv) > 2:
+        measure(sys.argv[2], int(sys.argv[1]))
+        return
+    n_days = sys.argv[1] if len(sys.argv) > 1 else "1825"
+    print(f"{n_days} days of synthetic journeys with 300 coordinates each")
+    for mode in ["roads", "store64", "store32"]:
+        subprocess.run([sys.executable, __file__, n_days, mode], check=True)
+    return
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+"""
+Compare drawing synthetic journeys with GeoSeries.plot and with the single LineCollection of roadmaps.lines.
+Times include building the artists and rendering the figure with the Agg backend.
+
+Run from the repository root, python scripts/benchmark_line_collection.py [number of days]
+"""
+import os
+import sys
+import time
+from pathlib import Path
+
+#Generate_Config expects to be run from a folder inside the repository
+os.chdir(Path(__file__).resolve().parent)
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import numpy as np
+
+from roadmaps import lines, projection
+from roadmaps.store import Journey_Store
+from synthetic import synthetic_roads
+
+def timed(name, draw):
+    f, ax = plt.subplots(1,1)
+    f.set_size_inches(11.69, 8.27)
+    t0 = time.perf_counter()
+    draw(ax)
+    f.canvas.draw()
+    print(f"{name:<32} {time.perf_counter() - t0:7.2f}s")
+    plt.close(f)
+    return
+
+def add(ax, collection):
+    ax.add_collection(collection)
+    ax.autoscale_view()
+    #As GeoSeries.plot does for projected data
+    ax.set_aspect("equal")
+    return
+
+def main():
+    n_days = int(sys.argv[1]) if len(sys.argv) > 1 else 3650
+    roads = synthetic_roads(n_days, trips_per_day=50, n_points=20)
+    geometry = projection.projected_geometry(roads, "EPSG:3857")
+    journeys = Journey_Store.from_roads(roads).project("EPSG:3857")
+    n_segments = len(journeys.coords) - len(journeys)
+    print(f"{len(journeys)} journeys, {n_segments} segments")
+
+    timed("GeoSeries.plot", lambda ax: geometry.plot(ax=ax, color="navy", linewidth=.3, alpha=0.6))
+    timed("geometry_collection", lambda ax: add(ax, lines.geometry_collection(geometry, colors="navy", widths=.3, alpha=0.6)))
+    timed("store_collection", lambda ax: add(ax, lines.store_collection(journeys, colors="navy", widths=.3, alpha=0.6)))
+    timed("store_collection, journey speed", lambda ax: add(ax, lines.store_collection(journeys, values=journeys.speed, cmap="viridis", widths=.3)))
+    segment_values = np.random.default_rng(0).random(n_segments)
+    timed("store_collection, segment values", lambda ax: add(ax, lines.store_collection(journeys, values=segment_values, cmap="viridis", widths=.3)))
+    return
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+"""
+Benchmark the scaling of load_in_roads with the number of days.
+
+Run from the repository root, python scripts/benchmark_load_in_roads.py
+"""
+import os
+import sys
+import time
+import tempfile
+from pathlib import Path
+
+#Generate_Config expects to be run from a folder inside the repository
+os.chdir(Path(__file__).resolve().parent)
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import pandas as pd
+
+from roadmaps import load
+from synthetic import write_days
+
+def time_assembly(
+        n_days,
+        config,
+    ):
+    """ 
+    Time merging in memory days with repeated pd.concat against building once from column arrays.
+    
+    Parameters
+    ----------
+        n_days: int
+            number of days
+        config: class
+            class of configuration settings instance
+
+    Returns
+    -------
+        t_concat: float
+            seconds for repeated concatenation
+        t_collect: float
+            seconds for collect then build
+
+    """
+    days = [load.read_date_columns(config.date_min, config)]*n_days
+
+    t0 = time.perf_counter()
+    for di, columns_day in enumerate(days):
+        df_day = load.build_roads([columns_day], config)
+        roads = df_day if di == 0 else pd.concat([roads, df_day], ignore_index = True)
+    t_concat = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    roads = load.build_roads(days, config)
+    t_collect = time.perf_counter() - t0
+    return t_concat, t_collect
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        config = load.Generate_Config()
+        n_days_max = 400
+        dates = write_days(tmp, n_days_max)
+        config.change_dir(road_dir_new=os.path.relpath(tmp, config.working_dir))
+        config.date_min = dates[0]
+        config.use_cache = False
+
+        print("Merging days in memory")
+        print(f"{'days':>6} {'concat (s)':>12} {'collect (s)':>12}")
+        for n_days in [250, 500, 1000, 2000]:
+            t_concat, t_collect = time_assembly(n_days, config)
+            print(f"{n_days:>6} {t_concat:>12.3f} {t_collect:>12.3f}")
+
+        print("load_in_roads")
+        print(f"{'days':>6} {'time (s)':>12} {'ms/day':>12}")
+        for n_days in [50, 100, 200, 400]:
+            config.date_max = dates[n_days-1]
+            t0 = time.perf_counter()
+            roads = load.load_in_roads(config)
+            t = time.perf_counter() - t0
+            print(f"{n_days:>6} {t:>12.3f} {1e3*t/n_days:>12.2f}")
+    return
+
+if __name__ == "__main__":
+    main()
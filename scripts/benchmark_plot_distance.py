@@ -0,0 +1,46 @@
+#!/usr/bin/env python
+"""
+Benchmark the daily aggregation behind plot_distance on ten years of synthetic journeys.
+
+Run from the repository root, python scripts/benchmark_plot_distance.py
+"""
+import os
+import sys
+import time
+from pathlib import Path
+
+#Generate_Config expects to be run from a folder inside the repository
+os.chdir(Path(__file__).resolve().parent)
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import numpy as np
+import pandas as pd
+
+from roadmaps import aggregate, load, plots
+from synthetic import synthetic_roads
+
+def main():
+    n_days = 3650
+    roads = synthetic_roads(n_days, trips_per_day=4)
+    dates = pd.date_range(roads["date"].min(), roads["date"].max(), freq="D")
+    print(f"{roads.shape[0]} journeys over {n_days} days")
+
+    t0 = time.perf_counter()
+    dT_scan = np.array([roads[roads["date"] == date]["distance"].sum() for date in dates])
+    print(f"per day scan:        {time.perf_counter() - t0:.3f}s")
+
+    t0 = time.perf_counter()
+    daily = aggregate.daily_series(roads, dates[0], dates[-1])
+    print(f"daily_series:        {time.perf_counter() - t0:.3f}s")
+    assert np.allclose(daily["distance"].to_numpy(), dT_scan)
+
+    config = load.Generate_Config()
+    config.headless = True
+    plots_class = plots.Plots(config, image_ex="png", dpi=100)
+    t0 = time.perf_counter()
+    plots_class.plot_distance(roads)
+    print(f"plot_distance:       {time.perf_counter() - t0:.3f}s")
+    return
+
+if __name__ == "__main__":
+    main()
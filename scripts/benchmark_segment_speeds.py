@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+"""
+Benchmark per segment haversine distances and speeds of synthetic timestamped journeys, and drawing them speed coloured.
+
+Run from the repository root, python scripts/benchmark_segment_speeds.py [number of segments in millions]
+"""
+import os
+import sys
+import time
+from pathlib import Path
+
+#Generate_Config expects to be run from a folder inside the repository
+os.chdir(Path(__file__).resolve().parent)
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+from matplotlib.colors import Normalize
+import numpy as np
+
+from roadmaps import lines, tracks
+from roadmaps.store import Journey_Store
+from synthetic import synthetic_roads
+
+def main():
+    n_segments = int(float(sys.argv[1])*1e6) if len(sys.argv) > 1 else 10_000_000
+    n_points = 500
+    n_days = max(1, n_segments // (4*(n_points - 1)))
+    journeys = Journey_Store.from_roads(synthetic_roads(n_days, trips_per_day=4, n_points=n_points))
+    #Timestamps of a speed varying smoothly between 10 and 70mph along each journey
+    start, journey = tracks.segment_index(journeys.offsets)
+    step = tracks.haversine(journeys.x[start], journeys.y[start], journeys.x[start+1], journeys.y[start+1]) / 1609.34
+    position = start - journeys.offsets[journey]
+    step_hours = step / (40 + 30*np.sin(position/25 + journey))
+    elapsed = np.zeros(len(journeys.coords))
+    elapsed[start+1] = step_hours*3600
+    elapsed = np.cumsum(elapsed) - np.repeat(np.cumsum(elapsed)[journeys.offsets[:-1]], journeys.counts())
+    journeys.vertex_time = np.repeat(journeys.start, journeys.counts()) + (elapsed*1e9).astype("timedelta64[ns]")
+    n_segments = len(journeys.coords) - len(journeys)
+    print(f"{len(journeys)} journeys, {n_segments/1e6:.1f} million segments")
+
+    t0 = time.perf_counter()
+    distance, duration, speed = tracks.segment_speeds(journeys.x, journeys.y, journeys.vertex_time, journeys.offsets, journeys.speed, "miles", "hours")
+    seconds = time.perf_counter() - t0
+    print(f"segment_speeds:             {seconds:.3f}s, {n_segments/seconds/1e6:.0f} million segments/s")
+
+    #Python loop over the segments of the first journeys
+    n_loop = min(len(journeys), 200)
+    t0 = time.perf_counter()
+    loop = []
+    for i in range(n_loop):
+        for k in range(journeys.offsets[i], journeys.offsets[i+1] - 1):
+            d = tracks.haversine(journeys.x[k], journeys.y[k], journeys.x[k+1], journeys.y[k+1]) / 1609.34
+            loop.append(d / ((journeys.vertex_time[k+1] - journeys.vertex_time[k]) / np.timedelta64(1, "s") / 3600))
+    seconds = time.perf_counter() - t0
+    print(f"python loop:                {seconds*n_segments/len(loop):.1f}s estimated from {len(loop)} segments")
+    assert np.allclose(loop, speed[:len(loop)])
+
+    #Drawing, first million segments
+    subset = journeys.slice(0, max(1, 10**6 // (n_points - 1)))
+    subset_speed = speed[:len(subset.coords) - len(subset)]
+    norm = Normalize(0, np.nanpercentile(speed, 99))
+    for name, n_levels in [("one line per segment", None), ("32 colour levels", 32)]:
+        f, ax = plt.subplots(1,1)
+        t0 = time.perf_counter()
+        ax.add_collection(lines.store_collection(subset, values=subset_speed, cmap="RdYlGn", norm=norm, n_levels=n_levels, widths=.5))
+        ax.autoscale_view()
+        f.canvas.draw()
+        print(f"draw {len(subset_speed)/1e6:.1f}M, {name + ':':<22} {time.perf_counter() - t0:.2f}s")
+        plt.close(f)
+    return
+
+if __name__ == "__main__":
+    main()
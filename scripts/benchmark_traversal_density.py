@@ -0,0 +1,43 @@
+#!/usr/bin/env python
+"""
+Benchmark the traversal density raster of road maps on synthetic journeys over the uk bounding box.
+
+Run from the repository root, python scripts/benchmark_traversal_density.py [number of segments in millions]
+"""
+import os
+import sys
+import time
+from pathlib import Path
+
+#Generate_Config expects to be run from a folder inside the repository
+os.chdir(Path(__file__).resolve().parent)
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import numpy as np
+import shapely
+from pyproj import Proj
+
+from roadmaps import format_data, raster
+from synthetic import synthetic_roads
+
+def main():
+    n_segments = int(float(sys.argv[1])*1e6) if len(sys.argv) > 1 else 20_000_000
+    n_points = 1000
+    n_days = max(1, n_segments // (4*(n_points - 1)))
+    roads = synthetic_roads(n_days, trips_per_day=4, n_points=n_points)
+    n_segments = int((shapely.get_num_coordinates(roads["geometry"].to_numpy()) - 1).sum())
+    print(f"{roads.shape[0]} journeys, {n_segments/1e6:.1f} million segments")
+
+    xlim, ylim, _ = format_data.restrict_plot("uk")
+    x1, y1 = Proj("EPSG:3857")(xlim[0], ylim[0])
+    x2, y2 = Proj("EPSG:3857")(xlim[1], ylim[1])
+    width = 2200
+    height = int(np.ceil(width*(y2 - y1)/(x2 - x1)))
+
+    t0 = time.perf_counter()
+    density = raster.traversal_density(roads["geometry"], [x1, x2], [y1, y2], (height, width), "EPSG:3857")
+    print(f"traversal_density:   {time.perf_counter() - t0:.3f}s for a {width}x{height} raster, {np.count_nonzero(density)} pixels driven")
+    return
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+"""
+Check the import time budget of the roadmaps package and that imports stay lazy and headless safe.
+
+Run from anywhere, python scripts/check_import_time.py
+Exits with status 1 if a check fails.
+"""
+import os
+import sys
+import subprocess
+from pathlib import Path
+
+repo_dir = str(Path(__file__).resolve().parents[1])
+
+#(statement, budget in seconds, modules that must not be imported)
+checks = [
+    ("import roadmaps", 0.05, ["matplotlib", "geopandas", "fiona", "pyproj", "contextily", "geoplot", "shapely"]),
+    ("import roadmaps.load", 3.0, ["matplotlib", "fiona", "contextily", "geoplot"]),
+    ("import roadmaps.plots", 5.0, ["fiona", "contextily", "geoplot", "matplotlib.backends.backend_tkagg"]),
+]
+
+def time_import(
+        statement,
+        repeats = 5,
+    ):
+    """ 
+    Time a statement in fresh interpreters started outside the repository, so no configuration can be read.
+    
+    Parameters
+    ----------
+        statement: str
+            import statement
+        repeats: int
+            number of interpreters, the fastest is kept
+
+    Returns
+    -------
+        seconds: float
+            fastest import time
+        modules: set
+            modules imported by the statement
+
+    """
+    code = (
+        "import sys, time\n"
+        f"sys.path.insert(0, {repo_dir!r})\n"
+        "before = set(sys.modules)\n"
+        "t0 = time.perf_counter()\n"
+        f"{statement}\n"
+        "print(time.perf_counter() - t0)\n"
+        "print(' '.join(set(sys.modules) - before))\n"
+    )
+    env = dict(os.environ)
+    env.pop("DISPLAY", None)
+    env.pop("WAYLAND_DISPLAY", None)
+    env.pop("MPLBACKEND", None)
+
+    times = []
+    for _ in range(repeats):
+        result = subprocess.run([sys.executable, "-c", code], cwd="/", env=env, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(f"{statement} failed\n{result.stderr}")
+        seconds, modules = result.stdout.strip().split("\n")[-2:]
+        times.append(float(seconds))
+    return min(times), set(modules.split())
+
+def main():
+    failed = False
+    for statement, budget, forbidden in checks:
+        try:
+            seconds, modules = time_import(statement)
+        except RuntimeError as error:
+            print(f"FAIL {error}")
+            failed = True
+            continue
+        loaded = sorted(module for module in forbidden if module in modules)
+        ok = seconds <= budget and len(loaded) == 0
+        failed = failed or not ok
+        print(f"{'ok  ' if ok else 'FAIL'} {statement:<24} {seconds*1e3:8.1f}ms (budget {budget*1e3:.0f}ms)" + (f" imported {', '.join(loaded)}" if loaded else ""))
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
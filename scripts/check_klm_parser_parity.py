@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+"""
+Check the streaming .klm reader gives the same journeys as the fiona reader and time both.
+
+Run from the repository root, python scripts/check_klm_parser_parity.py [road folder]
+With no folder synthetic days are written to a temporary directory.
+"""
+import os
+import sys
+import time
+import tempfile
+from pathlib import Path
+
+road_dir = os.path.abspath(sys.argv[1]) if len(sys.argv) > 1 else None
+
+#Generate_Config expects to be run from a folder inside the repository
+os.chdir(Path(__file__).resolve().parent)
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import numpy as np
+import pandas as pd
+
+from roadmaps import load
+from synthetic import write_day, write_days
+
+def load_with(
+        parser,
+        road_dir,
+    ):
+    """ 
+    Load all roads in a folder with the given .klm reader.
+    
+    Parameters
+    ----------
+        parser: str
+            "fiona" or "stream"
+        road_dir: str
+            folder path containing .klm driving journeys
+
+    Returns
+    -------
+        roads: Geopandas dataframe
+            Road journeys
+        t: float
+            seconds taken
+
+    """
+    config = load.Generate_Config()
+    config.change_dir(road_dir_new=os.path.relpath(road_dir, config.working_dir))
+    config.klm_parser = parser
+    config.use_cache = False
+    t0 = time.perf_counter()
+    roads = load.load_in_roads(config)
+    return roads, time.perf_counter() - t0
+
+def check(road_dir):
+    """ 
+    Compare the fiona and streaming readers over a folder of .klm files.
+    
+    Parameters
+    ----------
+        road_dir: str
+            folder path containing .klm driving journeys
+
+    Returns
+    -------
+
+    """
+    roads_fiona, t_fiona = load_with("fiona", road_dir)
+    roads_stream, t_stream = load_with("stream", road_dir)
+
+    pd.testing.assert_frame_equal(roads_fiona.drop(columns=["geometry", "vertex_time"]), roads_stream.drop(columns=["geometry", "vertex_time"]))
+    assert roads_fiona.geometry.geom_equals_exact(roads_stream.geometry, tolerance=0).all()
+    assert all(np.array_equal(a, b) for a, b in zip(roads_fiona["vertex_time"], roads_stream["vertex_time"]))
+    print(f"{roads_fiona.shape[0]} journeys identical")
+    print(f"fiona:  {t_fiona:.3f}s")
+    print(f"stream: {t_stream:.3f}s")
+    return
+
+if __name__ == "__main__":
+    if road_dir is not None:
+        check(road_dir)
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            dates = write_days(tmp, 100)
+            #A day of gx:Track journeys, which the GDAL KML driver does not read itself
+            write_day(tmp, dates[-1] + pd.Timedelta(days=1), seed=len(dates), n_tracks=2)
+            check(tmp)
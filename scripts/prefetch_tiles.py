@@ -0,0 +1,31 @@
+#!/usr/bin/env python
+"""
+Download the basemap tiles of bounding_boxes.yaml regions into the local tile cache for offline rendering.
+
+Run from the repository root, python scripts/prefetch_tiles.py [place ...] [--zoom zoom ...]
+e.g. python scripts/prefetch_tiles.py uk --zoom 6 7 8
+"""
+import os
+import sys
+import argparse
+from pathlib import Path
+
+#Generate_Config expects to be run from a folder inside the repository
+os.chdir(Path(__file__).resolve().parent)
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from roadmaps import load, tiles
+
+def main():
+    parser = argparse.ArgumentParser(description="Prefetch basemap tiles")
+    parser.add_argument("places", nargs="*", help="regions of bounding_boxes.yaml, all if none are given")
+    parser.add_argument("--zoom", nargs="+", type=int, help="zoom levels, the region resolution by default")
+    args = parser.parse_args()
+
+    config = load.Generate_Config()
+    n_tiles = tiles.prefetch_regions(config, places=args.places or None, zooms=args.zoom)
+    print(f"{sum(n_tiles.values())} tiles cached in {tiles.tile_cache(config).folder}")
+    return
+
+if __name__ == "__main__":
+    main()
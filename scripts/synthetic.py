@@ -0,0 +1,218 @@
+"""
+Synthetic Google Timeline .klm days used by the benchmark and check scripts.
+"""
+import os
+from datetime import datetime, timedelta
+
+import numpy as np
+
+klm_time_format = "%Y-%m-%dT%H:%M:%S.000Z"
+
+def synthetic_journeys(
+        date,
+        n_drives = 4,
+        n_points = 100,
+        seed = 0,
+    ):
+    """ 
+    Generate random driving journeys for a day.
+    
+    Parameters
+    ----------
+        date: datetime
+            day of journeys
+        n_drives: int
+            number of driving journeys
+        n_points: int
+            number of coordinates per journey
+        seed: int
+            random seed
+
+    Returns
+    -------
+        journeys: list
+            (start time, end time, distance [m], (n_points, 2) long/lat array) per journey
+
+    """
+    rng = np.random.default_rng(seed)
+    journeys = []
+    t_end = datetime(date.year, date.month, date.day, 6)
+    for _ in range(n_drives):
+        t_start = t_end + timedelta(minutes=int(rng.integers(5, 120)))
+        t_end = t_start + timedelta(minutes=int(rng.integers(5, 90)))
+        start = np.array([-5.0, 50.5]) + rng.random(2)*np.array([6.0, 4.5])
+        steps = rng.normal(0, 2e-3, size=(n_points, 2)) + rng.normal(0, 1e-3, size=2)
+        coords = start + np.cumsum(steps, axis=0)
+        journeys.append((t_start, t_end, int(rng.integers(500, 80000)), coords))
+    return journeys
+
+def write_day(
+        folder,
+        date,
+        n_drives = 4,
+        n_other = 2,
+        n_points = 100,
+        seed = 0,
+        sep = "history-",
+        ext = "kml",
+        n_tracks = 0,
+    ):
+    """ 
+    Write a Google Timeline style .klm file of driving, walking and visited place placemarks.
+    
+    Parameters
+    ----------
+        folder: str
+            directory to write to
+        date: datetime
+            day of journeys
+        n_drives: int
+            number of driving journeys
+        n_other: int
+            number of walking journeys and visited places
+        n_points: int
+            number of coordinates per journey
+        seed: int
+            random seed
+        n_tracks: int
+            number of the driving journeys written as gx:Track with a timestamp per point, the first ones
+
+    Returns
+    -------
+        path: str
+            path of written file
+
+    """
+    placemarks = []
+    journeys = synthetic_journeys(date, n_drives+n_other, n_points, seed)
+    for ji, (t_start, t_end, distance, coords) in enumerate(journeys):
+        kind = "Driving" if ji < n_drives else "Walking"
+        t0 = t_start.strftime(klm_time_format)
+        t1 = t_end.strftime(klm_time_format)
+        coordinates = " ".join(f"{x:.7f},{y:.7f},0" for x, y in coords)
+        if ji < n_tracks:
+            whens = [t_start + (t_end - t_start)*i/(len(coords) - 1) for i in range(len(coords))]
+            track = "".join(f"<when>{when.strftime(klm_time_format)}</when>" for when in whens)
+            track += "".join(f"<gx:coord>{x:.7f} {y:.7f} 0</gx:coord>" for x, y in coords)
+            placemarks.append(
+                f"<Placemark><name>{kind}</name><address/>"
+                f"<description>{kind} from {t0} to {t1}. Distance {distance}m</description>"
+                f"<gx:Track><altitudeMode>clampToGround</altitudeMode>{track}</gx:Track>"
+                f"<TimeSpan><begin>{t0}</begin><end>{t1}</end></TimeSpan></Placemark>"
+            )
+            continue
+        placemarks.append(
+            f"<Placemark><name>{kind}</name><address/><ExtendedData>"
+            f"<Data name='Category'><value>{kind}</value></Data><Data name='Distance'><value>{distance}</value></Data></ExtendedData>"
+            f"<description>{kind} from {t0} to {t1}. Distance {distance}m</description>"
+            f"<LineString><altitudeMode>clampToGround</altitudeMode><extrude>1</extrude><tesselate>1</tesselate>"
+            f"<coordinates>{coordinates}</coordinates></LineString>"
+            f"<TimeSpan><begin>{t0}</begin><end>{t1}</end></TimeSpan></Placemark>"
+        )
+        if ji >= n_drives:
+            placemarks.append(
+                f"<Placemark><name>Home</name><address>Home</address><description>Home from {t0} to {t1}. </description>"
+                f"<Point><coordinates>{coords[0,0]:.7f},{coords[0,1]:.7f},0</coordinates></Point>"
+                f"<TimeSpan><begin>{t0}</begin><end>{t1}</end></TimeSpan></Placemark>"
+            )
+    body = "\n".join(placemarks)
+    path = os.path.join(folder, f"{sep}{date.strftime('%Y-%m-%d')}.{ext}")
+    with open(path, "w") as f:
+        f.write(
+            "<?xml version='1.0' encoding='UTF-8'?>\n"
+            "<kml xmlns='http://www.opengis.net/kml/2.2' xmlns:gx='http://www.google.com/kml/ext/2.2' xmlns:kml='http://www.opengis.net/kml/2.2' xmlns:atom='http://www.w3.org/2005/Atom'>\n"
+            f"<Document><name>Location history from {date:%Y-%m-%d} to {date:%Y-%m-%d} </name><open>1</open><description/>\n"
+            f"{body}\n</Document></kml>\n"
+        )
+    return path
+
+def write_days(
+        folder,
+        n_days,
+        date_start = datetime(2015, 1, 1),
+        **kwargs,
+    ):
+    """ 
+    Write consecutive synthetic .klm days.
+    
+    Parameters
+    ----------
+        folder: str
+            directory to write to
+        n_days: int
+            number of days
+        date_start: datetime
+            first day
+
+    Returns
+    -------
+        dates: list
+            written days
+
+    """
+    os.makedirs(folder, exist_ok=True)
+    dates = [date_start + timedelta(days=i) for i in range(n_days)]
+    for i, date in enumerate(dates):
+        write_day(folder, date, seed=i, **kwargs)
+    return dates
+
+def synthetic_roads(
+        n_days,
+        trips_per_day = 4,
+        n_points = 0,
+        date_start = datetime(2015, 1, 1),
+        seed = 0,
+        crs = "EPSG:4326",
+    ):
+    """ 
+    Generate a road journeys dataframe without writing .klm files.
+    
+    Parameters
+    ----------
+        n_days: int
+            number of days
+        trips_per_day: float
+            mean number of journeys per day
+        n_points: int
+            number of coordinates per journey, no geometry column if 0
+        date_start: datetime
+            first day
+        seed: int
+            random seed
+        crs: str
+            coordinate reference system of the geometries
+
+    Returns
+    -------
+        roads: pd.DataFrame or Geopandas dataframe
+            Road journeys with the columns of load.load_in_roads
+
+    """
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    n_trips = rng.poisson(trips_per_day, size=n_days)
+    day = np.repeat(np.arange(n_days), n_trips)
+    n = len(day)
+
+    start = pd.Timestamp(date_start) + pd.to_timedelta(day, unit="D") + pd.to_timedelta(rng.integers(5*3600, 22*3600, size=n), unit="s")
+    distance = rng.lognormal(2.0, 1.0, size=n)
+    duration = distance / rng.uniform(10, 60, size=n)
+    data = {
+        "ID" : [f"{d:%Y-%m-%d}_{i}" for i, d in enumerate(start)],
+        "date" : start.normalize().to_numpy(dtype="datetime64[ns]"),
+        "time" : start.time,
+        "distance" : distance,
+        "duration" : duration,
+        "speed" : distance / duration,
+    }
+    if n_points == 0:
+        return pd.DataFrame(data)
+
+    import geopandas as gpd
+    import shapely
+
+    origin = np.array([-5.0, 50.5]) + rng.random((n, 1, 2))*np.array([6.0, 4.5])
+    coords = origin + np.cumsum(rng.normal(0, 2e-3, size=(n, n_points, 2)), axis=1)
+    data["geometry"] = shapely.linestrings(coords.reshape(-1, 2), indices=np.repeat(np.arange(n), n_points))
+    return gpd.GeoDataFrame(data, geometry="geometry", crs=crs)
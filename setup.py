@@ -4,7 +4,6 @@ from setuptools.command.install import install
 import subprocess
 import os
 from os.path import abspath, dirname, join
-from glob import glob
 
 this_dir = abspath(dirname(__file__))
 with open(join(this_dir, "LICENSE")) as f:
@@ -16,7 +15,8 @@ with open(join(this_dir, "README.md"), encoding="utf-8") as file:
 with open(join(this_dir, "requirements.txt")) as f:
     requirements = f.read().split("\n")
     
-scripts = glob("scripts/*.py") + glob("scripts/*.sh")
+#Only user facing tools are installed, benchmark_*.py, check_*.py and synthetic.py are development tools run from the repo
+scripts = ["scripts/prefetch_tiles.py"]
 
 setup(
     name="roadmaps",